@@ -1,7 +1,8 @@
 import csv
+import functools
 import os
+import pickle
 import sys
-import pandas
 import logging
 
 
@@ -12,13 +13,104 @@ logging.basicConfig(
     format="%(levelname)s:%(asctime)s:%(module)s:%(lineno)d %(message)s"
 )
 
-def get_suutra_df():
-    suutra_tsv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/sutrANi.tsv")
-    suutra_df = pandas.read_csv(suutra_tsv_path, sep="\t")
-    suutra_df = suutra_df.set_index("id")
+SUUTRA_TSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/sutrANi.tsv")
+# Optional prebuilt sidecar (see build_suutra_sidecar); used only while it is newer than the tsv.
+SUUTRA_SIDECAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/sutrANi.pickle")
+
+
+class SuutraRegistry(object):
+    """Immutable, ordered sutra table: registry["1.1.1"] is the sutra text, iteration yields ids in order."""
+
+    def __init__(self, ids, sutras):
+        self._ids = tuple(ids)
+        self._sutras = tuple(sutras)
+        self._positions = {suutra_id: position for (position, suutra_id) in enumerate(self._ids)}
+        self._pada_slices = {}
+        for (position, suutra_id) in enumerate(self._ids):
+            pada_id = get_adhyaya_pada_id(suutra_id)
+            (start, _) = self._pada_slices.get(pada_id, (position, position))
+            self._pada_slices[pada_id] = (start, position + 1)
+
+    def __getitem__(self, suutra_id):
+        return self._sutras[self._positions[suutra_id]]
+
+    def __contains__(self, suutra_id):
+        return suutra_id in self._positions
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, suutra_id, default=None):
+        position = self._positions.get(suutra_id)
+        return default if position is None else self._sutras[position]
+
+    def ids(self):
+        return self._ids
+
+    def sutras(self):
+        return self._sutras
+
+    def items(self):
+        return zip(self._ids, self._sutras)
+
+    def position(self, suutra_id):
+        """Ordinal of the sutra in the ashtadhyayi, from 0."""
+        return self._positions[suutra_id]
+
+    def get_pada(self, adhyaya, pada):
+        """(id, sutra) pairs of one pada, in order."""
+        (start, end) = self._pada_slices.get("%s.%s" % (adhyaya, pada), (0, 0))
+        return list(zip(self._ids[start:end], self._sutras[start:end]))
+
+    def get_adhyaya(self, adhyaya):
+        result = []
+        for pada in range(1, 5):
+            result.extend(self.get_pada(adhyaya, pada))
+        return result
+
+    def pada_ids(self):
+        """"X.Y" ids of all padas, in order."""
+        return list(self._pada_slices.keys())
+
+
+def _read_suutra_tsv(suutra_tsv_path):
+    with open(suutra_tsv_path, encoding="utf-8", newline="") as suutra_file:
+        reader = csv.reader(suutra_file, delimiter="\t")
+        next(reader)
+        rows = [row for row in reader if len(row) > 0]
+    return ([row[0] for row in rows], [row[1] for row in rows])
+
+
+def build_suutra_sidecar(sidecar_path=SUUTRA_SIDECAR_PATH):
+    (ids, sutras) = _read_suutra_tsv(SUUTRA_TSV_PATH)
+    with open(sidecar_path, "wb") as sidecar_file:
+        pickle.dump((ids, sutras), sidecar_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+@functools.lru_cache(maxsize=None)
+def get_suutra_registry():
+    if os.path.exists(SUUTRA_SIDECAR_PATH) and os.path.getmtime(SUUTRA_SIDECAR_PATH) >= os.path.getmtime(SUUTRA_TSV_PATH):
+        with open(SUUTRA_SIDECAR_PATH, "rb") as sidecar_file:
+            (ids, sutras) = pickle.load(sidecar_file)
+    else:
+        (ids, sutras) = _read_suutra_tsv(SUUTRA_TSV_PATH)
+    return SuutraRegistry(ids=ids, sutras=sutras)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_suutra_df():
+    import pandas
+    registry = get_suutra_registry()
+    suutra_df = pandas.DataFrame({"sutra": list(registry.sutras())}, index=pandas.Index(list(registry.ids()), name="id"))
     return suutra_df
-    # logging.debug(suutra_df.index)
-    # exit()
+
+
+def get_suutra_df():
+    """pandas view of the sutra registry, indexed by "id". Built on first use; each call returns a copy."""
+    return _get_suutra_df().copy()
 
 
 def get_adhyaya_pada_id(suutra_id):
@@ -26,4 +118,4 @@ def get_adhyaya_pada_id(suutra_id):
 
 
 if __name__ == '__main__':
-    logging.debug(get_adhyaya_pada_id("1.1.1"))
\ No newline at end of file
+    logging.debug(get_adhyaya_pada_id("1.1.1"))
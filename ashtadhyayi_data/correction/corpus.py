@@ -0,0 +1,91 @@
+# This Python file uses the following encoding: utf-8
+"""
+Walks the commentary corpus (ROOT/<book>/pada-X.Y/X.Y.Z.md) and runs per-file plugins over it
+on a process pool.
+
+A plugin is a module level function plugin(entry,data) -> (data,records). entry is a CorpusFile
+and data the file content. Transforms return modified data, scans return data unchanged along
+with a list of record lines (e.g. 'orig:fix:path'). The plugins given to run() are applied in
+order to each file, so a scan sees the output of the transforms before it, exactly as if they
+were run one after another over the corpus. Each file is read once and written at most once.
+
+Usage:
+python -m ashtadhyayi_data.correction.corpus ROOT PLUGIN [PLUGIN ...]
+where PLUGIN is one of the names in plugins.PLUGINS.
+"""
+import codecs,glob,os,sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from ashtadhyayi_data.correction.replacementlist import writeatomic
+
+booklist=['balamanorama','kashika','laghu','nyasa','samhita','tattvabodhini']
+padalist=['pada-1.1','pada-1.2','pada-1.3','pada-1.4','pada-2.1','pada-2.2','pada-2.3','pada-2.4','pada-3.1','pada-3.2','pada-3.3','pada-3.4','pada-4.1','pada-4.2','pada-4.3','pada-4.4','pada-5.1','pada-5.2','pada-5.3','pada-5.4','pada-6.1','pada-6.2','pada-6.3','pada-6.4','pada-7.1','pada-7.2','pada-7.3','pada-7.4','pada-8.1','pada-8.2','pada-8.3','pada-8.4']
+
+CorpusFile = namedtuple('CorpusFile',['book','pada','suutra_id','path'])
+
+def iswhole(books,padas=padalist):
+	# Whether a walk over books and padas covers the whole corpus.
+	return set(books) >= set(booklist) and set(padas) >= set(padalist)
+
+def walk(root='..',books=booklist,padas=padalist,pattern='*.md'):
+	# Yields a CorpusFile for every file of the given books, in book, pada, file name order.
+	for book in books:
+		for pada in padas:
+			for path in sorted(glob.glob(os.path.join(root,book,pada,pattern))):
+				suutra_id = os.path.splitext(os.path.basename(path))[0]
+				yield CorpusFile(book,pada,suutra_id,path)
+
+def processfile(entry,plugins,dry_run=False):
+	"""
+	Runs plugins over one file. Returns (entry,changed,records) where records has one list of
+	record lines per plugin.
+	"""
+	with codecs.open(entry.path,'r','utf-8') as fin:
+		data = fin.read()
+	newdata = data
+	records = []
+	for plugin in plugins:
+		(newdata,pluginrecords) = plugin(entry,newdata)
+		records.append(pluginrecords or [])
+	changed = newdata != data
+	if changed and not dry_run:
+		writeatomic(entry.path,newdata)
+	return (entry,changed,records)
+
+def run(plugins,root='..',books=booklist,padas=padalist,pattern='*.md',workers=None,chunksize=32,dry_run=False):
+	"""
+	Runs plugins over the whole corpus. Returns (changed,records): the number of files which
+	were (or, with dry_run, would be) modified, and for each plugin, in order, its record lines
+	from all files in walk() order.
+	"""
+	entries = list(walk(root,books,padas,pattern))
+	process = partial(processfile,plugins=plugins,dry_run=dry_run)
+	if workers == 1:
+		results = map(process,entries)
+		return merge(results,len(plugins))
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		return merge(executor.map(process,entries,chunksize=chunksize),len(plugins))
+
+def merge(results,count):
+	changed = 0
+	records = [[] for i in range(count)]
+	for (entry,filechanged,filerecords) in results:
+		changed += filechanged
+		for (i,pluginrecords) in enumerate(filerecords):
+			records[i].extend(pluginrecords)
+	return (changed,records)
+
+if __name__=="__main__":
+	from ashtadhyayi_data.correction.plugins import PLUGINS
+	root = sys.argv[1]
+	names = sys.argv[2:]
+	(changed,records) = run([PLUGINS[name][0] for name in names],root)
+	for (name,pluginrecords) in zip(names,records):
+		outputfile = PLUGINS[name][1]
+		if outputfile is not None:
+			with codecs.open(outputfile,'w','utf-8') as fout:
+				fout.write(''.join(record+'\n' for record in pluginrecords))
+		print(name,len(pluginrecords))
+	print(changed,'files changed')
@@ -1,33 +1,147 @@
 # This Python file uses the following encoding: utf-8
-import re,codecs,sys
+import re,codecs,sys,difflib
 # This list was used for generic corrections. After this exercise, there were a few left.
 #changelist = [(u'ह्य',u'12345'),(u'ह्र',u'67890'),(u'12345',u'ह्र'),(u'67890',u'ह्य'),]
 # The leftover after generic corrections are being treated now.
 changelist2 = [(u'प्रगृह्र',u'प्रगृह्य'),(u'ह्यस्व',u'ह्रस्व'),(u'ह्रयं',u'ह्ययं'),(u'ग्राह्र',u'ग्राह्य'),(u'बाह्र',u'बाह्य'),(u'गृह्र',u'गृह्य'),(u'ह्यिय',u'ह्रिय'),(u'नह्र',u'नह्य'),(u'ह्रव्युत्पन्नं',u'ह्यव्युत्पन्नं'),(u'ह्रेव',u'ह्येव'),(u'ह्रात्व',u'ह्यात्व'),(u'भीह्यी',u'भीह्री'),(u'ह्रयं',u'ह्ययं'),(u'मह्र',u'मह्य'),(u'नह्र',u'नह्य'),(u'ह्यीच्छ',u'ह्रीच्छ'),(u'ह्यद',u'ह्रद'),(u'ह्रुच्य',u'ह्युच्य'),(u'ह्रर्थ',u'ह्यर्थ'),(u'ह्रत्र',u'ह्यत्र'),(u'ह्यद',u'ह्रद'),(u'व्रीह्र',u'व्रीह्य'),(u'औह्रत',u'औह्यत'),(u'गूह्र',u'गूह्य'),(u'तुह्रो',u'तुह्यो'),(u'अदुह्य',u'अदुह्र'),(u'ह्रेत',u'ह्येत'),(u'ह्येप',u'ह्रेप'),(u'तर्ह्रास',u'तर्ह्यास'),(u'समुह्र',u'समुह्य'),(u'ह्रते',u'ह्यते'),(u'भ्युह्र',u'भ्युह्य'),(u'ह्रग्ने',u'ह्यग्ने'),(u'ह्यी',u'ह्री'),(u'ह्रुक्त',u'ह्युक्त'),(u'ह्रपि',u'ह्यपि'),(u'ह्रत',u'ह्यत'),(u'जिह्य',u'जिह्र'),]
 def changes(data,changelist):
+	# Sequential reference implementation: one full scan of data per pair.
 	for (a,b) in changelist:
 		data = data.replace(a,b)
 	return data
-def correction(filein):
-	fin = codecs.open(filein,'r','utf-8')
-	data = fin.read()
-	fin.close()
-	fout = codecs.open(filein,'w','utf-8')
+
+def _overlaps(x,y):
+	# True if occurrences of x and y can share characters in some text.
+	if x in y or y in x:
+		return True
+	for i in range(1,min(len(x),len(y))):
+		if x[-i:] == y[:i] or y[-i:] == x[:i]:
+			return True
+	return False
+
+class MultiReplacer(object):
+	"""
+	Compiled form of a changelist, equivalent to changes(data,changelist).
+
+	The ordered pairs are split into as few consecutive stages as possible. Within a stage
+	no two patterns can overlap and no replacement can overlap a later pattern, so the whole
+	stage is applied in a single pass over the text: the scan moves left to right, at each
+	position the longest pattern that matches there wins (leftmost-longest), and replaced
+	text is never rescanned within the stage. Pairs that interact with an earlier one (for
+	example the ह्यद->ह्रद chain) open a new stage, which keeps the result identical to
+	applying the pairs one after another. An exact duplicate of a pair already in the stage
+	is a no-op and is dropped, unless its replacement can make new matches of its pattern.
+	"""
+	def __init__(self,changelist):
+		stages = []
+		current = []
+		for (a,b) in changelist:
+			if a == '':
+				raise ValueError('Empty pattern in changelist')
+			if (a,b) in current and not _overlaps(b,a):
+				later = current[current.index((a,b))+1:]
+				if not any(_overlaps(post,a) for (pre,post) in later):
+					continue
+			if any(_overlaps(pre,a) or _overlaps(post,a) for (pre,post) in current):
+				stages.append(current)
+				current = []
+			current.append((a,b))
+		if current:
+			stages.append(current)
+		self.stages = [self._compile(stage) for stage in stages]
+
+	@staticmethod
+	def _compile(stage):
+		table = dict(stage)
+		patterns = sorted(table, key=len, reverse=True)
+		regex = re.compile('|'.join(re.escape(p) for p in patterns))
+		return (regex, table)
+
+	def replace(self,data):
+		for (regex,table) in self.stages:
+			data = regex.sub(lambda m: table[m.group(0)], data)
+		return data
+
+	def replacecount(self,data):
+		# Like replace(), but also returns how many times each pattern was replaced.
+		counts = {}
+		def substitute(m):
+			counts[m.group(0)] = counts.get(m.group(0),0) + 1
+			return table[m.group(0)]
+		for (regex,table) in self.stages:
+			data = regex.sub(substitute, data)
+		return (data,counts)
+
+replacer2 = MultiReplacer(changelist2)
+
+def readfile(filein):
+	with codecs.open(filein,'r','utf-8') as fin:
+		return fin.read()
+
+def writefile(filein,data):
+	with codecs.open(filein,'w','utf-8') as fout:
+		fout.write(data)
+
+def correction(filein,replacer=replacer2):
+	data = readfile(filein)
 	#data = changes(data,changelist) # For generic changes. Done once. Not required to be repeated.
-	data = changes(data,changelist2) # For leftovers. Use specific words and not generic ones.
-	fout.write(data)
-def suspecthrlist(filein):
-	fin = codecs.open(filein,'r','utf-8')
-	suspectlist = codecs.open('../../scripts/suspecthr.txt','a','utf-8')
-	data = fin.read()
-	fin.close()
-	words = data.split(' ')
-	for word in words:
-		if u'ह्र' in word or u'ह्य' in word:
-			suspectlist.write(word+":"+word+":"+filein+"\n")
-	suspectlist.close()
+	newdata = replacer.replace(data) # For leftovers. Use specific words and not generic ones.
+	if newdata != data:
+		writefile(filein,newdata)
+	return newdata != data
+
+def equivalence(filein,changelist=changelist2,replacer=replacer2):
+	# Diff of the compiled replacer against the sequential changes() on one file. Empty if identical.
+	data = readfile(filein)
+	expected = changes(data,changelist)
+	actual = replacer.replace(data)
+	if expected == actual:
+		return ''
+	diff = difflib.unified_diff(expected.splitlines(True),actual.splitlines(True),filein+' (sequential)',filein+' (compiled)')
+	return ''.join(diff)
+
+def correctcorpus(root='..',books=None,check=False,workers=None):
+	"""
+	Runs the hr/hy correction over every file of the corpus in a single process pool (see corpus.py).
+	With check=True nothing is written; the diffs between the compiled and the sequential
+	replacement are printed instead. Returns the number of changed (or differing) files.
+	"""
+	from ashtadhyayi_data.correction import corpus, plugins
+	books = books or corpus.booklist
+	if not check:
+		(count,records) = corpus.run([plugins.hrhy],root,books,workers=workers)
+		return count
+	count = 0
+	for entry in corpus.walk(root,books):
+		diff = equivalence(entry.path)
+		if diff:
+			sys.stdout.write(diff)
+			count += 1
+	return count
+
+def suspecthrlist(filein,suspectfile='../../scripts/suspecthr.txt',store=None):
+	"""
+	Appends the hr/hy suspects of one file (detectors.hrhy) to suspectfile or, if given, adds
+	them to store (a suspectstore.SuspectStore), where suspects already known are skipped.
+	"""
+	from ashtadhyayi_data.correction import corpus, detectors
+	parsed = detectors.ParsedFile(corpus.CorpusFile(None,None,None,filein),readfile(filein))
+	records = detectors.hrhy(parsed)
+	if store is not None:
+		return store.add('hrhy',records)
+	with codecs.open(suspectfile,'a','utf-8') as suspectlist:
+		for record in records:
+			suspectlist.write(record+"\n")
+	return len(records)
 if __name__=="__main__":
-	filename = sys.argv[1]
-	correction(filename)
+	# python corrections.py FILE            - correct one file
+	# python corrections.py --all [ROOT]    - correct all books under ROOT (default ..) in one process
+	# python corrections.py --check [ROOT]  - print differences between compiled and sequential replacement
+	if sys.argv[1] in ['--all','--check']:
+		root = sys.argv[2] if len(sys.argv) > 2 else '..'
+		count = correctcorpus(root,check=(sys.argv[1] == '--check'))
+		print(count)
+	else:
+		filename = sys.argv[1]
+		correction(filename)
 	#suspecthrlist(filename)
-	
\ No newline at end of file
@@ -1,106 +1,36 @@
-LIST1=(balamanorama kashika laghu nyasa samhita tattvabodhini)
-LIST2=(pada-1.1 pada-1.2 pada-1.3 pada-1.4 pada-2.1 pada-2.2 pada-2.3 pada-2.4 pada-3.1 pada-3.2 pada-3.3 pada-3.4 pada-4.1 pada-4.2 pada-4.3 pada-4.4 pada-5.1 pada-5.2 pada-5.3 pada-5.4 pada-6.1 pada-6.2 pada-6.3 pada-6.4 pada-7.1 pada-7.2 pada-7.3 pada-7.4 pada-8.1 pada-8.2 pada-8.3 pada-8.4)
-
 """
 rm -f suspecthr.txt
-cd ..
-for BOOK in "${LIST1[@]}"
-do
-	echo $BOOK
-	cd $BOOK
-	for PADA in "${LIST2[@]}"
-	do
-		cd $PADA
-		echo $PADA
-		shopt -s nullglob
-		array=(*.md)
-		for FILENAME in "${array[@]}"
-		do
-			# hr-hy corrections
-			python ../../scripts/corrections.py $FILENAME
-		done
-		cd ..
-	done
-	cd ..
-done
+# hr-hy corrections over all books in one process pool.
+# Use --check instead of --all to only print differences from the sequential replacement.
+python corrections.py --all ..
 """
 
 """
-# rephalist scraping
-rm -f rephalist.txt
-cd ..
-for BOOK in "${LIST1[@]}"
-do
-	echo $BOOK
-	cd $BOOK
-	for PADA in "${LIST2[@]}"
-	do
-		cd $PADA
-		echo $PADA
-		shopt -s nullglob
-		array=(*.md)
-		cd ../../scripts
-		for FILENAME in "${array[@]}"
-		do
-			# rephalist creation
-			php repha.php ../$BOOK/$PADA/$FILENAME
-		done
-		cd ../$BOOK
-	done
-	cd ..
-done
+# rephalist scraping, in one process pool over all books
+python -m ashtadhyayi_data.correction.detectors .. repha
 # rephalist replacement
 #python rephareplacer.py
 """
 
 """
 # suspect bigrams and trigrams generation
-rm -f ngram/checkngrams.txt
+# The n-gram index (ngram/ngramindex.pickle) is updated for changed files only,
+# then the reports of all books are written from it.
+cd ngram
+# bigram suspects
+#python abnormngramscraper.py all 2
+# trigram suspects
+python abnormngramscraper.py all 3
 cd ..
-for BOOK in "${LIST1[@]}"
-do
-	echo $BOOK
-	cd $BOOK
-	for PADA in "${LIST2[@]}"
-	do
-		cd $PADA
-		echo $PADA
-		shopt -s nullglob
-		array=(*.md)
-		cd ../../scripts/ngram
-		for FILENAME in "${array[@]}"
-		do
-			# bigram creation
-			#python abnormngramscraper.py ../../$BOOK/$PADA/$FILENAME 2
-			# trigram creation
-			python abnormngramscraper.py ../../$BOOK/$PADA/$FILENAME 3
-		done
-		cd ../../$BOOK
-	done
-	cd ..
-done
 """
 
-# Issue 10 list generation
-rm -rf issues/10/issue10.txt
-cd ..
-for BOOK in "${LIST1[@]}"
-do
-	echo $BOOK
-	cd $BOOK
-	for PADA in "${LIST2[@]}"
-	do
-		cd $PADA
-		echo $PADA
-		shopt -s nullglob
-		array=(*.md)
-		cd ../../scripts/issues/10
-		for FILENAME in "${array[@]}"
-		do
-			# Issue 10 suspect list generation
-			php issue10.php ../../../$BOOK/$PADA/$FILENAME
-		done
-		cd ../../../$BOOK
-	done
-	cd ..
-done
+# Issue 10 list generation, in one process pool over all books.
+# Further detectors (see detectors.DETECTORS, e.g. hrhy repha) can be named here; each file is still read once.
+python -m ashtadhyayi_data.correction.detectors .. issue10
+
+"""
+# Suspect lists can be kept in the suspect store (suspects.sqlite) instead, without duplicates.
+# Import a list, review the entries there (accepted/rejected), then apply the accepted fixes file by file.
+python -m ashtadhyayi_data.correction.suspectstore import repha rephalist.txt
+python -m ashtadhyayi_data.correction.suspectstore apply . repha
+"""
@@ -0,0 +1,154 @@
+# This Python file uses the following encoding: utf-8
+"""
+Suspect detectors over one shared parse of each corpus file.
+
+A detector is a module level function detector(parsed) -> records, where parsed is the
+ParsedFile of a file and records are suspect list lines in the format of its list (e.g.
+'word:word:path'). A ParsedFile holds the file content (data), its sha1 (digest), the body
+after the frontmatter (body), its whitespace separated words (words) and their SLP1 form
+(slp1, as ngramindex.slp1words), each computed once, on first use. SLP1 words come from an
+ngramindex.Slp1Cache when given, so unchanged files are not transliterated again.
+
+run() reads and parses each file once, however many detectors are registered, on a process
+pool. Adding a detector to DETECTORS costs no further corpus pass. Detectors taking
+arguments, like ngram(), are registered with functools.partial:
+	index = ngramindex.NgramIndex(slp1cache=cache)
+	run([hrhy,partial(ngram,nth=3,basengrams=index.basengrams('nyasa',3))],books=['nyasa'],slp1cache=cache)
+
+Usage:
+python -m ashtadhyayi_data.correction.detectors ROOT DETECTOR [DETECTOR ...]
+where DETECTOR is one of the names in DETECTORS.
+"""
+import codecs,hashlib,sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from ashtadhyayi_data.correction import corpus, plugins
+from ashtadhyayi_data.correction.ngram import ngramindex
+
+class ParsedFile(object):
+	def __init__(self,entry,data,slp1cache=None):
+		self.entry = entry
+		self.data = data
+		self.digest = hashlib.sha1(data.encode('utf-8')).hexdigest()
+		self.slp1cache = slp1cache
+		self.newslp1 = False
+		self._bodystart = None
+		self._words = None
+		self._slp1 = None
+
+	@property
+	def bodystart(self):
+		if self._bodystart is None:
+			self._bodystart = plugins.bodystart(self.data)
+		return self._bodystart
+
+	@property
+	def body(self):
+		return self.data[self.bodystart:]
+
+	@property
+	def words(self):
+		if self._words is None:
+			self._words = self.body.split()
+		return self._words
+
+	@property
+	def slp1(self):
+		if self._slp1 is None:
+			if self.slp1cache is not None:
+				self._slp1 = self.slp1cache.get(self.digest)
+			if self._slp1 is None:
+				self._slp1 = ngramindex.slp1body(self.body)
+				self.newslp1 = True
+		return self._slp1
+
+def hrhy(parsed):
+	# suspecthr.txt entries: words having ह्र or ह्य, as word:word:path.
+	return [word+':'+word+':'+parsed.entry.path for word in parsed.words if u'ह्र' in word or u'ह्य' in word]
+
+def repha(parsed):
+	# rephalist.txt entries: word:corrected word:path (see plugins.misplacedrepha).
+	return [word+':'+plugins.misplacedrepha.sub(u'र्\\g<1>्\\g<2>',word)+':'+parsed.entry.path for word in parsed.words if plugins.misplacedrepha.search(word)]
+
+def issue10(parsed):
+	# Issue 10 list entries: word:word:path.
+	return [word+':'+word+':'+parsed.entry.path for (word,offset,line,column) in plugins.findbrackets(parsed.data,parsed.bodystart)]
+
+def ngram(parsed,nth,basengrams):
+	"""
+	<book>_<n>gram_suspect.txt entries: words having n-grams of order nth missing from
+	basengrams, e.g. NgramIndex.basengrams(book,nth). Register with functools.partial.
+	"""
+	records = []
+	for word in dict.fromkeys(parsed.slp1):
+		missing = ngramindex.ngrams(word,nth) - basengrams
+		if missing:
+			records.append(ngramindex.suspectrecord(parsed.entry.path,word,sorted(missing),parsed.entry.book))
+	return records
+
+def issue10positions(parsed):
+	# The same words as path:line:column:word, for jumping to them in an editor.
+	return ['%s:%d:%d:%s' % (parsed.entry.path,line,column,word) for (word,offset,line,column) in plugins.findbrackets(parsed.data,parsed.bodystart)]
+
+# name -> (detector, record file written by python -m ashtadhyayi_data.correction.detectors)
+DETECTORS = OrderedDict([
+	('hrhy',(hrhy,'suspecthr.txt')),
+	('repha',(repha,'rephalist.txt')),
+	('issue10',(issue10,'issues/10/issue10.txt')),
+	('issue10positions',(issue10positions,'issues/10/issue10positions.txt')),
+])
+
+_worker_detectors = None
+_worker_slp1cache = None
+
+def _init_worker(detectors,slp1cache):
+	# Detectors (with their bound arguments) and the cache are sent to each worker once.
+	global _worker_detectors,_worker_slp1cache
+	_worker_detectors = detectors
+	_worker_slp1cache = slp1cache
+
+def processfile(entry):
+	"""
+	Runs the detectors given to run() over one file. Returns (entry,records,digest,newslp1) where records has one
+	list of record lines per detector and newslp1 is the SLP1 words if they had to be computed.
+	"""
+	with codecs.open(entry.path,'r','utf-8') as fin:
+		data = fin.read()
+	parsed = ParsedFile(entry,data,_worker_slp1cache)
+	records = [detector(parsed) or [] for detector in _worker_detectors]
+	return (entry,records,parsed.digest,parsed.slp1 if parsed.newslp1 else None)
+
+def run(detectors,root='..',books=corpus.booklist,padas=corpus.padalist,pattern='*.md',workers=None,chunksize=32,slp1cache=None):
+	"""
+	Runs detectors over the whole corpus. Returns, for each detector in order, its record lines
+	from all files in corpus.walk() order. SLP1 words computed on the way are added to
+	slp1cache, which is then pruned to the files seen, if they are the whole corpus, and saved.
+	"""
+	entries = list(corpus.walk(root,books,padas,pattern))
+	if workers == 1:
+		_init_worker(detectors,slp1cache)
+		results = list(map(processfile,entries))
+	else:
+		with ProcessPoolExecutor(max_workers=workers,initializer=_init_worker,initargs=(detectors,slp1cache)) as executor:
+			results = list(executor.map(processfile,entries,chunksize=chunksize))
+	records = [[] for detector in detectors]
+	for (entry,filerecords,digest,newslp1) in results:
+		for (i,detectorrecords) in enumerate(filerecords):
+			records[i].extend(detectorrecords)
+		if slp1cache is not None and newslp1 is not None:
+			slp1cache.add(digest,newslp1)
+	if slp1cache is not None:
+		if corpus.iswhole(books,padas):
+			slp1cache.prune(digest for (entry,filerecords,digest,newslp1) in results)
+		slp1cache.save()
+	return records
+
+if __name__=="__main__":
+	root = sys.argv[1]
+	names = sys.argv[2:]
+	records = run([DETECTORS[name][0] for name in names],root,slp1cache=ngramindex.Slp1Cache())
+	for (name,detectorrecords) in zip(names,records):
+		with codecs.open(DETECTORS[name][1],'w','utf-8') as fout:
+			fout.write(''.join(record+'\n' for record in detectorrecords))
+		print(name,len(detectorrecords))
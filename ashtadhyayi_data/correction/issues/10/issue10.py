@@ -1,56 +1,32 @@
 # -*- coding: utf-8 -*-
 import codecs
-import re
-import glob
 import os
 import sys
 
-def createRepList(filein, frep, commonPoolSet):
-	with codecs.open(filein, 'r', 'utf-8') as fin:
-		print(filein)
-		print(len(commonPoolSet))
-		data = fin.read().rstrip()
-		words = re.split('([ ,`])', data)
-		for word in words:
-			if '()' in word:
-				if word not in commonPoolSet:
-					commonPoolSet.add(word)
-					frep.write(word + ':' + word + ':' + filein.lstrip('../../../../../ashtadhyayi/') + '\n')
-		
-def doCorrections(filein, repList):
-	fin = codecs.open(filein, 'r', 'utf-8')
-	data = fin.read()
-	fin.close()
-	fout = codecs.open(filein, 'w', 'utf-8')
-	for (pre, post) in repList:
-		data = data.replace(pre, post)
-	#data = re.sub('\(\)([ -~])', '\g<1>', data)
-	#data = re.sub('\(\)([^ -~])', ' \g<1>', data)
-	fout.write(data)
-	fout.close()
+from ashtadhyayi_data.correction import corpus, detectors, replacementlist
 
 if __name__ == "__main__":
 	commentaryFolder = '../../../../../ashtadhyayi/nyasa'
 	if len(sys.argv) > 1:
-		frep = codecs.open('bracketReplacementList.txt', 'w', 'utf-8')
+		# One finditer scan per file (plugins.findbrackets) over all nyasa files in a process pool.
+		ashtadhyayiRoot = os.path.dirname(commentaryFolder)
+		(entries, positions) = detectors.run([detectors.issue10, detectors.issue10positions], root=ashtadhyayiRoot, books=[os.path.basename(commentaryFolder)])
 		commonPoolSet = set()
-		subfolders = [f.path for f in os.scandir(commentaryFolder) if f.is_dir() ]
-		for subfolder in subfolders:
-			files = glob.glob(os.path.join(subfolder, '*.md'))
-			for file in files:
-				createRepList(file, frep, commonPoolSet)
+		with codecs.open('bracketReplacementList.txt', 'w', 'utf-8') as frep:
+			for entry in entries:
+				(word, _, path) = entry.split(':', 2)
+				if word not in commonPoolSet:
+					commonPoolSet.add(word)
+					frep.write(word + ':' + word + ':' + os.path.relpath(path, ashtadhyayiRoot) + '\n')
+		with codecs.open('bracketPositions.txt', 'w', 'utf-8') as fpos:
+			for position in positions:
+				fpos.write(position + '\n')
 		print(len(commonPoolSet))
 	else:
-		frep = codecs.open('bracketReplacementListManuallyCorrected.txt', 'r', 'utf-8')
-		repList = []
-		for line in frep:
-			line = line.rstrip()
-			(pre, post, filename) = line.split(':')
-			repList.append((pre, post))
-		subfolders = [f.path for f in os.scandir(commentaryFolder) if f.is_dir() ]
-		for subfolder in subfolders:
-			files = glob.glob(os.path.join(subfolder, '*.md'))
-			for file in files:
-				print(file)
-				doCorrections(file, repList)
-		
\ No newline at end of file
+		# The list keeps each word once, with the first file it was found in, so every entry is applied to every nyasa file.
+		ashtadhyayiRoot = os.path.dirname(commentaryFolder)
+		(groups, pending) = replacementlist.readlist('bracketReplacementListManuallyCorrected.txt')
+		pairs = replacementlist.mergedpairs(groups)
+		nyasaFiles = ['/'.join([entry.book, entry.pada, os.path.basename(entry.path)]) for entry in corpus.walk(ashtadhyayiRoot, books=[os.path.basename(commentaryFolder)])]
+		results = replacementlist.applytoall(pairs, nyasaFiles, root=ashtadhyayiRoot)
+		replacementlist.printreport(results)
@@ -4,15 +4,17 @@ ngram.py
 To generate words having unique ngrams.   
 """
 import sys, re
-import codecs,glob
-import string
+import codecs
 import datetime
-from math import log
+from collections import Counter
 
 # Function to return timestamp
 import indic_transliteration
 from indic_transliteration import sanscript
 
+from ashtadhyayi_data.correction import corpus
+from ashtadhyayi_data.correction.ngram import ngramcount, ngramindex, transcoder
+
 
 def timestamp():
 	return datetime.datetime.now()
@@ -24,100 +26,59 @@ def triming(lst):
 		output.append(member)
 	return output
 
-def ngrams(input, n):
-	output = set()
-	if n >= len(input): # Removing whole word entries.
-		pass
-	else:
-		for i in range(len(input)-n+1):
-			output.add(input[i:i+n])
-	return output
+ngrams = ngramcount.ngrams
 
 def getngrams(line,nth):
 	words = re.split(u' ',line)
-	ngr = set()
-	for word in words:
-		ngr = ngr.union(ngrams(word,nth))
-	return ngr
+	return set(ngramcount.iterngrams(words,nth))
+
+def bookwords(book):
+	# Streams the SLP1 words of every file of book.
+	for entry in corpus.walk('../..',[book],pattern='*.*'):
+		with codecs.open(entry.path,'r','utf-8') as fin:
+			data = fin.read()
+		for word in ngramindex.slp1words(data):
+			yield word
 
 def getbasengrams(forThisBook,nth):
-	booklist=['balamanorama','kashika','laghu','nyasa','samhita','tattvabodhini']
-	padalist=['pada-1.1','pada-1.2','pada-1.3','pada-1.4','pada-2.1','pada-2.2','pada-2.3','pada-2.4','pada-3.1','pada-3.2','pada-3.3','pada-3.4','pada-4.1','pada-4.2','pada-4.3','pada-4.4','pada-5.1','pada-5.2','pada-5.3','pada-5.4','pada-6.1','pada-6.2','pada-6.3','pada-6.4','pada-7.1','pada-7.2','pada-7.3','pada-7.4','pada-8.1','pada-8.2','pada-8.3','pada-8.4']
-	result = set()
-	for book in booklist:
-		if book == forThisBook:
-			pass
-		else:
-			for pada in padalist:
-				inputdir = '../../'+book+'/'+pada
-				inputfiles = glob.glob(inputdir+'/*.*')
-				for inputfile in inputfiles:
-					fin = codecs.open(inputfile,'r','utf-8')
-					data = fin.read()
-					text = data.split('---')[2].strip()
-					text = sanscript.transliterate(text, sanscript.DEVANAGARI, sanscript.SLP1)
-					text = re.sub('[^a-zA-Z \']+','',text)
-					result = result.union(getngrams(text.encode('utf-8'),nth))
-					fin.close()
-	#print result
-	return result	
+	# Counter of the n-grams of all books other than forThisBook.
+	result = Counter()
+	for book in corpus.booklist:
+		if book != forThisBook:
+			ngramcount.countngrams(bookwords(book),nth,result)
+	return result
 def gettestngrams(forThisBook,nth):
-	result = set()
-	padalist=['pada-1.1','pada-1.2','pada-1.3','pada-1.4','pada-2.1','pada-2.2','pada-2.3','pada-2.4','pada-3.1','pada-3.2','pada-3.3','pada-3.4','pada-4.1','pada-4.2','pada-4.3','pada-4.4','pada-5.1','pada-5.2','pada-5.3','pada-5.4','pada-6.1','pada-6.2','pada-6.3','pada-6.4','pada-7.1','pada-7.2','pada-7.3','pada-7.4','pada-8.1','pada-8.2','pada-8.3','pada-8.4']
-	for pada in padalist:
-		inputdir = '../../'+forThisBook+'/'+pada
-		inputfiles = glob.glob(inputdir+'/*.*')
-		for inputfile in inputfiles:
-			fin = codecs.open(inputfile,'r','utf-8')
-			data = fin.read()
-			text = data.split('---')[2].strip()
-			text = sanscript.transliterate(text, sanscript.DEVANAGARI, sanscript.SLP1)
-			text = re.sub('[^a-zA-Z \']+','',text)
-			result = result.union(getngrams(text.encode('utf-8'),nth))
-			fin.close()
-	return result	
-def getSKngrams(nth):
-	result = set()
-	fin = codecs.open('../../../siddhantakaumudi/sk1.txt','r','utf-8')
+	return ngramcount.countngrams(bookwords(forThisBook),nth)
+def skwords(skfile='../../../siddhantakaumudi/sk1.txt'):
+	fin = codecs.open(skfile,'r','utf-8')
 	for text in fin:
 		text = re.sub(u'^[{][#]उ[0-9]+[#][}]','',text)
 		text = text.replace(u'(अ)','')
 		text = text.replace(u'(स्व)','')
-		text = sanscript.transliterate(text,sanscript.DEVANAGARI,sanscript.SLP1)
+		text = transcoder.transcoder_processString(text,'deva','slp1')
 		text = re.sub(u'[^a-zA-Z \']+',' ',text)
 		text = re.sub('[ ]+',' ',text)
-		result = result.union(getngrams(text.encode('utf-8'),nth))
+		for word in text.split(' '):
+			yield word
 	fin.close()
-	return result	
+def getSKngrams(nth):
+	return ngramcount.countngrams(skwords(),nth)
 
 if __name__=="__main__":
+	# python abnormngramscraper.py BOOK N   - BOOK_Ngram_suspect.txt from the cached n-gram index
+	# python abnormngramscraper.py all N    - the same for every book
+	# python abnormngramscraper.py sk N     - siddhantakaumudi suspects
 	filein = sys.argv[1]
 	nth = sys.argv[2]
 	nth = int(nth)
-	basengrams = getbasengrams(filein,nth)
+	index = ngramindex.NgramIndex(slp1cache=ngramindex.Slp1Cache())
+	index.update()
+	basengrams = index.basengrams(filein,nth)
 
-	
-	padalist=['pada-1.1','pada-1.2','pada-1.3','pada-1.4','pada-2.1','pada-2.2','pada-2.3','pada-2.4','pada-3.1','pada-3.2','pada-3.3','pada-3.4','pada-4.1','pada-4.2','pada-4.3','pada-4.4','pada-5.1','pada-5.2','pada-5.3','pada-5.4','pada-6.1','pada-6.2','pada-6.3','pada-6.4','pada-7.1','pada-7.2','pada-7.3','pada-7.4','pada-8.1','pada-8.2','pada-8.3','pada-8.4']
 	if not filein == 'sk':
-		logfile = codecs.open(filein+'_'+str(nth)+'gram_suspect.txt','w','utf-8')
-		for pada in padalist:
-			inputdir = '../../'+filein+'/'+pada
-			inputfiles = glob.glob(inputdir+'/*.*')
-			for inputfile in inputfiles:
-				fin = codecs.open(inputfile,'r','utf-8')
-				data = fin.read()
-				fin.close()
-				text = data.split('---')[2].strip()
-				text = sanscript.transliterate(text,sanscript.DEVANAGARI,sanscript.SLP1)
-				text = re.sub('[^a-zA-Z \']+','',text)
-				words = text.split(' ')
-				for word in words:
-					testngrams = ngrams(word.encode('utf-8'),nth)
-					if not testngrams < basengrams:
-						missing = list(testngrams - basengrams)
-						devaword = sanscript.transliterate(word,sanscript.DEVANAGARI,sanscript.SLP1)
-
-						# logfile.write(inputfile+'\n'+devaword+':'+devaword+':'+filein+":"+transcoder.transcoder_processString(','.join(missing),'slp1','deva')+"\n")
+		books = ngramindex.booklist if filein == 'all' else [filein]
+		for book in books:
+			index.writesuspects(book,nth)
 	else:
 		logfile = codecs.open('../../../siddhantakaumudi/sk_'+str(nth)+'gram_suspect.txt','w','utf-8')
 		#testngrams = getSKngrams(nth)
@@ -127,13 +88,15 @@ if __name__=="__main__":
 			text = re.sub(u'^[(]उ[0-9]+[)]','',text)
 			text = text.replace(u'(अ)','')
 			text = text.replace(u'(स्व)','')
-			text = sanscript.transliterate(text,sanscript.DEVANAGARI,sanscript.SLP1)
+			text = transcoder.transcoder_processString(text,'deva','slp1')
 			text = re.sub(u'[^a-zA-Z \']+',' ',text)
 			text = re.sub('[ ]+',' ',text)
 			text = re.sub('[X]+','',text)
 			words = text.split(' ')
 			for word in words:
-				testngrams = ngrams(word.encode('utf-8'),nth)
-				if not testngrams < basengrams:
-					missing = list(testngrams - basengrams)
-					devaword = sanscript.transliterate(word,sanscript.DEVANAGARI,sanscript.SLP1)
+				missing = ngrams(word,nth) - basengrams
+				if missing:
+					devaword = sanscript.transliterate(word,sanscript.SLP1,sanscript.DEVANAGARI)
+					logfile.write(devaword+':'+devaword+':sk:'+sanscript.transliterate(','.join(sorted(missing)),sanscript.SLP1,sanscript.DEVANAGARI)+"\n")
+		fin.close()
+		logfile.close()
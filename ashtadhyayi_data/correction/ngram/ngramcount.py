@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+ngramcount.py
+Streaming n-gram counting over SLP1 words, and rarity scores for ranking suspects.
+
+N-grams are taken over characters of the SLP1 (str) text, never over utf-8 bytes. Counts are
+updated in place in a Counter, so accumulating a whole corpus costs one pass and no copies.
+"""
+from collections import Counter
+from math import log
+
+def ngrams(input, n):
+	output = set()
+	if n >= len(input): # Removing whole word entries.
+		pass
+	else:
+		for i in range(len(input)-n+1):
+			output.add(input[i:i+n])
+	return output
+
+def iterngrams(words, n):
+	# Yields every n-gram occurrence of every word. Words of length n or less yield nothing.
+	for word in words:
+		for i in range(len(word)-n+1 if len(word) > n else 0):
+			yield word[i:i+n]
+
+def countngrams(words, n, counts=None):
+	# Adds the n-grams of words (any iterable, e.g. a generator) to counts and returns it.
+	if counts is None:
+		counts = Counter()
+	counts.update(iterngrams(words, n))
+	return counts
+
+class NgramModel(object):
+	"""
+	Add-one smoothed n-gram frequencies. logprob() of an unseen n-gram is the lowest possible
+	score; wordscore() is the log-probability of the rarest n-gram of a word, so sorting words
+	by it puts the most suspicious first.
+	"""
+	def __init__(self, counts):
+		self.counts = counts
+		self.total = sum(counts.values())
+		self.denominator = self.total + len(counts) + 1
+
+	def logprob(self, gram):
+		return log((self.counts.get(gram, 0) + 1.0) / self.denominator)
+
+	def wordscore(self, word, n):
+		grams = ngrams(word, n)
+		if not grams:
+			return 0.0
+		return min(self.logprob(gram) for gram in grams)
+
+	def rank(self, words, n, threshold=0):
+		"""
+		Returns (score, word, rare) for the words having n-grams seen at most threshold times,
+		rarest first. rare lists those n-grams.
+		"""
+		result = []
+		for word in set(words):
+			rare = sorted(gram for gram in ngrams(word, n) if self.counts.get(gram, 0) <= threshold)
+			if rare:
+				result.append((self.wordscore(word, n), word, rare))
+		result.sort()
+		return result
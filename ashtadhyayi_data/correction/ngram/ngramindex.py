@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+ngramindex.py
+Persistent n-gram index of the commentary corpus, used to find words having unique ngrams.
+
+Each file is stored with the sha1 of its content, its SLP1 words and its per-order n-gram
+counts. Per-book n-gram counts are kept alongside. update() re-tokenizes only files whose
+content changed, so suspect reports for a book become a set difference against the cached
+counts of all the other books.
+
+Slp1Cache keeps the SLP1 words of file bodies by sha1 of the file content, so that a file is
+transliterated once for the n-gram index, the text index and the detectors (see
+detectors.py) alike.
+"""
+import codecs,hashlib,os,pickle,re
+from collections import Counter
+
+from indic_transliteration import sanscript
+
+from ashtadhyayi_data.correction import corpus, plugins
+from ashtadhyayi_data.correction.ngram import ngramcount, transcoder
+from ashtadhyayi_data.correction.ngram.ngramcount import ngrams
+
+booklist = corpus.booklist
+VERSION = 3
+SLP1CACHE = 'slp1cache.pickle'
+
+def slp1body(body):
+	# Devanagari text as a list of SLP1 words.
+	text = transcoder.transcoder_processString(body.strip(), 'deva', 'slp1')
+	text = re.sub('[^a-zA-Z \']+','',text)
+	return [word for word in text.split(' ') if word != '']
+
+def slp1words(data):
+	# Body of a markdown file (frontmatter stripped) as a list of SLP1 words.
+	return slp1body(data[plugins.bodystart(data):])
+
+def suspectrecord(path,word,missing,book):
+	# An entry of a <book>_<n>gram_suspect.txt report; word and missing are in SLP1.
+	devaword = sanscript.transliterate(word,sanscript.SLP1,sanscript.DEVANAGARI)
+	devamissing = sanscript.transliterate(','.join(missing),sanscript.SLP1,sanscript.DEVANAGARI)
+	return path+'\n'+devaword+':'+devaword+':'+book+':'+devamissing
+
+class Slp1Cache(object):
+	"""
+	sha1 of file content -> SLP1 words of its body, kept in a pickle file (by default in the
+	working directory, like ngramindex.pickle). get() returns None for unknown digests; save()
+	writes the file only if entries were added or dropped. Users walking the whole corpus
+	prune() it to the digests they saw, so old versions of edited files do not pile up.
+	"""
+	def __init__(self,cachefile=SLP1CACHE):
+		self.cachefile = cachefile
+		self.entries = {} # digest -> words joined by ' '
+		self.dirty = False
+		if cachefile is not None and os.path.exists(cachefile):
+			with open(cachefile,'rb') as fin:
+				stored = pickle.load(fin)
+			if stored.get('version') == VERSION:
+				self.entries = stored['entries']
+
+	def get(self,digest):
+		words = self.entries.get(digest)
+		return None if words is None else [word for word in words.split(' ') if word != '']
+
+	def add(self,digest,words):
+		self.entries[digest] = ' '.join(words)
+		self.dirty = True
+
+	def slp1words(self,data,digest):
+		words = self.get(digest)
+		if words is None:
+			words = slp1words(data)
+			self.add(digest,words)
+		return words
+
+	def prune(self,digests):
+		# Drops the entries of content no longer in the corpus.
+		digests = set(digests)
+		for digest in [digest for digest in self.entries if digest not in digests]:
+			del self.entries[digest]
+			self.dirty = True
+
+	def save(self):
+		if not self.dirty or self.cachefile is None:
+			return
+		tmpfile = self.cachefile+'.tmp'
+		with open(tmpfile,'wb') as fout:
+			pickle.dump({'version': VERSION, 'entries': self.entries},fout,pickle.HIGHEST_PROTOCOL)
+		os.replace(tmpfile,self.cachefile)
+		self.dirty = False
+
+class NgramIndex(object):
+	def __init__(self,indexfile='ngramindex.pickle',root='../..',books=booklist,orders=(2,3),slp1cache=None):
+		self.indexfile = indexfile
+		self.slp1cache = slp1cache
+		self.root = root
+		self.books = books
+		self.orders = tuple(orders)
+		self.files = {} # path -> {'book','hash','words','ngrams': {n: Counter}}
+		self.bookngrams = {} # book -> {n: Counter}
+		if os.path.exists(indexfile):
+			with open(indexfile,'rb') as fin:
+				stored = pickle.load(fin)
+			if stored.get('version') == VERSION and tuple(stored['orders']) == self.orders:
+				self.files = stored['files']
+				self.bookngrams = stored['bookngrams']
+
+	def corpusfiles(self):
+		for entry in corpus.walk(self.root,self.books,pattern='*.*'):
+			yield (entry.book,entry.path)
+
+	def tokenize(self,book,data,digest):
+		wordlist = self.slp1cache.slp1words(data,digest) if self.slp1cache is not None else slp1words(data)
+		entry = {'book': book, 'hash': digest, 'words': Counter(wordlist), 'ngrams': {}}
+		for n in self.orders:
+			entry['ngrams'][n] = ngramcount.countngrams(wordlist,n)
+		return entry
+
+	def update(self):
+		"""
+		Brings the index in line with the files on disk and saves it. Returns the number of
+		files which were (re-)tokenized.
+		"""
+		seen = set()
+		changed = 0
+		for (book,inputfile) in self.corpusfiles():
+			seen.add(inputfile)
+			with open(inputfile,'rb') as fin:
+				raw = fin.read()
+			digest = hashlib.sha1(raw).hexdigest()
+			entry = self.files.get(inputfile)
+			if entry is not None and entry['hash'] == digest and entry['book'] == book:
+				continue
+			self.files[inputfile] = self.tokenize(book,raw.decode('utf-8'),digest)
+			changed += 1
+		removed = [inputfile for inputfile in self.files if inputfile not in seen]
+		for inputfile in removed:
+			del self.files[inputfile]
+		if self.slp1cache is not None and corpus.iswhole(self.books):
+			self.slp1cache.prune(entry['hash'] for entry in self.files.values())
+		if changed or removed or not self.bookngrams:
+			self.bookngrams = {}
+			for entry in self.files.values():
+				totals = self.bookngrams.setdefault(entry['book'],{n: Counter() for n in self.orders})
+				for n in self.orders:
+					totals[n].update(entry['ngrams'][n])
+			self.save()
+		if self.slp1cache is not None:
+			self.slp1cache.save()
+		return changed
+
+	def save(self):
+		tmpfile = self.indexfile+'.tmp'
+		with open(tmpfile,'wb') as fout:
+			pickle.dump({'version': VERSION, 'orders': self.orders, 'files': self.files, 'bookngrams': self.bookngrams},fout,pickle.HIGHEST_PROTOCOL)
+		os.replace(tmpfile,self.indexfile)
+
+	def basecounts(self,forThisBook,nth):
+		# Counts of the n-grams of order nth in books other than forThisBook.
+		result = Counter()
+		for (book,totals) in self.bookngrams.items():
+			if book != forThisBook:
+				result.update(totals[nth])
+		return result
+
+	def basengrams(self,forThisBook,nth):
+		# All n-grams of order nth seen in books other than forThisBook.
+		result = set()
+		for (book,totals) in self.bookngrams.items():
+			if book != forThisBook:
+				result.update(totals[nth])
+		return result
+
+	def suspects(self,forThisBook,nth,inputfile=None):
+		"""
+		Yields (inputfile,word,missing) for each word of forThisBook (or of just inputfile)
+		which has n-grams that no other book has. word and missing are in SLP1.
+		"""
+		basengrams = self.basengrams(forThisBook,nth)
+		if inputfile is not None:
+			inputfiles = [inputfile]
+		else:
+			inputfiles = sorted(path for (path,entry) in self.files.items() if entry['book'] == forThisBook)
+		for path in inputfiles:
+			entry = self.files[path]
+			if not set(entry['ngrams'][nth]) - basengrams:
+				continue
+			for word in entry['words']:
+				missing = ngrams(word,nth) - basengrams
+				if missing:
+					yield (path,word,sorted(missing))
+
+	def rankedsuspects(self,forThisBook,nth,threshold=0):
+		"""
+		Like suspects(), but words whose n-grams occur at most threshold times in the other
+		books are reported, rarest first by ngramcount.NgramModel.wordscore(). Yields
+		(inputfile,word,rare,score).
+		"""
+		model = ngramcount.NgramModel(self.basecounts(forThisBook,nth))
+		result = []
+		for (path,entry) in self.files.items():
+			if entry['book'] != forThisBook:
+				continue
+			for (score,word,rare) in model.rank(entry['words'],nth,threshold):
+				result.append((score,path,word,rare))
+		result.sort()
+		for (score,path,word,rare) in result:
+			yield (path,word,rare,score)
+
+	def writesuspects(self,forThisBook,nth,logfile=None,ranked=False,threshold=0):
+		"""
+		Writes the <book>_<n>gram_suspect.txt report and returns its path. With ranked=True,
+		entries are ordered by rarity (see rankedsuspects()) instead of by file.
+		"""
+		logfile = logfile or forThisBook+'_'+str(nth)+'gram_suspect.txt'
+		if ranked:
+			entries = ((path,word,missing) for (path,word,missing,score) in self.rankedsuspects(forThisBook,nth,threshold))
+		else:
+			entries = self.suspects(forThisBook,nth)
+		with codecs.open(logfile,'w','utf-8') as fout:
+			for (path,word,missing) in entries:
+				fout.write(suspectrecord(path,word,missing,forThisBook)+'\n')
+		return logfile
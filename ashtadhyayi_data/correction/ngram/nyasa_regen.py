@@ -1,66 +1,103 @@
 # -*- coding: utf-8 -*-
 """
-ngram.py
-To generate words having unique ngrams.   
+nyasa_regen.py
+Regenerates commentaries (by default nyasa) from the allsutrani/*.htm files of SanskritVerb.
+
+Each file is scanned once for its <div class="heading"> markers; the section of a commentary
+runs from its heading to the next heading (or to </body></html>), so any number of commentaries
+are cut out of the same scan. The sutra header of the file (found once, whichever section it is
+in) gives the index/sutra/vritti frontmatter of every commentary written. Files are processed on
+a process pool.
+
+Usage:
+python nyasa_regen.py [COMMENTARY ...]
+where COMMENTARY is one of the values of HEADINGS (default nyasa).
 """
 import sys, re
 import codecs,glob
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 from indic_transliteration import sanscript
-from lxml import etree
+
+# heading text -> commentary, as in the output directories.
+HEADINGS = OrderedDict([(u'न्यासः','nyasa'),(u'बाल-मनोरमा','balamanorama'),(u'तत्त्व-बोधिनी','tattvabodhini')])
+HEADING_PATTERN = re.compile(u'<div class="heading">([^<]*)</div>|</body></html>')
+SUTRA_PATTERN = re.compile(u'<div>([^<]*) <span class="sUtramIndex">, ([^<]*)</span> </div><p>')
+REFERENCE_PATTERN = re.compile(u'<span class="sUtramIndex"><a href="([0-9.]+)[.]htm">([^<]*)</a></span>')
+TAG_PATTERN = re.compile(u'[<][^>]*[>]')
+FNAME_PATTERN = re.compile('([1-8])[.]([1-4])[.]([0-9]+)[.]htm')
 
 class sn():
 	def __init__(self,line):
 		[self.num,self.text,self.scrap1,self.scrap2] = line.split(u'|')
 
-def fname(inputfilename):
+def fname(inputfilename,commentary='nyasa'):
 	x = inputfilename.replace('../../../SanskritVerb/Data/allsutrani\\','')
-	outfilename = re.sub('([1-8])[.]([1-4])[.]([0-9]+)[.]htm','../../nyasa/pada-\g<1>.\g<2>/\g<1>.\g<2>.\g<3>.md',x)
+	outfilename = FNAME_PATTERN.sub('../../'+commentary+r'/pada-\g<1>.\g<2>/\g<1>.\g<2>.\g<3>.md',x)
 	return outfilename
 
-def postprocess(line):
+def extractsections(data):
+	"""
+	Returns (sections,issues): {heading text: section html} of all headings of a file, in one
+	scan, and messages for headings which occur more than once (the first one is kept).
+	"""
+	marks = [(m.group(1),m.start(),m.end()) for m in HEADING_PATTERN.finditer(data)]
+	sections = OrderedDict()
+	issues = []
+	for (i,(heading,_,start)) in enumerate(marks):
+		if heading is None:
+			continue
+		end = marks[i+1][1] if i+1 < len(marks) else len(data)
+		if heading in sections:
+			issues.append(heading+' repeated')
+		else:
+			sections[heading] = data[start:end]
+	return (sections,issues)
+
+def frontmatter(sutra,commentary='nyasa'):
+	# sutra is the SUTRA_PATTERN match of the file, or None.
+	if sutra is None:
+		return ''
+	return '---\nindex:  '+sanscript.transliterate(sutra.group(2),sanscript.DEVANAGARI,sanscript.SLP1)+'\nsutra:  '+sutra.group(1)+'\nvritti:  '+commentary+'\n---\n\n'
+
+def postprocess(line,commentary='nyasa',sutra=None):
 	x = line.replace('&quot;','`')
-	m = re.search('<div>([^<]*) <span class="sUtramIndex">, ([^<]*)</span> </div><p>',x)
-	if m:
-		rep = '---\nindex:  '+sanscript.transliterate(m.group(2),sanscript.DEVANAGARI,sanscript.SLP1)+'\nsutra:  '+m.group(1)+'\nvritti:  nyasa\n---\n\n'
-		x = re.sub('<div>([^<]*) <span class="sUtramIndex">, ([^<]*)</span> </div><p>',rep,x)
-	x = re.sub('<span class="sUtramIndex"><a href="([0-9.]+)[.]htm">([^<]*)</a></span>','(\g<1>)',x)
+	x = SUTRA_PATTERN.sub('',x)
+	x = REFERENCE_PATTERN.sub(r'(\g<1>)',x)
 	x = x.replace('<span class="prashna">','')
 	x = x.replace('<span class="vArtikA">','')
-	x = re.sub('[<][^>]*[>]','',x)
-	x = x.strip()
+	x = TAG_PATTERN.sub('',x)
+	x = frontmatter(sutra,commentary)+x.strip()
 	x += '\n'
 	return x
-	
+
+def processfile(inputfile,commentaries=('nyasa',)):
+	# Writes the given commentaries of one htm file. Returns the log lines.
+	with codecs.open(inputfile,'r','utf-8') as fin:
+		data = fin.read()
+	(sections,issues) = extractsections(data)
+	sutra = SUTRA_PATTERN.search(data)
+	log = [inputfile+'\n'+issue+'\n' for issue in issues]
+	for (heading,commentary) in HEADINGS.items():
+		if commentary not in commentaries:
+			continue
+		if heading not in sections:
+			log.append(inputfile+'\n'+commentary+' issue\n')
+			continue
+		with codecs.open(fname(inputfile,commentary),'w','utf-8') as fout:
+			fout.write(postprocess(sections[heading],commentary,sutra))
+	return log
+
+def regenerate(inputfiles,commentaries=('nyasa',),logfile='nyasa_log.txt',workers=None,chunksize=32):
+	process = partial(processfile,commentaries=commentaries)
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		logs = executor.map(process,inputfiles,chunksize=chunksize)
+		with codecs.open(logfile,'w','utf-8') as flog:
+			for log in logs:
+				flog.write(''.join(log))
+
 if __name__=="__main__":
 	inputfiles = glob.glob('../../../SanskritVerb/Data/allsutrani/*.htm')
-	flog = codecs.open('nyasa_log.txt','w','utf-8')
-	for inputfile in inputfiles:
-		fin = codecs.open(inputfile,'r','utf-8')
-		data = fin.read()
-		fin.close()
-		outfile = fname(inputfile)
-		fout = codecs.open(outfile,'w','utf-8')
-		splits = data.split(u'<div class="heading">न्यासः</div>')
-		if len(splits) == 2:
-			splits2 = splits[1].split(u'<div class="heading">बाल-मनोरमा</div>')
-			if len(splits2) == 2:
-				nyasadata = splits2[0]
-			else:
-				splits2 = splits[1].split(u'<div class="heading">तत्त्व-बोधिनी</div>')
-				if len(splits2) != 2:
-					if len(splits2) == 1:
-						splits2 = splits[1].split(u'</body></html>')
-						nyasadata = splits2[0]
-					else:
-						flog.write(inputfile+'\n'+str(len(splits2))+' next item issue\n')
-						nyasadata = ''
-				else:
-					nyasadata = splits2[0]
-		else:
-			nyasadata = ''
-			flog.write(inputfile+'\n'+str(len(splits))+' nyasa issue\n')
-		nyasadata = postprocess(nyasadata)
-		fout.write(nyasadata)
-	flog.close()
-	
\ No newline at end of file
+	regenerate(inputfiles,tuple(sys.argv[1:]) or ('nyasa',))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+textindex.py
+Inverted index of the commentary corpus, for word, phrase and prefix search across books.
+
+Files are tokenized as for the n-gram reports (ngramindex.slp1words: frontmatter stripped,
+SLP1 words, optionally through an ngramindex.Slp1Cache) and every word occurrence is stored as a posting (token,file,offset), offset being
+the position of the word in the file. The index is an SQLite file: postings are clustered by
+token, so a query reads only the postings of its own tokens. update() re-tokenizes only files
+whose content changed.
+
+Queries may be written in SLP1, Devanagari (detected), or any scheme with a <scheme>_slp1.xml
+transcoder, e.g. 'itrans' or 'hk':
+	index = TextIndex()
+	index.update()
+	index.search(u'वृद्धिरादैच्')			# [(book,suutra_id,offset)]
+	index.search('iko yaNachi',scheme='itrans')	# phrase
+	index.prefix('vfdD')				# [(token,book,suutra_id,offset)]
+"""
+import hashlib,re,sqlite3
+
+from ashtadhyayi_data.correction import corpus
+from ashtadhyayi_data.correction.ngram import ngramindex, transcoder
+
+DEVANAGARI = re.compile(u'[ऀ-ॿ]')
+SCHEMA = [
+	'CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, book TEXT, suutra_id TEXT, hash TEXT, words TEXT)',
+	'CREATE TABLE IF NOT EXISTS postings (token TEXT, file INTEGER, offset INTEGER, PRIMARY KEY (token,file,offset)) WITHOUT ROWID',
+]
+
+def normalize(query,scheme=None):
+	# The SLP1 words of a query, tokenized as slp1words() does for the corpus.
+	if scheme is None:
+		scheme = 'deva' if DEVANAGARI.search(query) else 'slp1'
+	if scheme != 'slp1':
+		query = transcoder.transcoder_processString(query,scheme,'slp1')
+	query = re.sub('[^a-zA-Z \']+','',query)
+	return [word for word in query.split(' ') if word != '']
+
+class TextIndex(object):
+	def __init__(self,dbfile='textindex.sqlite',root='../..',books=corpus.booklist,slp1cache=None):
+		self.dbfile = dbfile
+		self.slp1cache = slp1cache
+		self.root = root
+		self.books = books
+		self.connection = sqlite3.connect(dbfile)
+		for statement in SCHEMA:
+			self.connection.execute(statement)
+
+	def close(self):
+		self.connection.close()
+
+	def update(self):
+		"""
+		Brings the index in line with the files on disk. Returns the number of files which were
+		(re-)tokenized.
+		"""
+		known = {path: (fileid,digest) for (fileid,path,digest) in self.connection.execute('SELECT id,path,hash FROM files')}
+		seen = set()
+		changed = 0
+		with self.connection:
+			for entry in corpus.walk(self.root,self.books,pattern='*.*'):
+				seen.add(entry.path)
+				with open(entry.path,'rb') as fin:
+					raw = fin.read()
+				digest = hashlib.sha1(raw).hexdigest()
+				(fileid,olddigest) = known.get(entry.path,(None,None))
+				if olddigest == digest:
+					continue
+				if fileid is not None:
+					self.remove(fileid)
+				data = raw.decode('utf-8')
+				words = self.slp1cache.slp1words(data,digest) if self.slp1cache is not None else ngramindex.slp1words(data)
+				fileid = self.connection.execute('INSERT INTO files (path,book,suutra_id,hash,words) VALUES (?,?,?,?,?)',(entry.path,entry.book,entry.suutra_id,digest,' '.join(words))).lastrowid
+				self.connection.executemany('INSERT OR IGNORE INTO postings VALUES (?,?,?)',((word,fileid,offset) for (offset,word) in enumerate(words)))
+				changed += 1
+			for (path,(fileid,digest)) in known.items():
+				if path not in seen:
+					self.remove(fileid)
+		if self.slp1cache is not None:
+			if corpus.iswhole(self.books):
+				self.slp1cache.prune(digest for (digest,) in self.connection.execute('SELECT hash FROM files'))
+			self.slp1cache.save()
+		return changed
+
+	def remove(self,fileid):
+		# The postings of a file are found through its own words, so no index by file is needed.
+		(words,) = self.connection.execute('SELECT words FROM files WHERE id = ?',(fileid,)).fetchone()
+		self.connection.executemany('DELETE FROM postings WHERE token = ? AND file = ?',((word,fileid) for word in set(words.split(' '))))
+		self.connection.execute('DELETE FROM files WHERE id = ?',(fileid,))
+
+	def search(self,query,scheme=None):
+		"""
+		(book,suutra_id,offset) of each occurrence of the word or phrase query, offset being
+		that of its first word. See normalize() for scheme.
+		"""
+		words = normalize(query,scheme)
+		if not words:
+			return []
+		joins = ''.join(' JOIN postings p%d ON p%d.token = ? AND p%d.file = p0.file AND p%d.offset = p0.offset + %d' % (i,i,i,i,i) for i in range(1,len(words)))
+		sql = 'SELECT f.book,f.suutra_id,p0.offset FROM postings p0'+joins+' JOIN files f ON f.id = p0.file WHERE p0.token = ? ORDER BY f.path,p0.offset'
+		return self.connection.execute(sql,words[1:]+words[:1]).fetchall()
+
+	def prefix(self,query,scheme=None,limit=None):
+		"""(token,book,suutra_id,offset) of each word starting with query (a single word)."""
+		words = normalize(query,scheme)
+		if len(words) != 1:
+			return []
+		sql = 'SELECT p.token,f.book,f.suutra_id,p.offset FROM postings p JOIN files f ON f.id = p.file WHERE p.token >= ? AND p.token < ? ORDER BY p.token,f.path,p.offset'
+		parameters = [words[0],words[0]+u'\U0010ffff']
+		if limit is not None:
+			sql += ' LIMIT ?'
+			parameters.append(limit)
+		return self.connection.execute(sql,parameters).fetchall()
+
+	def context(self,book,suutra_id,offset,width=5):
+		# The words around an occurrence, in SLP1.
+		row = self.connection.execute('SELECT words FROM files WHERE book = ? AND suutra_id = ?',(book,suutra_id)).fetchone()
+		if row is None:
+			return ''
+		words = row[0].split(' ')
+		return ' '.join(words[max(0,offset-width):offset+width+1])
+
+if __name__=="__main__":
+	import sys
+	index = TextIndex()
+	print(index.update(),'files indexed')
+	for (book,suutra_id,offset) in index.search(' '.join(sys.argv[1:])):
+		print(book,suutra_id,index.context(book,suutra_id,offset))
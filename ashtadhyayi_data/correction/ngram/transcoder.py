@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+transcoder.py
+Transliteration driven by the finite state transcoders of data/transcoder/<from>_<to>.xml.
+
+Each <e> entry of an fsm reads: in state(s) <s>, on input <in>, emit <out> and go to state
+<next> (the start state if absent). An input may carry a condition on the text following it,
+as in 'k/^([^aA...])'; the bare condition '/^' of deva_slp1.xml stands for 'not followed by a
+vowel sign, virama or accent', which transcoder.php hard-codes. Conditions hold at the end of
+the text. The longest input wins; text matching no entry is copied and resets the state.
+
+Each state is compiled to a table from input to (condition, out, next), looked up longest
+input first, with conditions as precompiled lookaheads; runs of text which can not start any
+input are copied in one step. A transcoder is compiled once per process.
+
+transcoder_processString(text,'deva','slp1') transliterates a whole document in one pass.
+"""
+import codecs,os,re
+from functools import lru_cache
+from xml.etree import ElementTree
+
+TRANSCODER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'data','transcoder')
+# Dependent vowel signs, virama and accents; see the comment in deva_slp1.xml.
+DEVA_SIGNS = u'ािीुूृॄॢॣॆेैॊोौ्॒॑'
+
+def unescape(text):
+	# \uXXXX escapes as used in the xml files.
+	return re.sub(r'\\u([0-9a-fA-F]{4})',lambda m: chr(int(m.group(1),16)),text or '')
+
+def readfsm(xmlfile):
+	"""(start,entries) of an fsm xml file; entries are (states,input,condition,output,next)."""
+	root = ElementTree.parse(xmlfile).getroot()
+	start = root.get('start')
+	entries = []
+	for e in root.iter('e'):
+		states = e.findtext('s').split(',')
+		inputtext = e.findtext('in') or ''
+		condition = None
+		if '/^' in inputtext and len(inputtext) > 2:
+			(inputtext,condition) = inputtext.split('/^',1)
+		inputtext = unescape(inputtext)
+		if inputtext == '':
+			continue
+		nextstate = e.findtext('next')
+		entries.append((states,inputtext,condition,unescape(e.findtext('out')),nextstate.strip() if nextstate else None))
+	return (start,entries)
+
+def lookahead(condition):
+	if condition is None:
+		return ''
+	if condition == '':
+		return '(?![%s])' % DEVA_SIGNS
+	return '(?=%s|\\Z)' % condition
+
+class Transcoder(object):
+	def __init__(self,xmlfile):
+		(self.start,entries) = readfsm(xmlfile)
+		# state -> (table,lengths,rawpattern): table maps an input to its (condition,output,next)
+		# alternatives, conditional ones first; lengths are the input lengths, longest first;
+		# rawpattern matches a run of text which can not start an input.
+		self.states = {}
+		for (entrystates,inputtext,condition,output,nextstate) in entries:
+			if condition is not None:
+				condition = re.compile(lookahead(condition))
+			for state in entrystates:
+				(table,lengths,rawpattern) = self.states.setdefault(state,({},[],None))
+				table.setdefault(inputtext,[]).append((condition,output,nextstate or self.start))
+		for (state,(table,lengths,rawpattern)) in self.states.items():
+			for alternatives in table.values():
+				alternatives.sort(key=lambda alternative: alternative[0] is None)
+			lengths = sorted(set(len(inputtext) for inputtext in table),reverse=True)
+			firstchars = ''.join(sorted(set(re.escape(inputtext[0]) for inputtext in table)))
+			self.states[state] = (table,lengths,re.compile('[^%s]+' % firstchars))
+
+	def transcode(self,text):
+		output = []
+		state = self.start
+		position = 0
+		end = len(text)
+		while position < end:
+			(table,lengths,rawpattern) = self.states.get(state,self.states[self.start])
+			m = rawpattern.match(text,position)
+			if m is not None:
+				output.append(m.group())
+				position = m.end()
+				state = self.start
+				continue
+			for length in lengths:
+				alternatives = table.get(text[position:position+length])
+				if alternatives is None:
+					continue
+				for (condition,out,nextstate) in alternatives:
+					if condition is None or condition.match(text,position+length):
+						break
+				else:
+					continue
+				output.append(out)
+				position += length
+				state = nextstate
+				break
+			else:
+				# A character which starts an input, none of which match here.
+				output.append(text[position])
+				position += 1
+				state = self.start
+		return ''.join(output)
+
+@lru_cache(maxsize=None)
+def gettranscoder(sfrom,sto):
+	return Transcoder(os.path.join(TRANSCODER_DIR,'%s_%s.xml' % (sfrom,sto)))
+
+def transcoder_processString(text,sfrom,sto):
+	return gettranscoder(sfrom,sto).transcode(text)
+
+def transcodefile(inputfile,sfrom,sto):
+	with codecs.open(inputfile,'r','utf-8') as fin:
+		return transcoder_processString(fin.read(),sfrom,sto)
@@ -0,0 +1,65 @@
+# This Python file uses the following encoding: utf-8
+"""
+Corrections as corpus.run() plugins (see corpus.py for the interface), and the scanning
+primitives (misplacedrepha, findbrackets, bodystart) of the suspect detectors in detectors.py.
+"""
+import re
+from collections import OrderedDict
+
+from ashtadhyayi_data.correction import corrections
+
+def hrhy(entry,data):
+	# hr/hy corrections of corrections.changelist2.
+	return (corrections.replacer2.replace(data),[])
+
+# A repha written after the following conjunct (सावण्र्यं) instead of before it (सावर्ण्यं).
+misplacedrepha = re.compile(u'([क-ह])्र्([क-ह])')
+
+def issue6(entry,data):
+	# Issue 6: `quoted' text closed by ' instead of `.
+	lines = data.splitlines(True)
+	for (i,line) in enumerate(lines):
+		if re.search(u"([`][^']*')",line):
+			m = re.findall(u"[`]([^']*['])",line)
+			for match in m:
+				rep = match.rstrip("'")+"`"
+				line = line.replace(match,rep)
+			lines[i] = line
+	return (''.join(lines),[])
+
+# Issue 10: a word damaged by a (), e.g. आ()आलायन. Words are separated by whitespace, , ` and :
+# (the list format cannot hold a :).
+# The lookbehind anchors every match at the start of a word, so the scan stays linear.
+damagedword = re.compile(r'(?<![^\s,`:])[^\s,`:]*\(\)[^\s,`:]*')
+
+def bodystart(data):
+	# Offset of the text after the frontmatter (0 if there is none).
+	parts = data.split('---',2)
+	if len(parts) < 3:
+		return 0
+	return len(parts[0])+len(parts[1])+6
+
+def findbrackets(data,start=None):
+	"""
+	Yields (word,offset,line,column) for each ()-damaged word of the body of data (from start,
+	if the body offset is already known), in one finditer pass. offset is into data; line and
+	column are 1-based.
+	"""
+	line = 1
+	linestart = 0
+	lastoffset = 0
+	for m in damagedword.finditer(data,bodystart(data) if start is None else start):
+		offset = m.start()
+		newlines = data.count('\n',lastoffset,offset)
+		if newlines:
+			line += newlines
+			linestart = data.rfind('\n',lastoffset,offset)+1
+		lastoffset = offset
+		yield (m.group(0),offset,line,offset-linestart+1)
+
+# name -> (plugin, record file written by python -m ashtadhyayi_data.correction.corpus). The suspect
+# lists (rephalist.txt, issues/10/issue10.txt ...) are written by detectors.py.
+PLUGINS = OrderedDict([
+	('hrhy',(hrhy,None)),
+	('issue6',(issue6,None)),
+])
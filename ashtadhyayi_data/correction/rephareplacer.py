@@ -1,25 +1,9 @@
 # This Python file uses the following encoding: utf-8
-import re,codecs,sys
+from ashtadhyayi_data.correction import replacementlist
 def rephareplacer(inputfile):
-	fin = codecs.open(inputfile,'r','utf-8')
-	data = fin.readlines()
-	fin.close()
-	pendingfile = codecs.open('nonchanged.txt','w','utf-8')
-	for datum in data:
-		if datum[0] in [u';',u'’',u'?']:
-			pendingfile.write(datum)
-		else:
-			split = datum.split(':')
-			changefile = str(split[2]).strip()
-			existing = split[0]
-			replacement = split[1]
-			fchange = codecs.open(changefile,'r','utf-8')
-			inputdata = fchange.read()
-			fchange.close()
-			outputdata = inputdata.replace(existing,replacement)
-			fchange1 = codecs.open(changefile,'w','utf-8')
-			fchange1.write(outputdata)
-			fchange1.close()
-	pendingfile.close()
-rephareplacer('rephalistforchecking.txt')
-			
\ No newline at end of file
+	# Lines starting with ; ’ or ? are kept aside in nonchanged.txt; the rest are applied grouped by file.
+	results = replacementlist.applylist(inputfile,root='.',pendingfile='nonchanged.txt')
+	replacementlist.printreport(results)
+	return results
+if __name__=="__main__":
+	rephareplacer('rephalistforchecking.txt')
@@ -0,0 +1,134 @@
+# This Python file uses the following encoding: utf-8
+"""
+Applies orig:fix:path replacement lists, e.g. rephalistforchecking.txt or
+issues/10/bracketReplacementListManuallyCorrected.txt.
+
+Entries are grouped by target file. Each file is read once, all of its substitutions are applied
+in list order through a compiled corrections.MultiReplacer, and the result is written atomically.
+File groups are processed on a process pool. A replacer is built once per distinct pair list
+in each process, and applytoall() sends a list shared by every file to each worker only once.
+"""
+import codecs,os,stat,sys,tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from ashtadhyayi_data.correction.corrections import MultiReplacer
+
+# Lines starting with one of these are still to be reviewed.
+PENDINGMARKERS = (u';',u'’',u'?')
+
+def readlist(listfile,pendingmarkers=PENDINGMARKERS):
+	"""
+	Returns (groups,pending). groups maps each target path (with / separators) to its
+	ordered (orig,fix) pairs. Lines starting with one of pendingmarkers, without three fields
+	or with an empty orig are not applied and are returned in pending.
+	"""
+	groups = OrderedDict()
+	pending = []
+	with codecs.open(listfile,'r','utf-8') as fin:
+		for datum in fin:
+			if datum.strip() == '':
+				continue
+			split = datum.split(':')
+			if datum[0] in pendingmarkers or len(split) < 3 or split[0] == '':
+				pending.append(datum)
+				continue
+			# bracketReplacementList*.txt were made on Windows and use backslashes.
+			changefile = str(split[2]).strip().replace('\\','/')
+			groups.setdefault(changefile,[]).append((split[0],split[1]))
+	return (groups,pending)
+
+def targetpath(root,changefile):
+	return os.path.join(root,*changefile.split('/'))
+
+def writeatomic(filein,data):
+	# mkstemp creates the file 0600, so an existing file keeps its own mode.
+	(fd,tmppath) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filein)),suffix='.tmp')
+	try:
+		with codecs.getwriter('utf-8')(os.fdopen(fd,'wb')) as fout:
+			fout.write(data)
+		if os.path.exists(filein):
+			os.chmod(tmppath,stat.S_IMODE(os.stat(filein).st_mode))
+		os.replace(tmppath,filein)
+	except BaseException:
+		os.remove(tmppath)
+		raise
+
+@lru_cache(maxsize=8)
+def getreplacer(pairs):
+	# The MultiReplacer of a tuple of (orig,fix) pairs; compiling a long list takes seconds.
+	return MultiReplacer(pairs)
+
+def applygroup(group,dry_run=False):
+	"""
+	Applies the (orig,fix) pairs of one file. Returns (path,made,notmatched): the number of
+	substitutions made and the number of entries whose orig was not found.
+	"""
+	(filein,pairs) = group
+	pairs = tuple(pairs)
+	if not os.path.isfile(filein):
+		return (filein,0,len(pairs))
+	with codecs.open(filein,'r','utf-8') as fin:
+		data = fin.read()
+	(newdata,counts) = getreplacer(pairs).replacecount(data)
+	made = sum(counts.values())
+	notmatched = len([pre for (pre,post) in pairs if counts.get(pre,0) == 0])
+	if newdata != data and not dry_run:
+		writeatomic(filein,newdata)
+	return (filein,made,notmatched)
+
+def applylist(listfile,root='.',pendingfile=None,workers=None,dry_run=False):
+	"""
+	Applies every entry of listfile, with target paths taken relative to root. Lines which
+	are not applied are written to pendingfile, if given. Returns the per-file
+	(path,made,notmatched) counts in the order the files first appear in the list.
+	"""
+	(groups,pending) = readlist(listfile)
+	if pendingfile is not None:
+		with codecs.open(pendingfile,'w','utf-8') as fpending:
+			fpending.write(''.join(pending))
+	return applygroups(groups,root,workers,dry_run)
+
+_sharedpairs = None
+
+def _init_shared(pairs):
+	# The pairs of applytoall() are sent to each worker once, and compiled there once.
+	global _sharedpairs
+	_sharedpairs = tuple(pairs)
+	getreplacer(_sharedpairs)
+
+def applyshared(filein,dry_run=False):
+	return applygroup((filein,_sharedpairs),dry_run)
+
+def applytoall(pairs,changefiles,root='.',workers=None,dry_run=False):
+	# Applies the same (orig,fix) pairs to each of changefiles. Returns applygroup() counts, in order.
+	paths = [targetpath(root,changefile) for changefile in changefiles]
+	if workers == 1:
+		_init_shared(pairs)
+		return [applyshared(path,dry_run) for path in paths]
+	with ProcessPoolExecutor(max_workers=workers,initializer=_init_shared,initargs=(pairs,)) as executor:
+		return list(executor.map(applyshared,paths,[dry_run]*len(paths),chunksize=16))
+
+def mergedpairs(groups):
+	# All (orig,fix) pairs of groups, in list order, for lists applied to every file.
+	return [pair for pairs in groups.values() for pair in pairs]
+
+def applygroups(groups,root='.',workers=None,dry_run=False):
+	# Applies {changefile: [(orig,fix)]} groups (see readlist()) on a process pool.
+	jobs = [(targetpath(root,changefile),pairs) for (changefile,pairs) in groups.items()]
+	if workers == 1:
+		return [applygroup(job,dry_run) for job in jobs]
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		return list(executor.map(applygroup,jobs,[dry_run]*len(jobs),chunksize=16))
+
+def printreport(results,out=sys.stdout):
+	for (filein,made,notmatched) in results:
+		out.write('%s\t%d\t%d\n' % (filein,made,notmatched))
+	out.write('%d files, %d substitutions made, %d entries not matched\n' % (len(results),sum(r[1] for r in results),sum(r[2] for r in results)))
+
+if __name__=="__main__":
+	# python replacementlist.py LISTFILE [ROOT]
+	listfile = sys.argv[1]
+	root = sys.argv[2] if len(sys.argv) > 2 else '.'
+	printreport(applylist(listfile,root))
@@ -0,0 +1,213 @@
+# This Python file uses the following encoding: utf-8
+"""
+SQLite store of suspect lists (suspecttrigrams.txt, suspecthr.txt, rephalistforchecking.txt,
+bracketReplacementList.txt, <book>_<n>gram_suspect.txt ...).
+
+Each suspect is a row (detector,book,path,word,fix,extra,status), unique on
+(detector,path,word,fix), so adding a suspect twice is a no-op. Paths are stored normalized
+(see normalizepath()), relative to the corpus root, so the same file listed as
+'../../kashika/pada-1.1\\1.1.1.md' and 'kashika/pada-1.1/1.1.1.md' is one suspect. Rows are
+indexed by word, path, book and (detector,status). status is one of STATUSES; imported and
+detected suspects start pending. Lists are imported from and exported back to their text formats:
+	list	word:fix:path[:extra], one per line
+	report	path line, then word:word:book:extra (as ngramindex.writesuspects())
+Lines of a list starting with one of replacementlist.PENDINGMARKERS stay pending whatever status
+they are imported with. apply() applies the accepted fixes grouped by file, through
+replacementlist.applygroups(), and marks them applied, so running it again does nothing.
+
+Usage:
+python -m ashtadhyayi_data.correction.suspectstore import DETECTOR LISTFILE [list|report] [STATUS]
+python -m ashtadhyayi_data.correction.suspectstore export DETECTOR LISTFILE [list|report] [STATUS]
+python -m ashtadhyayi_data.correction.suspectstore apply [CORPUSROOT] [DETECTOR]
+"""
+import codecs,re,sqlite3,sys
+from collections import OrderedDict
+
+from ashtadhyayi_data.correction import corpus, replacementlist
+
+STATUSES = ('pending','accepted','rejected','applied')
+SCHEMA = [
+	"CREATE TABLE IF NOT EXISTS suspects (id INTEGER PRIMARY KEY, detector TEXT NOT NULL, book TEXT NOT NULL, path TEXT NOT NULL, word TEXT NOT NULL, fix TEXT NOT NULL, extra TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', UNIQUE (detector,path,word,fix))",
+	'CREATE INDEX IF NOT EXISTS suspects_by_word ON suspects (word)',
+	'CREATE INDEX IF NOT EXISTS suspects_by_path ON suspects (path)',
+	'CREATE INDEX IF NOT EXISTS suspects_by_book ON suspects (book)',
+	'CREATE INDEX IF NOT EXISTS suspects_by_detector ON suspects (detector,status)',
+]
+
+def normalizepath(path):
+	# path with / separators and without leading ./ and ../, i.e. relative to the corpus root.
+	path = path.strip().replace('\\','/')
+	while path.startswith('../') or path.startswith('./'):
+		path = path[path.index('/')+1:]
+	return path
+
+def bookof(path):
+	# The corpus book a path is in ('' if none).
+	for part in re.split(r'[\\/]',path):
+		if part in corpus.booklist:
+			return part
+	return ''
+
+def parselist(lines,status='pending'):
+	"""
+	Yields (book,path,word,fix,extra,status) for each word:fix:path[:extra] line; lines with
+	fewer fields are skipped.
+	"""
+	for line in lines:
+		line = line.rstrip('\r\n')
+		split = line.split(':',3)
+		if len(split) < 3 or split[0] == '':
+			continue
+		(word,fix,path) = split[:3]
+		path = normalizepath(path)
+		extra = split[3] if len(split) > 3 else ''
+		yield (bookof(path),path,word,fix,extra,'pending' if word[0] in replacementlist.PENDINGMARKERS else status)
+
+def parsereport(lines,status='pending'):
+	# Yields (book,path,word,fix,extra,status) for each entry of a <book>_<n>gram_suspect.txt report.
+	path = None
+	for line in lines:
+		line = line.rstrip('\r\n')
+		split = line.split(':',3)
+		if len(split) < 4:
+			path = normalizepath(line)
+			continue
+		if path is not None:
+			yield (split[2],path,split[0],split[1],split[3],status)
+
+def formatlist(book,path,word,fix,extra):
+	return word+':'+fix+':'+path+(':'+extra if extra else '')
+
+def formatreport(book,path,word,fix,extra):
+	return path+'\n'+word+':'+fix+':'+book+':'+extra
+
+def parserecords(records,status='pending'):
+	# detectors.run() records: word:fix:path[:extra] lines, or path\nword:word:book:extra reports (as detectors.ngram()).
+	for record in records:
+		if '\n' in record:
+			yield from parsereport(record.split('\n'),status)
+		else:
+			yield from parselist([record],status)
+
+PARSERS = {'list': parselist, 'report': parsereport}
+FORMATTERS = {'list': formatlist, 'report': formatreport}
+
+def checkstatus(status):
+	if status not in STATUSES:
+		raise ValueError('Unknown status %r, not one of %s' % (status,', '.join(STATUSES)))
+
+class SuspectStore(object):
+	def __init__(self,dbfile='suspects.sqlite'):
+		self.dbfile = dbfile
+		self.connection = sqlite3.connect(dbfile)
+		for statement in SCHEMA:
+			self.connection.execute(statement)
+
+	def close(self):
+		self.connection.close()
+
+	def addrows(self,detector,rows):
+		# Inserts (book,path,word,fix,extra,status) rows, skipping known ones. Returns the number inserted.
+		before = self.connection.total_changes
+		with self.connection:
+			self.connection.executemany('INSERT OR IGNORE INTO suspects (detector,book,path,word,fix,extra,status) VALUES (?,?,?,?,?,?,?)',((detector,)+tuple(row) for row in rows))
+		return self.connection.total_changes-before
+
+	def add(self,detector,records,status='pending'):
+		"""
+		Adds records made by detectors.run(), in list or report format (see parserecords()),
+		skipping those already in the store. Returns the number added.
+		"""
+		checkstatus(status)
+		return self.addrows(detector,parserecords(records,status))
+
+	def importlist(self,detector,listfile,format='list',status='pending'):
+		# Streams a list file of the given format (see PARSERS) into the store. Returns the number of new suspects.
+		checkstatus(status)
+		with codecs.open(listfile,'r','utf-8') as fin:
+			return self.addrows(detector,PARSERS[format](fin,status))
+
+	def select(self,detector=None,book=None,path=None,word=None,status=None,columns='book,path,word,fix,extra'):
+		# A cursor over the matching suspects, in insertion order.
+		conditions = []
+		parameters = []
+		for (column,value) in [('detector',detector),('book',book),('path',path),('word',word),('status',status)]:
+			if value is not None:
+				conditions.append(column+' = ?')
+				parameters.append(value)
+		sql = 'SELECT '+columns+' FROM suspects'+(' WHERE '+' AND '.join(conditions) if conditions else '')+' ORDER BY id'
+		return self.connection.execute(sql,parameters)
+
+	def exportlines(self,detector=None,format='list',status=None,book=None):
+		# Yields the lines of the matching suspects in the given format (see FORMATTERS).
+		formatter = FORMATTERS[format]
+		for row in self.select(detector=detector,book=book,status=status):
+			yield formatter(*row)
+
+	def exportlist(self,listfile,detector=None,format='list',status=None,book=None):
+		# Writes the matching suspects to listfile. Returns the number written.
+		count = 0
+		with codecs.open(listfile,'w','utf-8') as fout:
+			for line in self.exportlines(detector,format,status,book):
+				fout.write(line+'\n')
+				count += 1
+		return count
+
+	def setstatus(self,status,ids=None,detector=None,path=None,word=None,fix=None):
+		"""
+		Sets the status of the suspects with the given ids, or else of those matching detector,
+		path and word. A fix, if given, replaces the proposed one. Returns the number of suspects
+		changed.
+		"""
+		checkstatus(status)
+		assignments = 'status = ?'+(', fix = ?' if fix is not None else '')
+		values = [status]+([fix] if fix is not None else [])
+		with self.connection:
+			if ids is not None:
+				return self.connection.executemany('UPDATE OR IGNORE suspects SET '+assignments+' WHERE id = ?',([*values,i] for i in ids)).rowcount
+			conditions = []
+			for (column,value) in [('detector',detector),('path',path),('word',word)]:
+				if value is not None:
+					conditions.append(column+' = ?')
+					values.append(value)
+			if not conditions:
+				raise ValueError('setstatus needs ids or at least one of detector, path, word')
+			return self.connection.execute('UPDATE OR IGNORE suspects SET '+assignments+' WHERE '+' AND '.join(conditions),values).rowcount
+
+	def counts(self,detector=None):
+		# {status: number of suspects}
+		sql = 'SELECT status,count(*) FROM suspects'+(' WHERE detector = ?' if detector is not None else '')+' GROUP BY status'
+		return dict(self.connection.execute(sql,[detector] if detector is not None else []))
+
+	def acceptedgroups(self,detector=None):
+		# {path: [(word,fix)]} of the accepted suspects, as replacementlist.readlist().
+		groups = OrderedDict()
+		for (path,word,fix) in self.select(detector=detector,status='accepted',columns='path,word,fix'):
+			groups.setdefault(path,[]).append((word,fix))
+		return groups
+
+	def apply(self,root='..',detector=None,workers=None,dry_run=False):
+		"""
+		Applies the accepted fixes, each file once, with paths taken relative to the corpus root,
+		and marks them applied (unless dry_run). Returns replacementlist.applygroups() counts.
+		"""
+		ids = [suspectid for (suspectid,) in self.select(detector=detector,status='accepted',columns='id')]
+		results = replacementlist.applygroups(self.acceptedgroups(detector),root,workers,dry_run)
+		if not dry_run:
+			self.setstatus('applied',ids=ids)
+		return results
+
+if __name__=="__main__":
+	store = SuspectStore()
+	command = sys.argv[1]
+	if command == 'import':
+		print(store.importlist(sys.argv[2],sys.argv[3],*sys.argv[4:6]),'suspects added')
+	elif command == 'export':
+		(detector,listfile) = sys.argv[2:4]
+		format = sys.argv[4] if len(sys.argv) > 4 else 'list'
+		status = sys.argv[5] if len(sys.argv) > 5 else None
+		print(store.exportlist(listfile,detector,format,status),'suspects written')
+	elif command == 'apply':
+		root = sys.argv[2] if len(sys.argv) > 2 else '..'
+		replacementlist.printreport(store.apply(root,sys.argv[3] if len(sys.argv) > 3 else None))
+	store.close()
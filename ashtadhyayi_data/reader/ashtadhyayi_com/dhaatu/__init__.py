@@ -1,27 +1,124 @@
-import codecs
+import functools
+import hashlib
 import json
 import os
+import pickle
 
-DHAATU_FILES_DIR = "/home/vvasuki/sanskrit/raw_etexts/vyAkaraNam/aShTAdhyAyI-com-data/dhatu"
+import regex
 
+DHAATU_FILES_DIR = os.environ.get("ASHTADHYAYI_COM_DHAATU_DIR", "/home/vvasuki/sanskrit/raw_etexts/vyAkaraNam/aShTAdhyAyI-com-data/dhatu")
+# Pickled snapshots of data.txt, so that later processes skip the json parse.
+SNAPSHOT_DIR = os.environ.get("ASHTADHYAYI_DHAATU_SNAPSHOT_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ashtadhyayi_data", "dhaatu"))
 
-dhaatu_dict = {}
 
+class DhaatuRegistry(object):
+  """The dhaatus of data.txt by baseindex, in file order, with indexes by dhatu, aupadeshik, gana and upasarga."""
 
-def set_dhaatu_dict():
-  with codecs.open(os.path.join(DHAATU_FILES_DIR, "data.txt"), "r") as dhaatu_file:
-    dhaatu_list = json.load(dhaatu_file)["data"]
+  def __init__(self, dhaatu_list):
+    self.dhaatu_dict = {}
+    self._indexes = {"dhatu": {}, "aupadeshik": {}, "gana": {}, "upasarga": {}}
     for dhaatu in dhaatu_list:
-      dhaatu_dict[dhaatu["baseindex"]] = dhaatu
+      self.dhaatu_dict[dhaatu["baseindex"]] = dhaatu
+    for (baseindex, dhaatu) in self.dhaatu_dict.items():
+      keys = {"dhatu": [dhaatu.get("dhatu")], "aupadeshik": [dhaatu.get("aupadeshik")], "gana": [get_gana(dhaatu)], "upasarga": [upasarga.get("name") for upasarga in dhaatu.get("upasargas") or []]}
+      for (index_name, index_keys) in keys.items():
+        for key in index_keys:
+          if key not in (None, "", "-"):
+            self._indexes[index_name].setdefault(key, []).append(baseindex)
 
+  def __getitem__(self, baseindex):
+    return self.dhaatu_dict[baseindex]
 
-def get_sanskrit_lakaara(lakaara_code):
-  import regex
-  lakaara = regex.sub("^p", "परस्मैपदि-", lakaara_code)
-  lakaara = regex.sub("^a", "आत्मनेपदि-", lakaara)
-  lakaara = lakaara.replace("la", "ल").replace("li", "लि").replace("lru", "लृ").replace("lu", "लु").replace("le", "ले").replace("lo", "लो").replace("t", "ट्").replace("vidhi", "विधि").replace("ashir", "आशीर्").replace("ng", "ङ्")
-  return lakaara
+  def __contains__(self, baseindex):
+    return baseindex in self.dhaatu_dict
+
+  def __iter__(self):
+    return iter(self.dhaatu_dict)
+
+  def __len__(self):
+    return len(self.dhaatu_dict)
+
+  def get(self, baseindex, default=None):
+    return self.dhaatu_dict.get(baseindex, default)
+
+  def items(self):
+    return self.dhaatu_dict.items()
+
+  def _lookup(self, index_name, key):
+    return [self.dhaatu_dict[baseindex] for baseindex in self._indexes[index_name].get(key, [])]
+
+  def by_dhatu(self, dhatu):
+    return self._lookup("dhatu", dhatu)
+
+  def by_aupadeshik(self, aupadeshik):
+    return self._lookup("aupadeshik", aupadeshik)
+
+  def by_gana(self, gana):
+    """gana is as in get_gana(), e.g. "01" for bhvAdi."""
+    return self._lookup("gana", gana)
+
+  def by_upasarga(self, upasarga):
+    return self._lookup("upasarga", upasarga)
+
+
+def get_gana(dhaatu):
+  # baseindex is <gana>.<serial>, e.g. 01.0001.
+  return dhaatu.get("gana") or dhaatu["baseindex"].split(".")[0]
 
 
-set_dhaatu_dict()
+def _read_dhaatu_list(data_path):
+  with open(data_path, "r", encoding="utf-8") as dhaatu_file:
+    return json.load(dhaatu_file)["data"]
 
+
+def get_snapshot_path(data_path):
+  path_hash = hashlib.sha1(os.path.abspath(data_path).encode("utf-8")).hexdigest()[:10]
+  return os.path.join(SNAPSHOT_DIR, "data_%s.pickle" % path_hash)
+
+
+@functools.lru_cache(maxsize=None)
+def get_dhaatu_registry(data_dir=None, use_snapshot=True):
+  """The DhaatuRegistry of data_dir/data.txt (default DHAATU_FILES_DIR), loaded on first use.
+
+  With use_snapshot, the parsed list is also pickled under SNAPSHOT_DIR and reused while data.txt keeps its mtime and size.
+  """
+  data_path = os.path.join(data_dir or DHAATU_FILES_DIR, "data.txt")
+  if not use_snapshot:
+    return DhaatuRegistry(_read_dhaatu_list(data_path))
+  stat = os.stat(data_path)
+  source_key = (stat.st_mtime_ns, stat.st_size)
+  snapshot_path = get_snapshot_path(data_path)
+  if os.path.exists(snapshot_path):
+    with open(snapshot_path, "rb") as snapshot_file:
+      (snapshot_key, dhaatu_list) = pickle.load(snapshot_file)
+    if snapshot_key == source_key:
+      return DhaatuRegistry(dhaatu_list)
+  dhaatu_list = _read_dhaatu_list(data_path)
+  os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+  tmp_path = snapshot_path + ".tmp"
+  with open(tmp_path, "wb") as snapshot_file:
+    pickle.dump((source_key, dhaatu_list), snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+  os.replace(tmp_path, snapshot_path)
+  return DhaatuRegistry(dhaatu_list)
+
+
+def __getattr__(name):
+  # dhaatu_dict used to be filled at import time; it is now read on first access.
+  if name == "dhaatu_dict":
+    return get_dhaatu_registry().dhaatu_dict
+  raise AttributeError(name)
+
+
+LAKAARA_PADA_PREFIXES = [(regex.compile("^p"), "परस्मैपदि-"), (regex.compile("^a"), "आत्मनेपदि-")]
+LAKAARA_REPLACEMENTS = [("la", "ल"), ("li", "लि"), ("lru", "लृ"), ("lu", "लु"), ("le", "ले"), ("lo", "लो"), ("t", "ट्"), ("vidhi", "विधि"), ("ashir", "आशीर्"), ("ng", "ङ्")]
+
+
+@functools.lru_cache(maxsize=None)
+def get_sanskrit_lakaara(lakaara_code):
+  # There are only a few lakaara codes, so each is worked out once.
+  lakaara = lakaara_code
+  for (pattern, prefix) in LAKAARA_PADA_PREFIXES:
+    lakaara = pattern.sub(prefix, lakaara)
+  for (roman, devanagari) in LAKAARA_REPLACEMENTS:
+    lakaara = lakaara.replace(roman, devanagari)
+  return lakaara
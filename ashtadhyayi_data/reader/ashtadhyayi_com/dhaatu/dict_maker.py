@@ -1,13 +1,13 @@
 import codecs
-import json
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import regex
 import tqdm
 
 from ashtadhyayi_data.reader.ashtadhyayi_com import dhaatu
-from ashtadhyayi_data.reader.ashtadhyayi_com.dhaatu import DHAATU_FILES_DIR, dhaatu_dict
+from ashtadhyayi_data.reader.ashtadhyayi_com.json_stream import iter_json_object
 
 
 def dump_base_dict(output_path):
@@ -15,10 +15,10 @@ def dump_base_dict(output_path):
   logging.info("Dumping %s\n", dict_name)
   output_dict_path = os.path.join(output_path, dict_name, "%s.babylon" % dict_name)
   os.makedirs(name=os.path.dirname(output_dict_path), exist_ok=True)
-  progress_bar = tqdm.tqdm(total=len(dhaatu.dhaatu_dict), desc="dhAtus", position=0)
+  progress_bar = tqdm.tqdm(total=len(dhaatu.get_dhaatu_registry()), desc="dhAtus", position=0)
   log = tqdm.tqdm(total=0, position=3, bar_format='{desc}')
   with codecs.open(output_dict_path, "w") as dict_file:
-    for dhaatu_id, dhaatu_details in dhaatu.dhaatu_dict.items():
+    for dhaatu_id, dhaatu_details in dhaatu.get_dhaatu_registry().items():
       if dhaatu_details["aupadeshik"] == "-":
         headwords = [dhaatu_details["dhatu"]]
       else:
@@ -50,40 +50,52 @@ def possible_list_to_str(value):
   return out_str
 
 
-def dump_forms_dict(type, output_path):
+FORMS_SEPARATOR = regex.compile("[;,]")
+# 3 puruShas x 3 vachanas.
+FORMS_TABLE_PATTERN = regex.compile("(.+);(.+);(.+);(.+);(.+);(.+);(.+);(.+);(.+)")
+FORMS_TABLE_TEMPLATE = r"\1<br>\2<br>\3<br>---<br>\4<br>\5<br>\6<br>---<br>\7<br>\8<br>\9"
+FORM_TYPES = ["nich", "san", "yang", "yangluk"]
+
+
+def get_forms_entries(dhaatu_id, details):
+  """(headwords line, entry) for each lakaara of a dhaatu."""
+  dhaatu_details = dhaatu.get_dhaatu_registry()[dhaatu_id]
+  for lakaara, value_str in details.items():
+    if value_str.strip() == "":
+      continue
+    value_str = value_str.replace("\u200b", "")
+    forms = FORMS_SEPARATOR.split(value_str)
+    headwords = [dhaatu_details["dhatu"], dhaatu_details["aupadeshik"]]
+    headwords.extend(forms)
+    headwords = list( dict.fromkeys(headwords) )
+    forms_table = FORMS_TABLE_PATTERN.sub(FORMS_TABLE_TEMPLATE, value_str.replace(",", " / "))
+    entry = "%s %s %s %s<br><br>%s" % (dhaatu_details["dhatu"], dhaatu_details["aupadeshik"], dhaatu_details["artha"], dhaatu.get_sanskrit_lakaara(lakaara_code=lakaara), forms_table)
+    yield ("|".join(headwords), entry)
+
+
+def dump_forms_dict(type, output_path, progress_position=0):
+  """Streams dhatuforms_<type>.txt, one dhaatu at a time, into <output_path>/ashtadhyayi_com_<type>/ashtadhyayi_com_<type>.babylon. Returns the number of entries."""
   dict_name = "ashtadhyayi_com_%s" % type
   logging.info("Dumping %s\n", dict_name)
   output_dict_path = os.path.join(output_path, dict_name, "%s.babylon" % dict_name)
   os.makedirs(name=os.path.dirname(output_dict_path), exist_ok=True)
-  with codecs.open(os.path.join(DHAATU_FILES_DIR, "dhatuforms_%s.txt" % type), "r") as forms_file:
-    forms_dict = json.load(forms_file)
-    with codecs.open(output_dict_path, "w") as dict_file:
-      progress_bar = tqdm.tqdm(total=len(forms_dict), desc="dhAtus", position=0)
-      log = tqdm.tqdm(total=0, position=3, bar_format='{desc}')
-      for dhaatu_id, details in forms_dict.items():
-        for lakaara, value_str in details.items():
-          if value_str.strip() == "":
-            continue
-          value_str = value_str.replace("​", "")
-          forms = regex.split('[;,]', value_str)
-          dhaatu_details = dhaatu_dict[dhaatu_id]
-          headwords = [dhaatu_details["dhatu"], dhaatu_details["aupadeshik"]]
-          headwords.extend(forms)
-          headwords = list( dict.fromkeys(headwords) )
-          dict_file.write("%s\n" % ("|".join(headwords)))
-          forms_table = regex.sub("(.+);(.+);(.+);(.+);(.+);(.+);(.+);(.+);(.+)", r"\1<br>\2<br>\3<br>---<br>\4<br>\5<br>\6<br>---<br>\7<br>\8<br>\9", value_str.replace(",", " / "))
-          entry = "%s %s %s %s<br><br>%s" % (dhaatu_details["dhatu"], dhaatu_details["aupadeshik"], dhaatu_details["artha"], dhaatu.get_sanskrit_lakaara(lakaara_code=lakaara), forms_table)
-          dict_file.write("%s\n\n" % entry)
-          # log.set_description_str(dhaatu_id)
-        progress_bar.update(1)
-
-
-def dump_all_forms(output_path):
+  entry_count = 0
+  with open(os.path.join(dhaatu.DHAATU_FILES_DIR, "dhatuforms_%s.txt" % type), "r", encoding="utf-8") as forms_file, open(output_dict_path, "w", encoding="utf-8", buffering=1 << 20) as dict_file:
+    progress_bar = tqdm.tqdm(total=len(dhaatu.get_dhaatu_registry()), desc="dhAtus %s" % type, position=progress_position)
+    for dhaatu_id, details in iter_json_object(forms_file):
+      for (headwords_line, entry) in get_forms_entries(dhaatu_id=dhaatu_id, details=details):
+        dict_file.write("%s\n%s\n\n" % (headwords_line, entry))
+        entry_count += 1
+      progress_bar.update(1)
+  return entry_count
+
+
+def dump_all_forms(output_path, max_workers=None):
   dump_base_dict(output_path=output_path)
-  dump_forms_dict(type="nich", output_path=output_path)
-  dump_forms_dict(type="san", output_path=output_path)
-  dump_forms_dict(type="yang", output_path=output_path)
-  dump_forms_dict(type="yangluk", output_path=output_path)
+  with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    futures = [executor.submit(dump_forms_dict, type=type, output_path=output_path, progress_position=position) for (position, type) in enumerate(FORM_TYPES)]
+    for (type, future) in zip(FORM_TYPES, futures):
+      logging.info("%s: %d entries", type, future.result())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+"""
+Reverse index from inflected forms to the dhaatus producing them, over all dhatuforms_<type>.txt files of the dhaatu data dir.
+
+Each form maps to (baseindex, type, lakaara, position) rows, where position is the cell of the 3x3 puruSha/vachana table (0 to 8) and alternative forms of a cell share it. The index is an SQLite file, rebuilt when any source file changes.
+
+  forms_index = get_forms_index()
+  forms_index.lookup("बुभूषति")  # [("01.0001", "san", "plat", 0)]
+  forms_index.lookup_prefix("बुभूष")
+"""
+import glob
+import os
+import pathlib
+import sqlite3
+
+from ashtadhyayi_data.reader.ashtadhyayi_com import dhaatu
+from ashtadhyayi_data.reader.ashtadhyayi_com.json_stream import iter_json_object
+
+
+def get_forms_files(data_dir):
+  """{type: path} of the dhatuforms_<type>.txt files."""
+  file_paths = sorted(glob.glob(os.path.join(data_dir, "dhatuforms_*.txt")))
+  return {os.path.basename(file_path)[len("dhatuforms_"):-len(".txt")]: file_path for file_path in file_paths}
+
+
+def iter_form_rows(type, forms_file_path):
+  """(form, baseindex, type, lakaara, position) for every form of a dhatuforms file, streamed."""
+  with open(forms_file_path, "r", encoding="utf-8") as forms_file:
+    for (baseindex, details) in iter_json_object(forms_file):
+      for (lakaara, value_str) in details.items():
+        for (position, cell) in enumerate(value_str.replace("\u200b", "").split(";")):
+          for form in cell.split(","):
+            form = form.strip()
+            if form != "":
+              yield (form, baseindex, type, lakaara, position)
+
+
+def get_sources(data_dir):
+  sources = []
+  for (type, file_path) in get_forms_files(data_dir).items():
+    stat = os.stat(file_path)
+    sources.append((type, os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size))
+  return sources
+
+
+def build_forms_index(db_path, data_dir=None):
+  """Builds the index at db_path from all forms files in one pass, replacing any earlier one."""
+  data_dir = data_dir or dhaatu.DHAATU_FILES_DIR
+  os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+  tmp_path = db_path + ".tmp"
+  if os.path.exists(tmp_path):
+    os.remove(tmp_path)
+  connection = sqlite3.connect(tmp_path)
+  try:
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("CREATE TABLE forms (form TEXT NOT NULL, baseindex TEXT NOT NULL, type TEXT NOT NULL, lakaara TEXT NOT NULL, position INTEGER NOT NULL)")
+    connection.execute("CREATE TABLE sources (type TEXT, path TEXT, mtime_ns INTEGER, size INTEGER)")
+    sources = get_sources(data_dir)
+    for (type, file_path, _, _) in sources:
+      connection.executemany("INSERT INTO forms VALUES (?, ?, ?, ?, ?)", iter_form_rows(type, file_path))
+    connection.executemany("INSERT INTO sources VALUES (?, ?, ?, ?)", sources)
+    # Built after the inserts, which is much faster than maintaining it row by row.
+    connection.execute("CREATE INDEX forms_by_form ON forms (form)")
+    connection.commit()
+  finally:
+    connection.close()
+  os.replace(tmp_path, db_path)
+
+
+class FormsIndex(object):
+  def __init__(self, db_path):
+    self.db_path = db_path
+    # as_uri() percent-escapes ?, # and % in the path.
+    self.connection = sqlite3.connect(pathlib.Path(db_path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+
+  def close(self):
+    self.connection.close()
+
+  def get_sources(self):
+    return [tuple(row) for row in self.connection.execute("SELECT type, path, mtime_ns, size FROM sources ORDER BY type")]
+
+  def lookup(self, form):
+    """[(baseindex, type, lakaara, position)] of an exact form."""
+    return self.connection.execute("SELECT baseindex, type, lakaara, position FROM forms WHERE form = ? ORDER BY rowid", (form,)).fetchall()
+
+  def lookup_many(self, forms):
+    """{form: [(baseindex, type, lakaara, position)]} of the given forms which are in the index, in one query per 500 forms."""
+    result = {}
+    forms = list(dict.fromkeys(forms))
+    for start in range(0, len(forms), 500):
+      batch = forms[start:start + 500]
+      query = "SELECT form, baseindex, type, lakaara, position FROM forms WHERE form IN (%s) ORDER BY rowid" % ",".join("?" * len(batch))
+      for (form, baseindex, type, lakaara, position) in self.connection.execute(query, batch):
+        result.setdefault(form, []).append((baseindex, type, lakaara, position))
+    return result
+
+  def lookup_prefix(self, prefix, limit=None):
+    """[(form, baseindex, type, lakaara, position)] of forms starting with prefix, ordered by form."""
+    # A range on the form index; LIKE would not use it.
+    query = "SELECT form, baseindex, type, lakaara, position FROM forms WHERE form >= ? AND form < ? ORDER BY form, rowid"
+    parameters = [prefix, prefix + "\U0010ffff"]
+    if limit is not None:
+      query += " LIMIT ?"
+      parameters.append(limit)
+    return self.connection.execute(query, parameters).fetchall()
+
+
+def get_forms_index(db_path=None, data_dir=None):
+  """A FormsIndex of data_dir (default dhaatu.DHAATU_FILES_DIR), (re)built first if missing or if the forms files changed. The default db_path is under dhaatu.SNAPSHOT_DIR."""
+  data_dir = data_dir or dhaatu.DHAATU_FILES_DIR
+  db_path = db_path or os.path.splitext(dhaatu.get_snapshot_path(os.path.join(data_dir, "forms")))[0] + ".sqlite"
+  if os.path.exists(db_path):
+    forms_index = FormsIndex(db_path)
+    if forms_index.get_sources() == sorted(get_sources(data_dir)):
+      return forms_index
+    forms_index.close()
+  build_forms_index(db_path=db_path, data_dir=data_dir)
+  return FormsIndex(db_path)
@@ -0,0 +1,69 @@
+"""
+Incremental reading of the large json files of ashtadhyayi.com data (commentaries, dhatu forms), which are single top level objects.
+"""
+import json
+
+import regex
+
+
+def iter_json_object(json_file, chunk_size=1 << 16):
+  """(key, value) pairs of the top level JSON object in json_file, parsed incrementally.
+
+  Only one value (plus one chunk of text) is held in memory at a time, so very large files are never loaded whole.
+  """
+  decoder = json.JSONDecoder()
+  whitespace = regex.compile(r"\s*")
+  buffer = ""
+  position = 0
+  exhausted = False
+
+  def fill():
+    nonlocal buffer, position, exhausted
+    chunk = json_file.read(chunk_size)
+    exhausted = len(chunk) == 0
+    buffer = buffer[position:] + chunk
+    position = 0
+
+  def next_token():
+    # Skips whitespace and returns the next character, reading more text as needed.
+    nonlocal position
+    while True:
+      position = whitespace.match(buffer, position).end()
+      if position < len(buffer):
+        return buffer[position]
+      if exhausted:
+        raise ValueError("Unexpected end of JSON in %s" % getattr(json_file, "name", json_file))
+      fill()
+
+  def decode():
+    # A value is complete only once the character after it has been read, so that truncated numbers are not accepted.
+    nonlocal position
+    while True:
+      next_token()
+      try:
+        (value, end) = decoder.raw_decode(buffer, position)
+        if end < len(buffer) or exhausted:
+          position = end
+          return value
+      except json.JSONDecodeError:
+        if exhausted:
+          raise
+      fill()
+
+  if next_token() != "{":
+    raise ValueError("Expected a JSON object in %s" % getattr(json_file, "name", json_file))
+  position += 1
+  if next_token() == "}":
+    return
+  while True:
+    key = decode()
+    if next_token() != ":":
+      raise ValueError("Expected ':' after %r" % key)
+    position += 1
+    yield (key, decode())
+    separator = next_token()
+    position += 1
+    if separator == "}":
+      return
+    if separator != ",":
+      raise ValueError("Expected ',' or '}' after the value of %r" % key)
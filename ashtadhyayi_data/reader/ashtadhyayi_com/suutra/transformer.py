@@ -5,15 +5,21 @@ This is used in .github/workflows/commentary_separation.yml workflow of sanskrit
 
 
 import codecs
+import hashlib
 import json
 import logging
 import os
-import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import regex
 
 from doc_curation.md.file import MdFile
 
+from ashtadhyayi_data.reader.ashtadhyayi_com.json_stream import iter_json_object
+from ashtadhyayi_data.writer.sink import OutputSink
+
 for handler in logging.root.handlers[:]:
   logging.root.removeHandler(handler)
 logging.basicConfig(
@@ -22,18 +28,85 @@ logging.basicConfig(
 )
 
 
+# Each top level group wraps its sub-groups, so match.lastgroup names the alternative which matched.
+MARKDOWN_PATTERN = regex.compile(r"(?P<newline>\r?\n)|(?P<emphasis><<|>>)|(?P<linebreak>##)|(?P<reference>\$(\d)\$(\d)\$(\d+))|(?P<compact_reference>\$(\d)(\d)0*(\d+))")
+MARKDOWN_REPLACEMENTS = {
+  "newline": "\n\n",
+  "emphasis": "_",
+  "linebreak": "  \n",
+  # $1$1$1 and $11001 are references to sutra 1.1.1.
+  "reference": lambda match: " (%s.%s.%s)" % match.group(5, 6, 7),
+  "compact_reference": lambda match: " (%s.%s.%s)" % match.group(9, 10, 11),
+}
+
+
+def _markdown_replacement(match):
+  replacement = MARKDOWN_REPLACEMENTS[match.lastgroup]
+  return replacement if isinstance(replacement, str) else replacement(match)
+
+
 def markdownify(content):
-  content = regex.sub(r"\r?\n", "\n\n", content)
-  content = regex.sub("<<", "_", content)
-  content = regex.sub(">>", "_", content)
-  content = regex.sub("##", "  \n", content)
-  content = regex.sub("##", "  \n", content)
-  content = regex.sub(r"\$(\d)\$(\d)\$(\d+)", " ($1.$2.$3)", content)
-  content = regex.sub(r"\$(\d)(\d)0*(\d+)", " ($1.$2.$3)", content)
-  return content
+  return MARKDOWN_PATTERN.sub(_markdown_replacement, content)
+
+
+class OutputManifest(object):
+  """Content hashes of the files emitted under one output dir, kept in <output_path>/.manifest.json.
+
+  emit() queues a file on an OutputSink only if its metadata or content changed since the last run (or the file went missing). finish() waits for the writes, deletes files which were not emitted in this run and saves the manifest. With dry_run, the would-be diffs are left in self.diffs.
+  """
+  FILE_NAME = ".manifest.json"
+
+  def __init__(self, output_path, dry_run=False):
+    self.output_path = output_path
+    self.dry_run = dry_run
+    self.sink = OutputSink(base_dir=output_path, dry_run=dry_run)
+    self.diffs = {}
+    self.manifest_path = os.path.join(output_path, self.FILE_NAME)
+    self.hashes = {}
+    if os.path.exists(self.manifest_path):
+      with codecs.open(self.manifest_path, "r", "utf-8") as manifest_file:
+        self.hashes = json.load(manifest_file)
+    self.new_hashes = {}
+    self.counts = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+
+  def emit(self, outpath, metadata, content):
+    relative_path = os.path.relpath(outpath, self.output_path)
+    content_hash = hashlib.sha1(("%s\n%s" % (json.dumps(metadata, sort_keys=True, ensure_ascii=False), content)).encode("utf-8")).hexdigest()
+    self.new_hashes[relative_path] = content_hash
+    if self.hashes.get(relative_path) == content_hash and os.path.exists(outpath):
+      self.counts["unchanged"] += 1
+      return
+    self.sink.write_md(outpath, metadata=metadata, content=content, frontmatter_type=MdFile.YAML)
+
+  def finish(self):
+    (sink_counts, self.diffs) = self.sink.close()
+    for (status, count) in sink_counts.items():
+      self.counts[status] += count
+    dry_run = self.dry_run
+    orphans = set(path for path in self.hashes if path not in self.new_hashes)
+    for (dir_path, _, file_names) in os.walk(self.output_path):
+      for file_name in file_names:
+        relative_path = os.path.relpath(os.path.join(dir_path, file_name), self.output_path)
+        if file_name.endswith(".md") and relative_path not in self.new_hashes:
+          orphans.add(relative_path)
+    for relative_path in sorted(orphans):
+      file_path = os.path.join(self.output_path, relative_path)
+      if os.path.exists(file_path):
+        self.counts["removed"] += 1
+        if not dry_run:
+          os.remove(file_path)
+    if not dry_run:
+      for (dir_path, _, _) in sorted(os.walk(self.output_path), reverse=True):
+        if dir_path != self.output_path and len(os.listdir(dir_path)) == 0:
+          os.rmdir(dir_path)
+      os.makedirs(self.output_path, exist_ok=True)
+      with codecs.open(self.manifest_path, "w", "utf-8") as manifest_file:
+        json.dump(self.new_hashes, manifest_file, ensure_ascii=False, indent=0, sort_keys=True)
+    logging.info("%s: %d added, %d changed, %d removed, %d unchanged", self.output_path, self.counts["added"], self.counts["changed"], self.counts["removed"], self.counts["unchanged"])
+    return self.counts
 
 
-def dump_suutra_commentary(suutra, comment, output_path, dry_run):
+def dump_suutra_commentary(suutra, comment, output_path, dry_run, manifest=None):
   if len(comment) == 0:
     return 
   suutra_index = "%s.%s.%s" % (suutra["a"], suutra["p"], suutra["n"])
@@ -42,57 +115,111 @@ def dump_suutra_commentary(suutra, comment, output_path, dry_run):
   # logging.debug(metadata)
   # logging.debug(comment)
   content = markdownify(comment)
+  if manifest is not None:
+    manifest.emit(outpath=outpath, metadata=metadata, content=content)
+    return
   md_file = MdFile(file_path=outpath, frontmatter_type=MdFile.YAML)
   md_file.dump_to_file(metadata=metadata, content=content, dry_run=dry_run)
 
 
-def dump_commentary_data(commentary_file_path, suutra_data_path, output_path, dry_run):
-  with codecs.open(commentary_file_path) as commentary_file, codecs.open(suutra_data_path) as suutra_data_file:
-    if not dry_run:
-      shutil.rmtree(output_path, ignore_errors=True)
-    comments = json.load(commentary_file)
-    suutra_data = json.load(suutra_data_file)["data"]
-    for suutra in suutra_data:
-      comment = comments.get(suutra["i"], None)
-      if comment is not None:
-        if isinstance(comment, str):
-          dump_suutra_commentary(suutra=suutra, comment=comment, output_path=output_path, dry_run=dry_run)
-        elif isinstance(comment, dict):
-          for key in comment:
-            dump_suutra_commentary(suutra=suutra, comment=comment[key], output_path=os.path.join(output_path, key), dry_run=dry_run)
+def read_suutra_data(suutra_data_path):
+  with codecs.open(suutra_data_path, "r", "utf-8") as suutra_data_file:
+    return json.load(suutra_data_file)["data"]
+
+
+def dump_commentary_data(commentary_file_path, output_path, dry_run, suutra_data_path=None, suutra_data=None):
+  """Regenerates one commentary, rewriting only changed sutra files. Returns added/changed/removed/unchanged counts.
+
+  The commentary file is streamed with iter_json_object(). suutra_data (the parsed "data" list of data.txt) may be passed in to avoid re-reading suutra_data_path.
+  """
+  if suutra_data is None:
+    suutra_data = read_suutra_data(suutra_data_path)
+  suutras = {suutra["i"]: suutra for suutra in suutra_data}
+  manifest = OutputManifest(output_path=output_path, dry_run=dry_run)
+  with codecs.open(commentary_file_path, "r", "utf-8") as commentary_file:
+    for (suutra_id, comment) in iter_json_object(commentary_file):
+      suutra = suutras.get(suutra_id, None)
+      if suutra is None or comment is None:
+        continue
+      if isinstance(comment, str):
+        dump_suutra_commentary(suutra=suutra, comment=comment, output_path=output_path, dry_run=dry_run, manifest=manifest)
+      elif isinstance(comment, dict):
+        for key in comment:
+          dump_suutra_commentary(suutra=suutra, comment=comment[key], output_path=os.path.join(output_path, key), dry_run=dry_run, manifest=manifest)
+  return manifest.finish()
 
 
-def dump_suutra_basics(indir, outdir, dry_run):
-  suutra_data_path = os.path.join(indir, "data.txt")
+def dump_suutra_basics(indir, outdir, dry_run, suutra_data=None):
   logging.info("Transforming sUtra-basics")
-  with codecs.open(suutra_data_path) as suutra_data_file:
-    suutra_data = json.load(suutra_data_file)["data"]
-    for key in ["pc", "ad", "an", "ss"]:
-      output_path = os.path.join(outdir, "sUtra-basics", key)
-      if not dry_run:
-        shutil.rmtree(output_path, ignore_errors=True)
-      for suutra in suutra_data:
-        dump_suutra_commentary(suutra=suutra, comment=suutra[key], output_path=output_path, dry_run=dry_run)
+  if suutra_data is None:
+    suutra_data = read_suutra_data(os.path.join(indir, "data.txt"))
+  counts = {}
+  for key in ["pc", "ad", "an", "ss"]:
+    output_path = os.path.join(outdir, "sUtra-basics", key)
+    manifest = OutputManifest(output_path=output_path, dry_run=dry_run)
+    for suutra in suutra_data:
+      dump_suutra_commentary(suutra=suutra, comment=suutra[key], output_path=output_path, dry_run=dry_run, manifest=manifest)
+    counts["sUtra-basics/" + key] = manifest.finish()
+  return counts
+
+
+def get_peak_rss_mb():
+  try:
+    import resource
+  except ImportError:
+    return None
+  # ru_maxrss is in KiB on linux, bytes on mac.
+  peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+_worker_suutra_data = None
+
+
+def _init_worker(suutra_data):
+  global _worker_suutra_data
+  _worker_suutra_data = suutra_data
+
+
+def _dump_commentary_task(commentary, commentary_file_path, output_path, dry_run):
+  start_time = time.perf_counter()
+  counts = dump_commentary_data(commentary_file_path=commentary_file_path, output_path=output_path, dry_run=dry_run, suutra_data=_worker_suutra_data)
+  return (commentary, counts, {"seconds": time.perf_counter() - start_time, "peak_rss_mb": get_peak_rss_mb()})
+
 
+def separate_commentaries(indir, outdir, dry_run, commentaries_in=None, max_workers=None):
+  """Returns {output name: added/changed/removed/unchanged counts}.
 
-def separate_commentaries(indir, outdir, dry_run, commentaries_in=None):
+  data.txt is parsed once and handed to a process pool, in which each commentary is transformed by a fresh worker, so that the logged peak RSS is that of the commentary alone. max_workers=1 runs everything in this process.
+  """
   # vartika and data.txt need special treatment - so they're not included below.
   commentaries = ["balamanorama", "bhashya", "kashika", "kaumudi", "laghukaumudi", "laghushabdendushekhar", "nyaas", "padamanjari", "praudhamanorama", "sudha", "sutrartha", "sutrartha_english", "tattvabodhini", "vasu_english", "vasu_english_summary"]
   if commentaries_in is not None:
     commentaries = [x for x in commentaries if x in commentaries_in]
   logging.info("Processing commentaries: " + str(commentaries))
-  suutra_data_path = os.path.join(indir, "data.txt")
-  for commentary in commentaries:
-    logging.info("Transforming commentary: %s", commentary)
-    commentary_file = os.path.join(indir, "%s.txt" % commentary)
-    output_path = os.path.join(outdir, commentary)
-    dump_commentary_data(commentary_file_path=commentary_file, suutra_data_path=suutra_data_path, output_path=output_path, dry_run=dry_run)
+  suutra_data = read_suutra_data(os.path.join(indir, "data.txt"))
+  tasks = [(commentary, os.path.join(indir, "%s.txt" % commentary), os.path.join(outdir, commentary), dry_run) for commentary in commentaries]
+  counts = {}
+  stats = {}
+  if max_workers == 1 or len(tasks) <= 1:
+    _init_worker(suutra_data)
+    results = [_dump_commentary_task(*task) for task in tasks]
+  else:
+    executor_args = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(suutra_data,), **executor_args) as executor:
+      results = list(executor.map(_dump_commentary_task, *zip(*tasks)))
+  for (commentary, commentary_counts, commentary_stats) in results:
+    counts[commentary] = commentary_counts
+    stats[commentary] = commentary_stats
 
   if commentaries_in is None or "data" in commentaries_in:
-    dump_suutra_basics(indir=indir, outdir=outdir, dry_run=dry_run)
+    counts.update(dump_suutra_basics(indir=indir, outdir=outdir, dry_run=dry_run, suutra_data=suutra_data))
+  for (commentary, commentary_stats) in stats.items():
+    logging.info("%s: %.1fs, peak RSS %s MB", commentary, commentary_stats["seconds"], "%.0f" % commentary_stats["peak_rss_mb"] if commentary_stats["peak_rss_mb"] is not None else "?")
+  return counts
 
 
-def transform(indir, outdir, dry_run):
+def transform(indir, outdir, dry_run, max_workers=None):
   modified_files_json = os.path.join(outdir, "change_details/files_modified.json")
   commentaries = None
   if os.path.exists(modified_files_json):
@@ -103,7 +230,10 @@ def transform(indir, outdir, dry_run):
         commentaries = None
       else:
         logging.info("Commentaries to regenerate:" + str(commentaries))
-  separate_commentaries(indir=os.path.join(indir, "sutraani"), outdir=os.path.join(outdir, "sUtra-commentaries"), dry_run=dry_run, commentaries_in=commentaries)
+  counts = separate_commentaries(indir=os.path.join(indir, "sutraani"), outdir=os.path.join(outdir, "sUtra-commentaries"), dry_run=dry_run, commentaries_in=commentaries, max_workers=max_workers)
+  for status in ["added", "changed", "removed"]:
+    logging.info("%s files %s", sum(x[status] for x in counts.values()), status)
+  return counts
 
 
 # python -c "from ashtadhyayi_data.reader.ashtadhyayi_com import transformer; transformer.separate_commentaries(indir=\"`pwd`/sutraani\", outdir=\"`pwd`/sUtra-commentaries/\", dry_run=True)"
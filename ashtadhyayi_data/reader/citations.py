@@ -0,0 +1,172 @@
+"""
+Citation graph of the commentaries: which commentary, on which sutra, cites which sutra.
+
+References are recognized in every form the sources carry them - $1$1$1 and $11001 of the ashtadhyayi.com data, (1.1.1) as written by transformer.markdownify and nyasa_regen, and ’7-3-33 of uNAdi.csv - in one regex pass over each text. References to ids missing from sutrANi.tsv are dropped.
+
+Sources are the md files of the commentaries under a root dir (root/<commentary>/pada-X.Y/X.Y.Z.md, as in the vritti repo or the transformer output) and the entries of the bundled tsv vrittis. The graph is held as adjacency arrays: citations[offsets[i]:offsets[i + 1]] are the ordinals (registry positions) of the sutras cited by source i, and the transpose, built on first query, gives the citing sources of each sutra ordinal. update() re-reads only files whose mtime or size changed, on a process pool.
+
+  graph = citations.get_citation_graph()
+  graph.cited_by("7.3.33")  # [..., ("uNAdi", "1.1")]
+  graph.cites("kashika", "1.1.1")  # ["1.1.3", ...]
+"""
+import array
+import glob
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import ashtadhyayi_data
+from ashtadhyayi_data.reader import vritti_repo, vritti_tsv
+
+CITATION_GRAPH_PATH = os.environ.get("ASHTADHYAYI_CITATION_GRAPH_PATH", os.path.join(os.path.expanduser("~"), ".cache", "ashtadhyayi_data", "citations.pickle"))
+FORMAT_VERSION = 1
+# The sutra id is in the last three groups of each alternative.
+REFERENCE_PATTERN = re.compile(r"\$(\d)\$(\d)\$(\d+)|\$(\d)(\d)0*(\d+)|\((\d)\.(\d)\.(\d+)\)|’(\d)-(\d)-(\d+)")
+
+
+def extract_citations(text):
+    """Ordinals of the sutras cited in text, in order of first citation."""
+    registry = ashtadhyayi_data.get_suutra_registry()
+    ordinals = {}
+    for match in REFERENCE_PATTERN.finditer(text):
+        last = match.lastindex
+        suutra_id = "%s.%s.%s" % match.group(last - 2, last - 1, last)
+        if suutra_id in registry:
+            ordinals.setdefault(registry.position(suutra_id), None)
+    return tuple(ordinals)
+
+
+def get_source_files(root, tsv_dir):
+    md_paths = sorted(glob.glob(os.path.join(root, "*", "pada-*", "*.md"))) if root is not None else []
+    tsv_paths = sorted(glob.glob(os.path.join(tsv_dir, "*.tsv")) + glob.glob(os.path.join(tsv_dir, "*.csv"))) if tsv_dir is not None else []
+    return md_paths + tsv_paths
+
+
+def read_source_file(file_path):
+    """[(commentary, suutra_id, cited ordinals)] of an md file (one entry) or a tsv vritti (one per entry citing something)."""
+    if file_path.endswith(".md"):
+        commentary = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+        with open(file_path, encoding="utf-8-sig") as md_file:
+            cited = extract_citations(md_file.read())
+        return [(commentary, os.path.splitext(os.path.basename(file_path))[0], cited)] if cited else []
+    table = vritti_tsv.VrittiTable(file_path=file_path)
+    vritti_id = os.path.splitext(os.path.basename(file_path))[0]
+    entries = []
+    for (suutra_id, position) in sorted(table.positions.items(), key=lambda item: item[1]):
+        cited = extract_citations(table.column_values[table.default_column][position])
+        if cited:
+            entries.append((vritti_id, suutra_id, cited))
+    return entries
+
+
+class CitationGraph(object):
+    def __init__(self, root=None, tsv_dir=vritti_tsv.DATA_DIR):
+        self.root = root
+        self.tsv_dir = tsv_dir
+        # path -> (mtime_ns, size, first source, end source)
+        self.files = {}
+        # (commentary, suutra_id) of each source
+        self.sources = []
+        self.offsets = array.array("I", [0])
+        self.citations = array.array("H")
+        self._reset_indexes()
+
+    def _reset_indexes(self):
+        self._source_positions = None
+        self._cited_offsets = None
+        self._citing = None
+
+    def update(self, max_workers=None, chunksize=256):
+        """Re-reads the source files which changed since the last update, on a process pool (in this process with max_workers=1). Returns the number of files read or dropped."""
+        file_paths = get_source_files(self.root, self.tsv_dir)
+        stats = {file_path: os.stat(file_path) for file_path in file_paths}
+        to_read = [file_path for file_path in file_paths if self.files.get(file_path, (None, None))[:2] != (stats[file_path].st_mtime_ns, stats[file_path].st_size)]
+        removed = len(set(self.files) - set(file_paths))
+        if len(to_read) == 0 and removed == 0:
+            return 0
+        if max_workers == 1 or len(to_read) <= chunksize:
+            read_entries = dict(zip(to_read, map(read_source_file, to_read)))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                read_entries = dict(zip(to_read, executor.map(read_source_file, to_read, chunksize=chunksize)))
+        (files, sources, offsets, citations) = ({}, [], array.array("I", [0]), array.array("H"))
+        for file_path in file_paths:
+            entries = read_entries.get(file_path)
+            if entries is None:
+                (_, _, start, end) = self.files[file_path]
+                entries = [self.sources[i] + (self.citations[self.offsets[i]:self.offsets[i + 1]],) for i in range(start, end)]
+            start = len(sources)
+            for (commentary, suutra_id, cited) in entries:
+                sources.append((commentary, suutra_id))
+                citations.extend(cited)
+                offsets.append(len(citations))
+            files[file_path] = (stats[file_path].st_mtime_ns, stats[file_path].st_size, start, len(sources))
+        (self.files, self.sources, self.offsets, self.citations) = (files, sources, offsets, citations)
+        self._reset_indexes()
+        return len(to_read) + removed
+
+    def _build_reverse(self):
+        # Counting sort of the (source, ordinal) edges by ordinal.
+        size = len(ashtadhyayi_data.get_suutra_registry())
+        cited_offsets = array.array("I", [0]) * (size + 1)
+        for ordinal in self.citations:
+            cited_offsets[ordinal + 1] += 1
+        for ordinal in range(size):
+            cited_offsets[ordinal + 1] += cited_offsets[ordinal]
+        citing = array.array("I", [0]) * len(self.citations)
+        fill = cited_offsets[:-1]
+        for source in range(len(self.sources)):
+            for ordinal in self.citations[self.offsets[source]:self.offsets[source + 1]]:
+                citing[fill[ordinal]] = source
+                fill[ordinal] += 1
+        (self._cited_offsets, self._citing) = (cited_offsets, citing)
+
+    def cites(self, commentary, suutra_id):
+        """Ids of the sutras cited by the commentary on suutra_id."""
+        if self._source_positions is None:
+            self._source_positions = {source: position for (position, source) in enumerate(self.sources)}
+        position = self._source_positions.get((commentary, suutra_id))
+        if position is None:
+            return []
+        ids = ashtadhyayi_data.get_suutra_registry().ids()
+        return [ids[ordinal] for ordinal in self.citations[self.offsets[position]:self.offsets[position + 1]]]
+
+    def cited_by(self, suutra_id, commentary=None):
+        """(commentary, suutra_id) of the sources citing suutra_id, of all commentaries or of one."""
+        registry = ashtadhyayi_data.get_suutra_registry()
+        if suutra_id not in registry:
+            return []
+        if self._citing is None:
+            self._build_reverse()
+        ordinal = registry.position(suutra_id)
+        sources = [self.sources[source] for source in self._citing[self._cited_offsets[ordinal]:self._cited_offsets[ordinal + 1]]]
+        return [source for source in sources if commentary is None or source[0] == commentary]
+
+    def save(self, graph_path):
+        os.makedirs(os.path.dirname(os.path.abspath(graph_path)), exist_ok=True)
+        tmp_path = graph_path + ".tmp"
+        with open(tmp_path, "wb") as graph_file:
+            pickle.dump((FORMAT_VERSION, self.root, self.tsv_dir, self.files, self.sources, self.offsets, self.citations), graph_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, graph_path)
+
+    @classmethod
+    def load(cls, graph_path, root=None, tsv_dir=vritti_tsv.DATA_DIR):
+        """The graph saved at graph_path if it was built for the same sources, else an empty one."""
+        graph = cls(root=root, tsv_dir=tsv_dir)
+        if os.path.exists(graph_path):
+            with open(graph_path, "rb") as graph_file:
+                saved = pickle.load(graph_file)
+            if saved[:3] == (FORMAT_VERSION, root, tsv_dir):
+                (graph.files, graph.sources, graph.offsets, graph.citations) = saved[3:]
+        return graph
+
+
+def get_citation_graph(graph_path=None, root=None, tsv_dir=vritti_tsv.DATA_DIR):
+    """The citation graph of the commentaries under root (default vritti_repo.ASHTADHYAYI_REPO_ROOT) and of the tsv vrittis, brought up to date and saved at graph_path (default CITATION_GRAPH_PATH)."""
+    graph_path = graph_path or CITATION_GRAPH_PATH
+    root = os.path.abspath(root or vritti_repo.ASHTADHYAYI_REPO_ROOT)
+    graph = CitationGraph.load(graph_path, root=root, tsv_dir=tsv_dir)
+    if graph.update() > 0 or not os.path.exists(graph_path):
+        graph.save(graph_path)
+    return graph
@@ -1,9 +1,15 @@
 import glob
+import hashlib
+import json
 import os
+import re
+import sys
+import numpy
 import pandas
-from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
 
-import frontmatter
+import yaml
+from rapidfuzz import fuzz, process
 import logging
 
 from ashtadhyayi_data import get_suutra_df
@@ -17,7 +23,9 @@ logging.basicConfig(
 
 pandas.set_option('display.max_columns', 5)
 pandas.set_option('display.width', 1000)
-ASHTADHYAYI_REPO_ROOT = "/home/vvasuki/sanskrit/raw_etexts/vyAkaraNam/aShTAdhyAyI_central-repo/"
+ASHTADHYAYI_REPO_ROOT = os.environ.get("ASHTADHYAYI_REPO_ROOT", "/home/vvasuki/sanskrit/raw_etexts/vyAkaraNam/aShTAdhyAyI_central-repo/")
+METADATA_CACHE_DIR = os.environ.get("ASHTADHYAYI_METADATA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ashtadhyayi_data", "vritti_metadata"))
+METADATA_KEYS = ["index", "sutra", "vrittiindex"]
 
 
 def get_file_paths(vritti_id):
@@ -25,33 +33,182 @@ def get_file_paths(vritti_id):
     return file_path
 
 
+def read_frontmatter_header(file_path):
+    """Parses only the YAML between the opening and the closing "---" lines; the body is never read."""
+    header_lines = []
+    with open(file_path, encoding="utf-8-sig") as f:
+        if f.readline().strip() != "---":
+            return {}
+        for line in f:
+            if line.strip() == "---":
+                break
+            header_lines.append(line)
+    header = parse_flat_yaml(header_lines)
+    if header is None:
+        header = yaml.safe_load("".join(header_lines)) or {}
+    return header
+
+
+FLAT_YAML_LINE = re.compile(r"^([A-Za-z_][\w-]*):(?:[ \t]+(.*?))?[ \t]*$")
+YAML_RESOLVER = yaml.resolver.Resolver()
+
+
+def parse_flat_yaml(lines):
+    """Fast path for headers made only of "key: scalar" lines; returns None for anything else, to be parsed by PyYAML."""
+    header = {}
+    for line in lines:
+        if line.strip() == "":
+            continue
+        match = FLAT_YAML_LINE.match(line)
+        if match is None:
+            return None
+        (key, value) = (match.group(1), match.group(2) or "")
+        if len(value) >= 2 and value[0] == value[-1] == "'" and "'" not in value[1:-1].replace("''", ""):
+            header[key] = value[1:-1].replace("''", "'")
+            continue
+        if value == "" or value[0] in "'\"[]{}|>&*!%@#`-?:,"  or " #" in value or "\t" in value or ": " in value or value.endswith(":"):
+            return None
+        tag = YAML_RESOLVER.resolve(yaml.ScalarNode, value, (True, False))
+        if tag == "tag:yaml.org,2002:str":
+            header[key] = value
+        elif tag == "tag:yaml.org,2002:int" and value.isdigit() and (value == "0" or value[0] != "0"):
+            header[key] = int(value)
+        else:
+            return None
+    return header
+
+
+def read_vritti_document(file_path):
+    """(frontmatter, body) of a vritti file, reading it once."""
+    with open(file_path, encoding="utf-8-sig") as f:
+        text = f.read()
+    lines = text.splitlines(keepends=True)
+    if len(lines) == 0 or lines[0].strip() != "---":
+        return ({}, text)
+    for (line_number, line) in enumerate(lines[1:], start=1):
+        if line.strip() == "---":
+            header_lines = lines[1:line_number]
+            header = parse_flat_yaml(header_lines)
+            if header is None:
+                header = yaml.safe_load("".join(header_lines)) or {}
+            return (header, "".join(lines[line_number + 1:]))
+    return ({}, text)
+
+
+def read_vritti_metadata(file_path):
+    header = read_frontmatter_header(file_path)
+    return {key: header[key] for key in METADATA_KEYS if key in header}
+
+
+def get_metadata_cache_path(vritti_id):
+    root_hash = hashlib.sha1(os.path.abspath(ASHTADHYAYI_REPO_ROOT).encode("utf-8")).hexdigest()[:10]
+    return os.path.join(METADATA_CACHE_DIR, "%s_%s.json" % (vritti_id, root_hash))
+
+
+def get_vritti_metadata(vritti_id, max_workers=16, use_cache=True):
+    """Frontmatter metadata (METADATA_KEYS) of every file of a vritti, in file path order.
+
+    Files whose mtime and size match the on-disk cache are not opened; the rest are read on a thread pool.
+    """
+    cache_path = get_metadata_cache_path(vritti_id=vritti_id)
+    cache = {}
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    file_paths = get_file_paths(vritti_id=vritti_id)
+    new_cache = {}
+    to_read = []
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        cached = cache.get(file_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            new_cache[file_path] = cached
+        else:
+            new_cache[file_path] = [stat.st_mtime_ns, stat.st_size, None]
+            to_read.append(file_path)
+    if len(to_read) > 0:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (file_path, metadata) in zip(to_read, executor.map(read_vritti_metadata, to_read)):
+                new_cache[file_path][2] = metadata
+    if use_cache and (len(to_read) > 0 or len(new_cache) != len(cache)):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(new_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return [new_cache[file_path][2] for file_path in file_paths]
+
+
 def get_vritti_metadata_df(vritti_id):
-    vritti_df = pandas.DataFrame(columns= ["index", "sutra", "vritti_index"])
-    for file_path in get_file_paths(vritti_id=vritti_id):
-        with open(file_path) as f:
-            vritti_data = frontmatter.load(f)
-            vritti_df.loc[vritti_data["index"]] = [vritti_data["index"], vritti_data["sutra"], None]
-            if "vrittiindex" in vritti_data:
-                vritti_df.loc[vritti_data["index"], "vritti_index"] = vritti_data["vrittiindex"]
-            # logging.debug(vritti_data)
-    vritti_df.set_index("index")
+    records = []
+    for vritti_data in get_vritti_metadata(vritti_id=vritti_id):
+        records.append((vritti_data["index"], vritti_data["sutra"], vritti_data.get("vrittiindex", None)))
+    vritti_df = pandas.DataFrame.from_records(records, columns=["index", "sutra", "vritti_index"])
+    # Later files win for repeated indices, as with the former row-by-row assignment.
+    vritti_df = vritti_df.drop_duplicates(subset="index", keep="last").set_index("index", drop=False)
+    vritti_df.index.name = None
     return vritti_df
     # logging.debug(vritti_df.loc["1.1.1"])
 
-def get_vrittis_with_mismatching_sutra(vritti_id):
+
+def similarity_ratios(a_list, b_list):
+    """Similarity in [0, 1] (rapidfuzz's indel ratio, computed in C) of each pair of strings."""
+    if len(a_list) == 0:
+        return []
+    return (process.cpdist(a_list, b_list, scorer=fuzz.ratio, dtype=numpy.float64) / 100.0).tolist()
+
+
+def mark_mismatching_sutras(vritti_metadata_df, suutra_df=None, threshold=0.7):
+    """Joins vritti metadata to the sutra table and adds "canonical_sutra", "ratio" and "mismatch" columns.
+
+    Identical sutras, and pairs whose length difference alone bounds the ratio below the threshold, are decided without computing the ratio (which is then reported as 1 or 0).
+    """
+    if suutra_df is None:
+        suutra_df = get_suutra_df()
+    merged_df = vritti_metadata_df.merge(suutra_df[["sutra"]].rename(columns={"sutra": "canonical_sutra"}), how="left", left_on="index", right_index=True)
+    sutras = merged_df["sutra"].fillna("").astype(str)
+    canonical_sutras = merged_df["canonical_sutra"]
+    missing = canonical_sutras.isna()
+    canonical_sutras = canonical_sutras.fillna("").astype(str)
+    lengths = sutras.str.len()
+    canonical_lengths = canonical_sutras.str.len()
+    # 2 * min(len) / (len + len) is an upper bound for the ratio.
+    length_bound = 2 * numpy.minimum(lengths, canonical_lengths) / numpy.maximum(lengths + canonical_lengths, 1)
+    ratio = pandas.Series(numpy.where(sutras == canonical_sutras, 1.0, 0.0), index=merged_df.index)
+    to_compute = ~missing & (sutras != canonical_sutras) & (length_bound >= threshold)
+    ratio[to_compute] = similarity_ratios(sutras[to_compute].tolist(), canonical_sutras[to_compute].tolist())
+    ratio[missing] = 0.0
+    merged_df["ratio"] = ratio
+    merged_df["mismatch"] = missing | (ratio < threshold)
+    return merged_df
+
+
+def get_vrittis_with_mismatching_sutra(vritti_id, threshold=0.7, suutra_df=None):
     vritti_metadata_df = get_vritti_metadata_df(vritti_id=vritti_id)
-    suutra_df = get_suutra_df()
-    def mismatch_filter_fn(row, threshold=0.7):
-        # logging.debug(row)
-        if row['index'] not in suutra_df.index or SequenceMatcher(a=row.loc['sutra'], b=suutra_df.loc[row['index'], 'sutra']).ratio() < threshold:
-            return True
-        else:
-            return False
-    filtered_index = vritti_metadata_df.apply(mismatch_filter_fn, axis=1)
-    filtered_df = vritti_metadata_df[filtered_index]
+    marked_df = mark_mismatching_sutras(vritti_metadata_df=vritti_metadata_df, suutra_df=suutra_df, threshold=threshold)
+    filtered_df = marked_df[marked_df["mismatch"]]
     logging.debug(filtered_df)
-    pass
+    return filtered_df
+
+
+def get_vritti_ids():
+    return sorted(set(os.path.basename(os.path.dirname(os.path.dirname(path))) for path in glob.glob(os.path.join(ASHTADHYAYI_REPO_ROOT, "*", "pada-*/"))))
+
+
+def get_all_mismatching_sutras(vritti_ids=None, threshold=0.7):
+    """Mismatches of all (or the given) vrittis in one frame, with a "vritti_id" column."""
+    suutra_df = get_suutra_df()
+    vritti_ids = vritti_ids or get_vritti_ids()
+    frames = []
+    for vritti_id in vritti_ids:
+        filtered_df = get_vrittis_with_mismatching_sutra(vritti_id=vritti_id, threshold=threshold, suutra_df=suutra_df)
+        frames.append(filtered_df.assign(vritti_id=vritti_id))
+    if len(frames) == 0:
+        return pandas.DataFrame(columns=["vritti_id", "index", "sutra", "vritti_index", "canonical_sutra", "ratio", "mismatch"])
+    return pandas.concat(frames, ignore_index=True)
 
 
 if __name__ == '__main__':
-    get_vrittis_with_mismatching_sutra(vritti_id='tattvabodhini')
\ No newline at end of file
+    mismatch_df = get_all_mismatching_sutras()
+    logging.info("%d mismatching sutras", len(mismatch_df))
+    sys.exit(1 if len(mismatch_df) > 0 else 0)
@@ -2,7 +2,6 @@ import csv
 import math
 import os
 import sys
-import pandas
 import logging
 
 
@@ -13,21 +12,104 @@ logging.basicConfig(
     format="%(levelname)s:%(asctime)s:%(module)s:%(lineno)d %(message)s"
 )
 
-vritti_df_map = {}
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# file extension -> (delimiter, index column, default text column)
+SCHEMAS = {
+    ".tsv": ("\t", "index", "vritti"),
+    ".csv": (",", "क्रमसङ्ख्या", "विवरणम्"),
+}
+
+
+class VrittiTable(object):
+    """One vritti file held as parallel tuples: ids, and one tuple of strings per column."""
+
+    def __init__(self, file_path):
+        (delimiter, index_column, self.default_column) = SCHEMAS[os.path.splitext(file_path)[1]]
+        with open(file_path, encoding="utf-8", newline="") as vritti_file:
+            reader = csv.reader(vritti_file, delimiter=delimiter)
+            self.columns = next(reader)
+            rows = [row + [""] * (len(self.columns) - len(row)) for row in reader if len(row) > 0]
+        index_position = self.columns.index(index_column)
+        self.ids = tuple(row[index_position] for row in rows)
+        self.column_values = {column: tuple(row[position] for row in rows) for (position, column) in enumerate(self.columns)}
+        # Later rows win for repeated ids.
+        self.positions = {suutra_id: position for (position, suutra_id) in enumerate(self.ids)}
+
+    def get(self, suutra_id, column=None, default=None):
+        position = self.positions.get(suutra_id)
+        if position is None:
+            return default
+        return self.column_values[column or self.default_column][position]
+
+
+class VrittiStore(object):
+    """Vritti files of a data dir (vritti_id.tsv or vritti_id.csv), each loaded on first access."""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.tables = {}
+
+    def get_vritti_ids(self):
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.data_dir) if os.path.splitext(name)[1] in SCHEMAS)
+
+    def get_table(self, vritti_id):
+        table = self.tables.get(vritti_id)
+        if table is None:
+            for extension in SCHEMAS:
+                file_path = os.path.join(self.data_dir, vritti_id + extension)
+                if os.path.exists(file_path):
+                    table = VrittiTable(file_path=file_path)
+                    break
+            else:
+                raise KeyError(vritti_id)
+            self.tables[vritti_id] = table
+        return table
+
+    def get(self, vritti_id, suutra_id, column=None, default=None):
+        return self.get_table(vritti_id).get(suutra_id, column=column, default=default)
+
+    def get_many(self, vritti_id, suutra_ids, column=None):
+        """(suutra_id, text) for each of suutra_ids present in the vritti, in the given order."""
+        table = self.get_table(vritti_id)
+        values = table.column_values[column or table.default_column]
+        return [(suutra_id, values[table.positions[suutra_id]]) for suutra_id in suutra_ids if suutra_id in table.positions]
+
+    def get_range(self, vritti_id, prefix, column=None):
+        """(suutra_id, text) of all entries whose id starts with prefix (e.g. "1.2." or, for uNAdi, "5."), in file order."""
+        table = self.get_table(vritti_id)
+        return self.get_many(vritti_id, [suutra_id for suutra_id in table.ids if suutra_id.startswith(prefix)], column=column)
+
+    def get_pada(self, vritti_id, adhyaya, pada, column=None):
+        return self.get_range(vritti_id, "%s.%s." % (adhyaya, pada), column=column)
+
+    def items(self, vritti_id, column=None):
+        table = self.get_table(vritti_id)
+        return list(zip(table.ids, table.column_values[column or table.default_column]))
+
+    def get_all_vrittis(self, suutra_id, vritti_ids=None):
+        """{vritti_id: text} of every vritti having an entry for suutra_id."""
+        result = {}
+        for vritti_id in vritti_ids or self.get_vritti_ids():
+            text = self.get(vritti_id, suutra_id)
+            if text is not None:
+                result[vritti_id] = text
+        return result
+
+
+vritti_store = VrittiStore()
+
 
 def setup_vritti(vritti_id):
-    vritti_tsv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", vritti_id + ".tsv")
-    vritti_df = pandas.read_csv(vritti_tsv_path, sep="\t", keep_default_na=False)
-    vritti_df = vritti_df.set_index("index")
-    vritti_df_map[vritti_id] = vritti_df
-    # exit()
+    # Optional - vrittis are also loaded on first access.
+    vritti_store.get_table(vritti_id)
 
 
 def get_vritti(vritti_id, suutra_id):
-    vritti = vritti_df_map[vritti_id].loc[suutra_id, "vritti"]
+    vritti = vritti_store.get(vritti_id, suutra_id)
     return vritti
 
 
 if __name__ == '__main__':
     setup_vritti("topic")
-    get_vritti(suutra_id="1.4.2", vritti_id="topic")
\ No newline at end of file
+    get_vritti(suutra_id="1.4.2", vritti_id="topic")
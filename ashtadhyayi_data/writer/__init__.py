@@ -6,6 +6,8 @@ import doc_curation.md.library.arrangement
 from doc_curation.md import library
 from doc_curation.md.file import MdFile
 
+from ashtadhyayi_data.writer.sink import OutputSink
+
 for handler in logging.root.handlers[:]:
   logging.root.removeHandler(handler)
 logging.basicConfig(
@@ -26,31 +28,30 @@ def get_output_path(base_dir, vritti_id, suutra_id):
   return outpath
 
 
-def dump_tsv_vritti(vritti_id):
+def dump_tsv_vritti(vritti_id, base_dir=shared_repo_path, dry_run=False):
   from ashtadhyayi_data.reader import vritti_tsv
-  vritti_tsv.setup_vritti(vritti_id=vritti_id)
-  for suutra_id in ashtadhyayi_data.suutra_df.index:
-    vritti = vritti_tsv.get_vritti(vritti_id=vritti_id, suutra_id=suutra_id)
-    if vritti is not None:
-      outpath = get_output_path(base_dir=shared_repo_path, vritti_id=vritti_id, suutra_id=suutra_id)
-      os.makedirs(os.path.dirname(outpath), exist_ok=True)
-      with open(outpath, 'w', encoding="utf8") as outfile:
-        outfile.write(vritti)
+  suutra_ids = ashtadhyayi_data.get_suutra_registry().ids()
+  with OutputSink(base_dir=base_dir, dry_run=dry_run) as sink:
+    sink.precreate_pada_dirs(sub_dir=vritti_id)
+    for (suutra_id, vritti) in vritti_tsv.vritti_store.get_many(vritti_id=vritti_id, suutra_ids=suutra_ids):
+      sink.write(get_output_path(base_dir=base_dir, vritti_id=vritti_id, suutra_id=suutra_id), vritti)
+  return sink.close()
 
 
 def dump_per_suutra_mds(outpath, dry_run=False):
   md_file = MdFile(file_path="/home/vvasuki/ashtadhyayi/ashtadhyayi.github.io/content/sutra-details.md")
   (_, template_content) = md_file.read()
-  suutra_df = ashtadhyayi_data.get_suutra_df()
-  for suutra_id in suutra_df.index:
-    dest_path = os.path.join(outpath, ashtadhyayi_data.get_adhyaya_pada_id(suutra_id), "%s.md" % suutra_id)
-    md_file = MdFile(file_path=dest_path)
-    title = suutra_df.loc[suutra_id, "sutra"]
-    title = "%s %s" % (suutra_id, title)
-    [adhyaaya, paada, suutra] = suutra_id.split(".")
-    content = template_content.replace("ADHYAAYA", adhyaaya).replace("PAADA", paada).replace("SUUTRA", suutra)
-    md_file.dump_to_file(metadata={"title": title}, content=content, dry_run=dry_run)
-  doc_curation.md.library.arrangement.fix_index_files(dir_path=outpath)
+  with OutputSink(base_dir=outpath, dry_run=dry_run) as sink:
+    sink.precreate_pada_dirs(prefix="")
+    for (suutra_id, title) in ashtadhyayi_data.get_suutra_registry().items():
+      dest_path = os.path.join(outpath, ashtadhyayi_data.get_adhyaya_pada_id(suutra_id), "%s.md" % suutra_id)
+      title = "%s %s" % (suutra_id, title)
+      [adhyaaya, paada, suutra] = suutra_id.split(".")
+      content = template_content.replace("ADHYAAYA", adhyaaya).replace("PAADA", paada).replace("SUUTRA", suutra)
+      sink.write_md(dest_path, metadata={"title": title}, content=content, frontmatter_type=MdFile.TOML)
+  if not dry_run:
+    doc_curation.md.library.arrangement.fix_index_files(dir_path=outpath)
+  return sink.close()
 
 if __name__ == '__main__':
   pass
@@ -1,51 +1,137 @@
 """
-it uses above structures to generate babylon files of given vritti
-object. ``create_babylon`` function takes optional custom functions, to
-customize head_words, content, directives for our requirement. if
-custome functions not provided, it uses default functions in same
-module.
+Generates babylon dictionary files of vrittis, with one entry per sutra. ``create_babylon`` takes
+optional custom functions to customize head_words, content and directives. If custom functions
+are not provided, it uses the default functions in this module.
+
+A vritti is read as a sequence of sutra documents - dicts with "index", "sutra" and "content" -
+either from the markdown files of the vritti repo (``get_repo_documents``) or from the bundled
+tsv vrittis (``get_tsv_documents``). Each document is read once, the markdown contents are
+rendered to html in a process pool, and entries are written in sutra order through one buffered
+file.
 
 following is example code.
 
 .. code:: python
 
-   from ashtadhyayi_repo_parser.structures import Vritti, Adhyaaya, Paada, Sutra
-   from ashtadhyayi_repo_parser.helpers.babylon_helper import create_babylon
-
-   kashika = Vritti('kashika', root_dir_path='/home/user/path/to/ashtadhyayi/kashika/')
+   from ashtadhyayi_data.writer import babylon
 
-   create_babylon(kashika, babylon_file_path='/home/path/to/kashika.babylon')  # it will save babylon file at babylon_file_path
+   babylon.create_babylon("kashika", babylon_file_path='/home/path/to/kashika.babylon')
 
-   # we can provide optional arguments to cutomize output.
+   # All vrittis of the repo and the bundled tsv vrittis, into one dir:
+   babylon.create_babylons(output_dir="/home/path/to/babylons")
 
+or ``python -m ashtadhyayi_data.writer.babylon OUTPUT_DIR [VRITTI_ID ...]``.
 """
+import functools
+import json
+import os
+import sys
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-from mistune import Markdown
+import mistune
 from indic_transliteration.sanscript import transliterate, DEVANAGARI, ITRANS
 
-from ashtadhyayi_data.structures import *
+import ashtadhyayi_data
+from ashtadhyayi_data.reader import vritti_repo, vritti_tsv
+
+# Optional on-disk cache of the headword transliterations (see get_headword_table).
+HEADWORD_CACHE_PATH = os.environ.get("ASHTADHYAYI_HEADWORD_CACHE_PATH", None)
+# Sutra text column of tsv vrittis not keyed by sutra id (uNAdi).
+SUTRA_COLUMN = "सूत्रम्"
+
+
+def get_sutra_order_key(suutra_id):
+    registry = ashtadhyayi_data.get_suutra_registry()
+    if suutra_id in registry:
+        return (0, registry.position(suutra_id), suutra_id)
+    return (1, 0, suutra_id)
+
+
+def get_repo_documents(vritti_id):
+    """Sutra documents of a vritti from its markdown files in the vritti repo, in sutra order."""
+    file_paths = vritti_repo.get_file_paths(vritti_id=vritti_id)
+    file_paths.sort(key=lambda file_path: get_sutra_order_key(os.path.splitext(os.path.basename(file_path))[0]))
+    for file_path in file_paths:
+        try:
+            (header, content) = vritti_repo.read_vritti_document(file_path)
+        except Exception as e:
+            print('error in reading {}'.format(file_path), str(e))
+            continue
+        yield {"index": str(header.get("index", "")), "sutra": header.get("sutra", ""), "content": content}
+
 
+def get_tsv_documents(vritti_id):
+    """Sutra documents of a bundled tsv vritti, in sutra order - or, for tables with their own numbering and a sutra column (uNAdi), in file order."""
+    if SUTRA_COLUMN in vritti_tsv.vritti_store.get_table(vritti_id).columns:
+        sutras = vritti_tsv.vritti_store.items(vritti_id, column=SUTRA_COLUMN)
+        for ((index, vritti), (_, sutra)) in zip(vritti_tsv.vritti_store.items(vritti_id), sutras):
+            yield {"index": index, "sutra": sutra.strip().rstrip("॥").strip(), "content": vritti}
+        return
+    registry = ashtadhyayi_data.get_suutra_registry()
+    for (suutra_id, vritti) in vritti_tsv.vritti_store.get_many(vritti_id=vritti_id, suutra_ids=registry.ids()):
+        yield {"index": suutra_id, "sutra": registry[suutra_id], "content": vritti}
 
-def default_babylon_directives_generator(vritti):
+
+def get_documents(vritti_id):
+    if vritti_id in vritti_tsv.vritti_store.get_vritti_ids():
+        return get_tsv_documents(vritti_id)
+    return get_repo_documents(vritti_id)
+
+
+def default_babylon_directives_generator(vritti_id):
     babylon_directives = OrderedDict([
         ("stripmethod", "keep"),
         ("sametypesequence", "h"),
-        ("bookname", (vritti.metadata or {}).get('name', None) or vritti.name)
+        ("bookname", vritti_id)
     ])
     return babylon_directives
 
 
-def default_headwords_generator(sutra):
-    try:
-        json_doc = sutra.json()
-    except Exception as e:
-        print('error in reading {}'. format(sutra.index), str(e))
-        return None
-    index = json_doc.get('index', '')
-    index_de = transliterate(index, ITRANS, DEVANAGARI)
-    sutra = json_doc.get('sutra', '')
-    suutra_itrans = transliterate(sutra, DEVANAGARI, ITRANS).replace('|', '।')
+@functools.lru_cache(maxsize=1 << 16)
+def transliterate_cached(text, source_scheme, target_scheme):
+    return transliterate(text, source_scheme, target_scheme)
+
+
+def _build_headword_table():
+    registry = ashtadhyayi_data.get_suutra_registry()
+    return {suutra_id: (transliterate(suutra_id, ITRANS, DEVANAGARI), transliterate(sutra, DEVANAGARI, ITRANS)) for (suutra_id, sutra) in registry.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def get_headword_table(cache_path=None):
+    """{suutra_id: (devanagari index, itrans sutra)} for the sutras of sutrANi.tsv, built once per process.
+
+    With cache_path (default HEADWORD_CACHE_PATH, if set), the table is kept on disk and rebuilt only when sutrANi.tsv changes.
+    """
+    cache_path = cache_path or HEADWORD_CACHE_PATH
+    if cache_path is None:
+        return _build_headword_table()
+    stat = os.stat(ashtadhyayi_data.SUUTRA_TSV_PATH)
+    source_key = [stat.st_mtime_ns, stat.st_size, ITRANS, DEVANAGARI]
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+        if cache.get("source") == source_key:
+            return {suutra_id: tuple(values) for (suutra_id, values) in cache["headwords"].items()}
+    headword_table = _build_headword_table()
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as cache_file:
+        json.dump({"source": source_key, "headwords": headword_table}, cache_file, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+    return headword_table
+
+
+def default_headwords_generator(document):
+    index = document.get('index', '')
+    sutra = document.get('sutra', '')
+    # Most documents carry the canonical sutra text; other texts (and indices) go through the LRU cache.
+    (index_de, suutra_itrans) = get_headword_table().get(index, (None, None))
+    if index_de is None or sutra != ashtadhyayi_data.get_suutra_registry()[index]:
+        index_de = transliterate_cached(index, ITRANS, DEVANAGARI)
+        suutra_itrans = transliterate_cached(sutra, DEVANAGARI, ITRANS)
+    suutra_itrans = suutra_itrans.replace('|', '।')
     head_words = [
         index,
         index_de,
@@ -60,54 +146,90 @@ def default_headwords_generator(sutra):
     return head_words
 
 
-def default_content_generator(sutra, markdown_parser=None):
-    json_doc = sutra.json()
-    markdown_parser = markdown_parser or Markdown()
-    content = json_doc['content']
-    content_parsed = markdown_parser(content).strip()
+def get_markdown_parser():
+    if hasattr(mistune, "create_markdown"):
+        # mistune >= 2. Markdown() there returns the syntax tree, not html.
+        return mistune.create_markdown()
+    return mistune.Markdown()
+
+
+_markdown_parser = None
+
+
+def default_content_generator(content):
+    """Html of a document's markdown content, on one line. Runs in the worker processes."""
+    global _markdown_parser
+    if _markdown_parser is None:
+        _markdown_parser = get_markdown_parser()
+    content_parsed = _markdown_parser(content).strip()
     content_parsed = content_parsed.replace('\n', '<BR>').replace('<code>', '<strong>').replace('</code>', '</strong>')
-    if content_parsed == '':
-        print('sutra {} has no content'.format(sutra.index))
     return content_parsed
 
 
 def create_babylon(
-        vritti, babylon_file_path,
+        vritti_id, babylon_file_path,
+        documents=None,
         babylon_directives_generator=default_babylon_directives_generator,
         headwords_generator=default_headwords_generator,
-        content_generator=default_content_generator):
-
-    try:
-        os.remove(babylon_file_path)
-    except FileNotFoundError:
-        pass
-
-    babylon_file = open(babylon_file_path, 'ab')
-    babylon_file.write('\n'.encode('utf-8'))
-
-    directives = babylon_directives_generator(vritti)
-    for key, val in directives.items():
-        directive_line = "#{key}={val}\n".format(key=key, val=val)
-        babylon_file.write(directive_line.encode('utf-8'))
-
-    babylon_file.write('\n'.encode('utf-8'))
-
-    markdown_parser = Markdown()
-
-    for adhyaaya in vritti:
-        for paada in adhyaaya:
-            for sutra in paada:
-                head_words = headwords_generator(sutra)
-                if not head_words:
-                    continue
-                content = content_generator(sutra, markdown_parser=markdown_parser)
-                if not content:
-                    continue
-                headwords_line = '|'.join(head_words) + '\n'
-                content_line = content.strip('\n') + '\n'
-
-                babylon_file.write(headwords_line.encode('utf-8'))
-                babylon_file.write(content_line.encode('utf-8'))
-                babylon_file.write('\n'.encode('utf-8'))
-
-    babylon_file.close()
+        content_generator=default_content_generator,
+        max_workers=None, chunksize=64, executor=None):
+    """Writes the babylon file of a vritti. Returns the number of entries written.
+
+    documents defaults to get_documents(vritti_id). Contents are rendered on executor if given, else on a new process pool of max_workers (in this process with max_workers=1). content_generator must be picklable (a module level function) unless max_workers=1.
+    """
+    if documents is None:
+        documents = get_documents(vritti_id)
+    entries = []
+    for document in documents:
+        head_words = headwords_generator(document)
+        if head_words and document.get("content", "").strip() != "":
+            entries.append((head_words, document["content"]))
+        elif head_words:
+            print('sutra {} has no content'.format(document.get("index")))
+
+    entry_count = 0
+    tmp_path = babylon_file_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as babylon_file:
+        babylon_file.write('\n')
+        for key, val in babylon_directives_generator(vritti_id).items():
+            babylon_file.write("#{key}={val}\n".format(key=key, val=val))
+        babylon_file.write('\n')
+
+        contents = (content for (_, content) in entries)
+        if executor is not None:
+            entry_count = _write_entries(babylon_file, entries, executor.map(content_generator, contents, chunksize=chunksize))
+        elif max_workers == 1:
+            entry_count = _write_entries(babylon_file, entries, map(content_generator, contents))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                rendered = executor.map(content_generator, contents, chunksize=chunksize)
+                entry_count = _write_entries(babylon_file, entries, rendered)
+    os.replace(tmp_path, babylon_file_path)
+    return entry_count
+
+
+def _write_entries(babylon_file, entries, rendered):
+    entry_count = 0
+    for ((head_words, _), content) in zip(entries, rendered):
+        if not content:
+            continue
+        babylon_file.write('|'.join(head_words) + '\n' + content.strip('\n') + '\n\n')
+        entry_count += 1
+    return entry_count
+
+
+def create_babylons(output_dir, vritti_ids=None, max_workers=None):
+    """Babylon files (output_dir/<vritti_id>.babylon) of the given vrittis - by default, all those of the vritti repo and the tsv vrittis. Returns {vritti_id: entry count}."""
+    if vritti_ids is None:
+        vritti_ids = sorted(set(vritti_repo.get_vritti_ids()) | set(vritti_tsv.vritti_store.get_vritti_ids()))
+    os.makedirs(output_dir, exist_ok=True)
+    counts = OrderedDict()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for vritti_id in vritti_ids:
+            counts[vritti_id] = create_babylon(vritti_id, babylon_file_path=os.path.join(output_dir, vritti_id + ".babylon"), executor=executor)
+            print(vritti_id, counts[vritti_id])
+    return counts
+
+
+if __name__ == '__main__':
+    create_babylons(output_dir=sys.argv[1], vritti_ids=sys.argv[2:] or None)
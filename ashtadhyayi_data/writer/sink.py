@@ -0,0 +1,122 @@
+"""
+Batched output of per-sutra files.
+
+OutputSink renders files on the calling thread and writes them through a bounded thread pool, so that filesystem latency overlaps with the transformation producing the next files. Files whose bytes are unchanged are not rewritten.
+"""
+import difflib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import toml
+import yaml
+from curation_utils import file_helper
+from doc_curation.md.file import MdFile
+
+import ashtadhyayi_data
+
+
+def render_md(metadata, content, frontmatter_type=MdFile.YAML):
+  """The text MdFile.dump_to_file would write."""
+  content = file_helper.clear_bad_chars(content)
+  if len(metadata) == 0:
+    return content
+  if frontmatter_type == MdFile.YAML:
+    yamlout = yaml.dump(metadata, default_flow_style=False, indent=2, allow_unicode=True, width=1000)
+    return "---\n{metadata}\n---\n{markdown}".format(metadata=yamlout, markdown=content)
+  return "+++\n{frontmatter}\n+++\n{markdown}".format(frontmatter=toml.dumps(metadata), markdown=content)
+
+
+class OutputSink(object):
+  """Writes files under base_dir, skipping those whose bytes are unchanged.
+
+  At most max_pending files are queued at a time. With dry_run, nothing is written and close() returns the unified diffs of the files which would change. Use as a context manager or call close().
+  """
+
+  def __init__(self, base_dir, dry_run=False, max_workers=8, max_pending=256):
+    self.base_dir = base_dir
+    self.dry_run = dry_run
+    self.executor = ThreadPoolExecutor(max_workers=max_workers)
+    self.slots = threading.BoundedSemaphore(max_pending)
+    self.lock = threading.Lock()
+    self.created_dirs = set()
+    self.futures = []
+    self.counts = {"added": 0, "changed": 0, "unchanged": 0}
+    self.diffs = {}
+    self.closed = False
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def precreate_pada_dirs(self, sub_dir="", prefix="pada-"):
+    """Creates base_dir/sub_dir/<prefix>X.Y for all padas."""
+    for pada_id in ashtadhyayi_data.get_suutra_registry().pada_ids():
+      self.makedirs(os.path.join(self.base_dir, sub_dir, prefix + pada_id))
+
+  def makedirs(self, dir_path):
+    if dir_path in self.created_dirs:
+      return
+    if not self.dry_run:
+      os.makedirs(dir_path, exist_ok=True)
+    with self.lock:
+      self.created_dirs.add(dir_path)
+
+  def write(self, file_path, text):
+    """Queues text for file_path, which already includes base_dir (as get_output_path() builds it)."""
+    self.makedirs(os.path.dirname(file_path))
+    self.slots.acquire()
+    future = self.executor.submit(self._write, file_path, text.encode("utf-8"))
+    future.add_done_callback(lambda _: self.slots.release())
+    self.futures.append(future)
+    if len(self.futures) >= 4096:
+      self._collect()
+
+  def write_md(self, file_path, metadata, content, frontmatter_type=MdFile.YAML):
+    self.write(file_path, render_md(metadata=metadata, content=content, frontmatter_type=frontmatter_type))
+
+  def _write(self, file_path, data):
+    try:
+      with open(file_path, "rb") as old_file:
+        old_data = old_file.read()
+    except FileNotFoundError:
+      old_data = None
+    if old_data == data:
+      status = "unchanged"
+    else:
+      status = "added" if old_data is None else "changed"
+      if self.dry_run:
+        old_lines = [] if old_data is None else old_data.decode("utf-8", errors="replace").splitlines(keepends=True)
+        diff = "".join(difflib.unified_diff(old_lines, data.decode("utf-8").splitlines(keepends=True), file_path, file_path))
+        with self.lock:
+          self.diffs[file_path] = diff
+      else:
+        with open(file_path, "wb") as out_file:
+          out_file.write(data)
+    with self.lock:
+      self.counts[status] += 1
+
+  def _collect(self):
+    # Surfaces write errors and drops finished futures.
+    pending = []
+    for future in self.futures:
+      if future.done():
+        future.result()
+      else:
+        pending.append(future)
+    self.futures = pending
+
+  def close(self):
+    """Waits for queued writes. Returns (added/changed/unchanged counts, {file_path: unified diff}); the diffs are filled only with dry_run."""
+    if self.closed:
+      return (self.counts, self.diffs)
+    self.closed = True
+    self.executor.shutdown(wait=True)
+    for future in self.futures:
+      future.result()
+    self.futures = []
+    logging.info("%s: %d added, %d changed, %d unchanged", self.base_dir, self.counts["added"], self.counts["changed"], self.counts["unchanged"])
+    return (self.counts, self.diffs)
@@ -0,0 +1,33 @@
+"""
+Times generating babylon headwords for every sutra, N_VRITTIS times over (as when exporting
+that many vrittis): transliterating afresh each time against the memoized headword table.
+
+python benchmarks/babylon_headword_benchmark.py [N_VRITTIS]
+"""
+import sys
+import time
+
+import ashtadhyayi_data
+from indic_transliteration.sanscript import transliterate, DEVANAGARI, ITRANS
+
+from ashtadhyayi_data.writer import babylon
+
+
+def uncached_headwords(document):
+    return (transliterate(document["index"], ITRANS, DEVANAGARI), transliterate(document["sutra"], DEVANAGARI, ITRANS))
+
+
+def timed(label, fn, documents, n_vrittis):
+    start = time.perf_counter()
+    for _ in range(n_vrittis):
+        for document in documents:
+            fn(document)
+    print("%-24s %.3fs" % (label, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    n_vrittis = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    documents = [{"index": suutra_id, "sutra": sutra} for (suutra_id, sutra) in ashtadhyayi_data.get_suutra_registry().items()]
+    print("%d sutras x %d vrittis" % (len(documents), n_vrittis))
+    timed("transliterate each time", uncached_headwords, documents, n_vrittis)
+    timed("headword table", babylon.default_headwords_generator, documents, n_vrittis)
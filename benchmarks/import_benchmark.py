@@ -0,0 +1,42 @@
+"""
+Startup time of `import ashtadhyayi_data` plus the first sutra lookup, in fresh interpreters:
+through the registry, through the lazily built pandas view, and the former pandas.read_csv path.
+
+python benchmarks/import_benchmark.py [REPEAT]
+"""
+import subprocess
+import sys
+import time
+
+SNIPPETS = [
+    ("registry", "import ashtadhyayi_data; ashtadhyayi_data.get_suutra_registry()['1.1.1']"),
+    ("registry (sidecar)", "import ashtadhyayi_data; ashtadhyayi_data.get_suutra_registry()['1.1.1']"),
+    ("get_suutra_df", "import ashtadhyayi_data; ashtadhyayi_data.get_suutra_df().loc['1.1.1', 'sutra']"),
+    ("pandas.read_csv (former)", "import ashtadhyayi_data, pandas; pandas.read_csv(ashtadhyayi_data.SUUTRA_TSV_PATH, sep='\\t').set_index('id').loc['1.1.1', 'sutra']"),
+]
+
+
+def time_snippet(snippet, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", snippet])
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    import os
+    import ashtadhyayi_data
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = time_snippet("pass", repeat)
+    print("%-28s %.3fs" % ("python -c pass", baseline))
+    for (label, snippet) in SNIPPETS:
+        sidecar = label.endswith("(sidecar)")
+        if sidecar:
+            ashtadhyayi_data.build_suutra_sidecar()
+        try:
+            print("%-28s %.3fs" % (label, time_snippet(snippet, repeat)))
+        finally:
+            if sidecar:
+                os.remove(ashtadhyayi_data.SUUTRA_SIDECAR_PATH)
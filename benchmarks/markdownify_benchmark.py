@@ -0,0 +1,55 @@
+"""
+Throughput of transformer.markdownify against the earlier one-regex.sub-per-rule version, over
+a sample commentary built by repeating the markdownify test fixtures (or over FILE, a commentary
+json from ashtadhyayi.com, if given).
+
+python benchmarks/markdownify_benchmark.py [FILE]
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+import regex
+
+from ashtadhyayi_data.reader.ashtadhyayi_com.suutra import transformer
+
+
+def markdownify_sequential(content):
+    content = regex.sub(r"\r?\n", "\n\n", content)
+    content = regex.sub("<<", "_", content)
+    content = regex.sub(">>", "_", content)
+    content = regex.sub("##", "  \n", content)
+    content = regex.sub("##", "  \n", content)
+    content = regex.sub(r"\$(\d)\$(\d)\$(\d+)", r" (\1.\2.\3)", content)
+    content = regex.sub(r"\$(\d)(\d)0*(\d+)", r" (\1.\2.\3)", content)
+    return content
+
+
+def sample_comments():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as commentary_file:
+            comments = json.load(commentary_file).values()
+        return [comment for comment in comments if isinstance(comment, str)]
+    fixtures = []
+    for input_path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "tests", "data", "markdownify", "*.txt"))):
+        with open(input_path, encoding="utf-8", newline="") as input_file:
+            fixtures.append(input_file.read() + "इदानीं संज्ञान्तराणि विधास्यन् वृद्धिसंज्ञां तावदाह। " * 20)
+    return fixtures * 2000
+
+
+def timed(label, fn, comments, megabytes):
+    start = time.perf_counter()
+    for comment in comments:
+        fn(comment)
+    seconds = time.perf_counter() - start
+    print("%-24s %.3fs %.1f MB/s" % (label, seconds, megabytes / seconds))
+
+
+if __name__ == '__main__':
+    comments = sample_comments()
+    megabytes = sum(len(comment.encode("utf-8")) for comment in comments) / 1e6
+    print("%d comments, %.1f MB" % (len(comments), megabytes))
+    timed("sequential regex.sub", markdownify_sequential, comments, megabytes)
+    timed("single pass", transformer.markdownify, comments, megabytes)
@@ -0,0 +1,71 @@
+"""
+Compares the old set-union n-gram extraction of abnormngramscraper with the streaming
+ngramcount extractor, over the Devanagari texts shipped in this repository.
+
+python benchmarks/ngram_benchmark.py
+"""
+import glob
+import os
+import re
+import timeit
+
+from indic_transliteration import sanscript
+
+from ashtadhyayi_data.correction.ngram import ngramcount
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ashtadhyayi_data")
+CORPUS_GLOBS = ["correction/test.md", "correction/ngram/test.md", "data/*.tsv", "reader/vritti_tsv/data/topic.tsv", "reader/vritti_tsv/data/uNAdi.csv"]
+
+
+# The extraction as it was before ngramcount (run on str, since the byte-string version no longer
+# runs under Python 3).
+def legacy_ngrams(input, n):
+    output = set()
+    if n >= len(input):
+        pass
+    else:
+        for i in range(len(input) - n + 1):
+            output.add(input[i:i + n])
+    return output
+
+
+def legacy_getngrams(line, nth):
+    words = re.split(u' ', line)
+    ngr = set()
+    for word in words:
+        ngr = ngr.union(legacy_ngrams(word, nth))
+    return ngr
+
+
+def load_corpus():
+    texts = []
+    for pattern in CORPUS_GLOBS:
+        for path in sorted(glob.glob(os.path.join(PACKAGE_DIR, pattern))):
+            with open(path, encoding="utf-8") as f:
+                text = sanscript.transliterate(f.read(), sanscript.DEVANAGARI, sanscript.SLP1)
+            texts.append(re.sub("[^a-zA-Z ']+", " ", text))
+    return texts
+
+
+def run_legacy(texts, nth):
+    result = set()
+    for text in texts:
+        result = result.union(legacy_getngrams(text, nth))
+    return result
+
+
+def run_streaming(texts, nth):
+    counts = None
+    for text in texts:
+        counts = ngramcount.countngrams(text.split(" "), nth, counts)
+    return counts
+
+
+if __name__ == '__main__':
+    texts = load_corpus()
+    print("corpus: %d texts, %d words" % (len(texts), sum(len(text.split()) for text in texts)))
+    for nth in (2, 3):
+        assert set(run_streaming(texts, nth)) == run_legacy(texts, nth)
+        legacy_time = min(timeit.repeat(lambda: run_legacy(texts, nth), number=1, repeat=5))
+        streaming_time = min(timeit.repeat(lambda: run_streaming(texts, nth), number=1, repeat=5))
+        print("%d-grams: set-union %.3fs, streaming Counter %.3fs (%.1fx)" % (nth, legacy_time, streaming_time, legacy_time / streaming_time))
@@ -0,0 +1,54 @@
+"""
+Compares Devanagari -> SLP1 transliteration of whole documents by the xml transcoder with
+sanscript.transliterate applied line by line (as slp1words and the scrapers did), over the
+Devanagari texts shipped in this repository, or over the .md files of ROOT (a commentary
+checkout, e.g. the parent of kashika/) if given.
+
+python benchmarks/transcoder_benchmark.py [ROOT]
+"""
+import glob
+import os
+import sys
+import time
+
+from indic_transliteration import sanscript
+
+from ashtadhyayi_data.correction.ngram import transcoder
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ashtadhyayi_data")
+CORPUS_GLOBS = ["correction/test.md", "correction/ngram/test.md", "data/*.tsv", "reader/vritti_tsv/data/*.tsv", "reader/vritti_tsv/data/uNAdi.csv"]
+
+
+def load_documents():
+    if len(sys.argv) > 1:
+        paths = glob.glob(os.path.join(sys.argv[1], "*", "pada-*", "*.md"))
+    else:
+        paths = [path for pattern in CORPUS_GLOBS for path in glob.glob(os.path.join(PACKAGE_DIR, pattern))]
+    documents = []
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as f:
+            documents.append(f.read())
+    return documents
+
+
+def sanscript_by_line(document):
+    return "".join(sanscript.transliterate(line, sanscript.DEVANAGARI, sanscript.SLP1) for line in document.splitlines(keepends=True))
+
+
+def timed(label, fn, documents, megabytes):
+    start = time.perf_counter()
+    for document in documents:
+        fn(document)
+    seconds = time.perf_counter() - start
+    print("%-28s %.3fs %.2f MB/s" % (label, seconds, megabytes / seconds))
+
+
+if __name__ == '__main__':
+    documents = load_documents()
+    megabytes = sum(len(document.encode("utf-8")) for document in documents) / 1e6
+    print("%d documents, %.1f MB" % (len(documents), megabytes))
+    start = time.perf_counter()
+    transcoder.gettranscoder("deva", "slp1")
+    print("%-28s %.3fs" % ("compile deva_slp1.xml", time.perf_counter() - start))
+    timed("sanscript, line by line", sanscript_by_line, documents, megabytes)
+    timed("transcoder, whole document", lambda document: transcoder.transcoder_processString(document, "deva", "slp1"), documents, megabytes)
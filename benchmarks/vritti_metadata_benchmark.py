@@ -0,0 +1,50 @@
+"""
+Times reading the frontmatter metadata of a commentary: full frontmatter.load of every file,
+the header-only reader on a thread pool, and the header-only reader with a warm cache.
+A fixture tree of FILE_COUNT files is generated under a temporary ASHTADHYAYI_REPO_ROOT.
+
+python benchmarks/vritti_metadata_benchmark.py [FILE_COUNT]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import frontmatter
+
+from ashtadhyayi_data.reader import vritti_repo
+
+
+def make_fixture(repo_root, vritti_id, file_count):
+    body = "इदानीं संज्ञान्तराणि विधास्यन् वृद्धिसंज्ञां तावदाह। " * 60
+    for i in range(file_count):
+        suutra_id = "%d.%d.%d" % (i // 500 + 1, i // 125 % 4 + 1, i % 125 + 1)
+        pada_dir = os.path.join(repo_root, vritti_id, "pada-" + ".".join(suutra_id.split(".")[:2]))
+        os.makedirs(pada_dir, exist_ok=True)
+        with open(os.path.join(pada_dir, suutra_id + ".md"), "w", encoding="utf-8") as f:
+            f.write("---\nindex: '%s'\nvrittiindex: %d\nsutra: वृद्धिरादैच्\nvritti: kashika\n---\n\n%s\n" % (suutra_id, i, body))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    print("%-32s %.3fs" % (label, time.perf_counter() - start))
+
+
+def load_all_with_frontmatter(vritti_id):
+    for file_path in vritti_repo.get_file_paths(vritti_id=vritti_id):
+        with open(file_path) as f:
+            frontmatter.load(f)
+
+
+if __name__ == '__main__':
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vritti_repo.ASHTADHYAYI_REPO_ROOT = os.path.join(tmp_dir, "repo")
+        vritti_repo.METADATA_CACHE_DIR = os.path.join(tmp_dir, "cache")
+        make_fixture(vritti_repo.ASHTADHYAYI_REPO_ROOT, "kashika", file_count)
+        print("%d files" % file_count)
+        timed("frontmatter.load", lambda: load_all_with_frontmatter("kashika"))
+        timed("header-only, no cache", lambda: vritti_repo.get_vritti_metadata("kashika", use_cache=False))
+        timed("header-only, cold cache", lambda: vritti_repo.get_vritti_metadata("kashika"))
+        timed("header-only, warm cache", lambda: vritti_repo.get_vritti_metadata("kashika"))
@@ -0,0 +1,50 @@
+import os
+
+from ashtadhyayi_data.reader import vritti_repo
+from ashtadhyayi_data.writer import babylon
+
+
+def test_create_babylon_from_repo_in_sutra_order(tmp_path, monkeypatch, write_vritti_md):
+    monkeypatch.setattr(vritti_repo, "ASHTADHYAYI_REPO_ROOT", str(tmp_path / "repo"))
+    write_vritti_md(tmp_path / "repo", "kashika", "1.1.10", "नाज्झलौ", "*अच्* च `हल्` च")
+    write_vritti_md(tmp_path / "repo", "kashika", "1.1.2", "अदेङ्गुणः", "")
+    write_vritti_md(tmp_path / "repo", "kashika", "1.1.1", "वृद्धिरादैच्", "वृद्धिः\n\nसंज्ञा")
+    babylon_path = str(tmp_path / "kashika.babylon")
+    assert babylon.create_babylon("kashika", babylon_file_path=babylon_path, max_workers=2) == 2
+    with open(babylon_path, encoding="utf-8") as f:
+        entries = f.read().split("\n\n")
+    assert entries[0] == "\n#stripmethod=keep\n#sametypesequence=h\n#bookname=kashika"
+    assert entries[1].startswith("1.1.1|१।१।१|वृद्धिरादैच्|")
+    assert entries[1].split("\n")[1] == "<p>वृद्धिः</p><BR><p>संज्ञा</p>"
+    assert entries[2].startswith("1.1.10|")
+    assert entries[2].split("\n")[1] == "<p><em>अच्</em> च <strong>हल्</strong> च</p>"
+
+
+def test_create_babylons_from_tsv(tmp_path, monkeypatch):
+    monkeypatch.setattr(vritti_repo, "ASHTADHYAYI_REPO_ROOT", str(tmp_path / "repo"))
+    counts = babylon.create_babylons(output_dir=str(tmp_path / "out"), vritti_ids=["topic"], max_workers=2)
+    with open(str(tmp_path / "out" / "topic.babylon"), encoding="utf-8") as f:
+        entries = f.read().split("\n\n")
+    assert counts["topic"] == len(entries) - 2
+    assert entries[1] == "1.1.1|१।१।१|वृद्धिरादैच्|vRRiddhirAdaich|1.1.1 vRRiddhirAdaich|vRRiddhirAdaich 1.1.1|१।१।१ वृद्धिरादैच्|वृद्धिरादैच् १।१।१\n<p>वृद्धिः</p>"
+
+
+def test_tables_with_their_own_numbering_take_the_sutra_column():
+    documents = list(babylon.get_tsv_documents("uNAdi"))
+    assert len(documents) > 700
+    assert documents[0]["index"] == "1.1"
+    assert documents[0]["sutra"] == "कृवापाजिमिस्वदिसाध्यशूभ्य उण्"
+    assert documents[0]["content"].startswith("करोतीति कारुः")
+
+
+def test_headwords_come_from_the_cached_table(tmp_path):
+    from indic_transliteration.sanscript import transliterate, DEVANAGARI, ITRANS
+    for document in [{"index": "1.1.1", "sutra": "वृद्धिरादैच्"}, {"index": "1.1.1", "sutra": "वृद्धिरादैच्|"}, {"index": "9.9.9", "sutra": "अ"}]:
+        suutra_itrans = transliterate(document["sutra"], DEVANAGARI, ITRANS).replace('|', '।')
+        assert babylon.default_headwords_generator(document)[1:4] == [transliterate(document["index"], ITRANS, DEVANAGARI), document["sutra"], suutra_itrans]
+    cache_path = str(tmp_path / "headwords.json")
+    headword_table = babylon.get_headword_table(cache_path=cache_path)
+    assert os.path.exists(cache_path)
+    babylon.get_headword_table.cache_clear()
+    assert babylon.get_headword_table(cache_path=cache_path) == headword_table
+    assert headword_table["1.1.1"] == ("१।१।१", "vRRiddhirAdaich")
@@ -0,0 +1,40 @@
+import shutil
+
+import ashtadhyayi_data
+from ashtadhyayi_data.reader import citations, vritti_tsv
+
+
+def test_extract_citations_in_all_encodings():
+    text = "अत्र $1$1$3 इति, $11002 इति (1.1.3) च। ’7-3-33 आतो युक्…’ (9.9.9) $3$3$300"
+    registry = ashtadhyayi_data.get_suutra_registry()
+    assert citations.extract_citations(text) == tuple(registry.position(suutra_id) for suutra_id in ["1.1.3", "1.1.2", "7.3.33"])
+
+
+def test_graph_queries_and_incremental_update(tmp_path, write_vritti_md):
+    root = tmp_path / "repo"
+    write_vritti_md(root, "kashika", "1.1.1", "वृद्धिरादैच्")
+    md_path = root / "kashika" / "pada-1.1" / "1.1.1.md"
+    md_path.write_text("---\nindex: '1.1.1'\n---\n\nवृद्धिः (1.1.3) इति। $7$3$33\n", encoding="utf-8")
+    write_vritti_md(root, "nyasa", "1.1.2", "अदेङ् गुणः")
+    (root / "nyasa" / "pada-1.1" / "1.1.2.md").write_text("---\nindex: '1.1.2'\n---\n\n$11001 इति\n", encoding="utf-8")
+    tsv_dir = tmp_path / "tsv"
+    tsv_dir.mkdir()
+    shutil.copy(vritti_tsv.DATA_DIR + "/uNAdi.csv", str(tsv_dir))
+    graph_path = str(tmp_path / "citations.pickle")
+
+    graph = citations.get_citation_graph(graph_path=graph_path, root=str(root), tsv_dir=str(tsv_dir))
+    assert graph.cites("kashika", "1.1.1") == ["1.1.3", "7.3.33"]
+    assert graph.cites("nyasa", "1.1.2") == ["1.1.1"]
+    assert graph.cites("nyasa", "1.1.1") == []
+    assert graph.cited_by("7.3.33") == [("kashika", "1.1.1"), ("uNAdi", "1.1")]
+    assert graph.cited_by("7.3.33", commentary="uNAdi") == [("uNAdi", "1.1")]
+    assert graph.cited_by("1.1.1") == [("nyasa", "1.1.2")]
+
+    graph = citations.CitationGraph.load(graph_path, root=str(root), tsv_dir=str(tsv_dir))
+    assert graph.update() == 0
+    assert graph.cited_by("7.3.33", commentary="kashika") == [("kashika", "1.1.1")]
+    md_path.write_text("---\nindex: '1.1.1'\n---\n\nवृद्धिः (1.1.4) इति।\n", encoding="utf-8")
+    assert graph.update() == 1
+    assert graph.cites("kashika", "1.1.1") == ["1.1.4"]
+    assert graph.cited_by("7.3.33") == [("uNAdi", "1.1")]
+    assert graph.cites("uNAdi", "1.3") == ["7.3.35"]
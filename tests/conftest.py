@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def write_md():
+    """Writes root/<book>/pada-X.Y/<suutra_id>.md with an index frontmatter and body; returns its path."""
+    def write(root, book, suutra_id, body):
+        pada_dir = root / book / ("pada-" + ".".join(suutra_id.split(".")[:2]))
+        pada_dir.mkdir(parents=True, exist_ok=True)
+        md_path = pada_dir / (suutra_id + ".md")
+        md_path.write_text("---\nindex:  %s\n---\n\n%s\n" % (suutra_id, body), encoding="utf-8")
+        return md_path
+    return write
+
+
+@pytest.fixture
+def write_vritti_md():
+    """Writes root/<vritti_id>/pada-X.Y/<suutra_id>.md with index and sutra metadata and the given body."""
+    def write(root, vritti_id, suutra_id, sutra, body="वृत्तिः"):
+        pada_dir = root / vritti_id / ("pada-" + ".".join(suutra_id.split(".")[:2]))
+        pada_dir.mkdir(parents=True, exist_ok=True)
+        (pada_dir / (suutra_id + ".md")).write_text("---\nindex: '%s'\nsutra: %s\n---\n\n%s\n" % (suutra_id, sutra, body), encoding="utf-8")
+    return write
@@ -0,0 +1,23 @@
+from ashtadhyayi_data.correction import corpus, detectors, plugins
+
+
+def test_walk_yields_sorted_entries(tmp_path, write_md):
+    write_md(tmp_path, "nyasa", "1.2.1", "अ")
+    write_md(tmp_path, "kashika", "1.1.2", "अ")
+    write_md(tmp_path, "kashika", "1.1.1", "अ")
+    entries = list(corpus.walk(str(tmp_path)))
+    assert [(e.book, e.pada, e.suutra_id) for e in entries] == [("kashika", "pada-1.1", "1.1.1"), ("kashika", "pada-1.1", "1.1.2"), ("nyasa", "pada-1.2", "1.2.1")]
+    assert [e.suutra_id for e in corpus.walk(str(tmp_path), books=["nyasa"])] == ["1.2.1"]
+
+
+def test_run_applies_plugins_in_order(tmp_path, write_md):
+    first = write_md(tmp_path, "kashika", "1.1.1", "ह्यस्वः सावण्र्यं `इति' ऐच्()-")
+    write_md(tmp_path, "nyasa", "1.1.1", "आदिश्येरन्() सामथ्र्यात्")
+    for workers in [1, 2]:
+        (changed, records) = corpus.run([plugins.hrhy, plugins.issue6], root=str(tmp_path), workers=workers)
+        assert changed == (1 if workers == 1 else 0)
+        assert records == [[], []]
+    (repha, issue10) = detectors.run([detectors.repha, detectors.issue10], root=str(tmp_path), workers=1)
+    assert [r.split(":")[:2] for r in repha] == [["सावण्र्यं", "सावर्ण्यं"], ["सामथ्र्यात्", "सामर्थ्यात्"]]
+    assert [r.split(":")[0] for r in issue10] == ["ऐच्()-", "आदिश्येरन्()"]
+    assert "ह्रस्वः सावण्र्यं `इति` ऐच्()-" in first.read_text(encoding="utf-8")
@@ -0,0 +1,33 @@
+import random
+
+from ashtadhyayi_data.correction import corrections
+
+
+def test_multi_replacer_matches_sequential_changes():
+    fragments = [a for (a, b) in corrections.changelist2] + [b for (a, b) in corrections.changelist2] + [" ", "अ", "्", "र", "य", "ह"]
+    rng = random.Random(0)
+    for _ in range(2000):
+        data = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 12)))
+        assert corrections.replacer2.replace(data) == corrections.changes(data, corrections.changelist2)
+
+
+def test_multi_replacer_keeps_chain_order():
+    changelist = [("ab", "x"), ("xc", "y"), ("b", "z"), ("ab", "x")]
+    replacer = corrections.MultiReplacer(changelist)
+    for data in ["abc", "abcb", "bab", "xcab", "abab"]:
+        assert replacer.replace(data) == corrections.changes(data, changelist)
+
+
+def test_multi_replacer_keeps_duplicates_that_feed_themselves():
+    changelist = [("ab", "abab"), ("ab", "abab"), ("र", "रर"), ("x", "y"), ("र", "रर")]
+    replacer = corrections.MultiReplacer(changelist)
+    for data in ["ab", "cabd", "र", "xर"]:
+        assert replacer.replace(data) == corrections.changes(data, changelist)
+
+
+def test_equivalence_reports_no_diff(tmp_path):
+    md_path = tmp_path / "1.1.1.md"
+    md_path.write_text("---\nindex: 1.1.1\n---\nप्रगृह्रम् ह्यस्वः ह्यदः\n", encoding="utf-8")
+    assert corrections.equivalence(str(md_path)) == ""
+    assert corrections.correction(str(md_path))
+    assert "ह्रस्वः ह्रदः" in md_path.read_text(encoding="utf-8")
@@ -0,0 +1,48 @@
+from functools import partial
+
+from ashtadhyayi_data.correction import corpus, detectors
+from ashtadhyayi_data.correction.ngram import ngramindex
+
+
+def test_detectors_share_one_parse_and_the_slp1_cache(tmp_path, write_md):
+    write_md(tmp_path, "kashika", "1.1.1", "ह्यस्वः सावण्र्यं ऐच्()- युश्मे")
+    write_md(tmp_path, "nyasa", "1.1.1", "ह्यस्वः युष्मे")
+    cache_path = str(tmp_path / "slp1cache.pickle")
+    cache = ngramindex.Slp1Cache(cache_path)
+    index = ngramindex.NgramIndex(indexfile=str(tmp_path / "index.pickle"), root=str(tmp_path), books=["kashika", "nyasa"], slp1cache=cache)
+    assert index.update() == 2
+    assert len(ngramindex.Slp1Cache(cache_path).entries) == 2
+
+    ngram = partial(detectors.ngram, nth=3, basengrams=index.basengrams("kashika", 3))
+    for workers in [1, 2]:
+        cache = ngramindex.Slp1Cache(cache_path)
+        (hrhy, repha, issue10, suspects) = detectors.run([detectors.hrhy, detectors.repha, detectors.issue10, ngram], root=str(tmp_path), books=["kashika"], workers=workers, slp1cache=cache)
+        path = str(tmp_path / "kashika" / "pada-1.1" / "1.1.1.md")
+        assert hrhy == ["ह्यस्वः:ह्यस्वः:" + path]
+        assert repha == ["सावण्र्यं:सावर्ण्यं:" + path]
+        assert issue10 == ["ऐच्()-:ऐच्()-:" + path]
+        assert [record.split("\n")[1].split(":")[:3] for record in suspects] == [["सावण्र्यं", "सावण्र्यं", "kashika"], ["युश्मे", "युश्मे", "kashika"]]
+        assert not cache.dirty
+    assert [ngramindex.suspectrecord(*suspect, "kashika") for suspect in index.suspects("kashika", 3)] == suspects
+
+    cache = ngramindex.Slp1Cache(cache_path)
+    detectors.run([detectors.hrhy], root=str(tmp_path), workers=1, slp1cache=cache)
+    assert [cache.get(digest) for digest in cache.entries] == [["hyasvaH", "sAvaRryaM", "Ec", "yuSme"], ["hyasvaH", "yuzme"]]
+    (tmp_path / "nyasa" / "pada-1.1" / "1.1.1.md").unlink()
+    detectors.run([detectors.hrhy], root=str(tmp_path), workers=1, slp1cache=cache)
+    assert len(ngramindex.Slp1Cache(cache_path).entries) == 1
+
+
+def test_parsed_file_computes_slp1_once(tmp_path):
+    cache = ngramindex.Slp1Cache(None)
+    parsed = detectors.ParsedFile(None, "---\nindex:  1.1.1\n---\n\nइको यणचि\n", cache)
+    assert parsed.words == ["इको", "यणचि"]
+    assert parsed.slp1 == ["iko", "yaRaci"] and parsed.newslp1
+    cache.add(parsed.digest, parsed.slp1)
+    parsed = detectors.ParsedFile(None, parsed.data, cache)
+    assert parsed.slp1 == ["iko", "yaRaci"] and not parsed.newslp1
+
+
+def test_repha_scans_the_body_words_only():
+    parsed = detectors.ParsedFile(corpus.CorpusFile("kashika", "pada-1.1", "1.1.1", "x.md"), "---\nindex: सावण्र्यं\n---\nइति।\nसावण्र्यं अ")
+    assert detectors.repha(parsed) == ["सावण्र्यं:सावर्ण्यं:x.md"]
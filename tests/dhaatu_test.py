@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from ashtadhyayi_data.reader.ashtadhyayi_com import dhaatu
+from ashtadhyayi_data.reader.ashtadhyayi_com.dhaatu import dict_maker
+
+DHAATUS = [
+    {"baseindex": "01.0001", "dhatu": "भू", "aupadeshik": "भू॑", "artha": "सत्तायाम्", "upasargas": [{"name": "अनु", "artha_hindi": "-"}], "notes": "-"},
+    {"baseindex": "02.0001", "dhatu": "अद्", "aupadeshik": "अ॑दँ", "artha": "भक्षणे", "upasargas": [], "notes": "-"},
+    {"baseindex": "01.0002", "dhatu": "एध्", "aupadeshik": "एधँ॒", "artha": "वृद्धौ", "upasargas": [{"name": "अनु", "artha_hindi": "-"}], "notes": "-"},
+]
+
+
+@pytest.fixture
+def dhaatu_dir(tmp_path, monkeypatch):
+    with open(str(tmp_path / "data.txt"), "w", encoding="utf-8") as f:
+        json.dump({"data": DHAATUS}, f, ensure_ascii=False)
+    with open(str(tmp_path / "dhatuforms_san.txt"), "w", encoding="utf-8") as f:
+        json.dump({"01.0001": {"plat": "बुभूषति;बुभूषतः;बुभूषन्ति;बुभूषसि;बुभूषथः;बुभूषथ;बुभूषामि;बुभूषावः;बुभूषामः", "alat": " "}}, f, ensure_ascii=False)
+    monkeypatch.setattr(dhaatu, "DHAATU_FILES_DIR", str(tmp_path))
+    monkeypatch.setattr(dhaatu, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    dhaatu.get_dhaatu_registry.cache_clear()
+    yield tmp_path
+    dhaatu.get_dhaatu_registry.cache_clear()
+
+
+def test_registry_indexes_and_snapshot(dhaatu_dir, monkeypatch):
+    registry = dhaatu.get_dhaatu_registry()
+    assert list(registry) == ["01.0001", "02.0001", "01.0002"]
+    assert [d["baseindex"] for d in registry.by_gana("01")] == ["01.0001", "01.0002"]
+    assert [d["baseindex"] for d in registry.by_upasarga("अनु")] == ["01.0001", "01.0002"]
+    assert registry.by_dhatu("अद्")[0]["artha"] == "भक्षणे"
+    assert registry.by_aupadeshik("भू॑")[0]["dhatu"] == "भू"
+    assert registry.by_dhatu("गम्") == []
+    assert dhaatu.dhaatu_dict is registry.dhaatu_dict
+    assert os.path.exists(dhaatu.get_snapshot_path(str(dhaatu_dir / "data.txt")))
+    dhaatu.get_dhaatu_registry.cache_clear()
+
+    def fail(data_path):
+        raise AssertionError("data.txt should come from the snapshot")
+    monkeypatch.setattr(dhaatu, "_read_dhaatu_list", fail)
+    assert list(dhaatu.get_dhaatu_registry()) == list(registry)
+
+def test_dump_forms_dict(dhaatu_dir):
+    assert dict_maker.dump_forms_dict(type="san", output_path=str(dhaatu_dir / "out")) == 1
+    with open(str(dhaatu_dir / "out" / "ashtadhyayi_com_san" / "ashtadhyayi_com_san.babylon"), encoding="utf-8") as f:
+        (headwords, entry, _, _) = f.read().split("\n")
+    assert headwords.startswith("भू|भू॑|बुभूषति|बुभूषतः")
+    assert entry.startswith("भू भू॑ सत्तायाम् परस्मैपदि-लट्<br><br>बुभूषति<br>बुभूषतः<br>बुभूषन्ति<br>---<br>")
+
+
+def test_forms_index(dhaatu_dir):
+    from ashtadhyayi_data.reader.ashtadhyayi_com.dhaatu import forms_index
+    with open(str(dhaatu_dir / "dhatuforms_nich.txt"), "w", encoding="utf-8") as f:
+        json.dump({"01.0001": {"plat": "भावयति,भावयते;भावयतः;भावयन्ति;भावयसि;भावयथः;भावयथ;भावयामि;भावयावः;भावयामः"}}, f, ensure_ascii=False)
+    index = forms_index.get_forms_index()
+    assert index.lookup("भावयते") == [("01.0001", "nich", "plat", 0)]
+    assert index.lookup("बुभूषामः") == [("01.0001", "san", "plat", 8)]
+    assert index.lookup("भवति") == []
+    assert [row[0] for row in index.lookup_prefix("भावयथ")] == ["भावयथ", "भावयथः"]
+    assert len(index.lookup_prefix("भावय", limit=3)) == 3
+    assert set(index.lookup_many(["भावयति", "भवति", "बुभूषति"])) == {"भावयति", "बुभूषति"}
+    db_path = index.db_path
+    index.close()
+    assert forms_index.get_forms_index().db_path == db_path
+
+    os.remove(str(dhaatu_dir / "dhatuforms_nich.txt"))
+    index = forms_index.get_forms_index()
+    assert index.lookup("भावयते") == []
+    assert [source[0] for source in index.get_sources()] == ["san"]
+    index.close()
+
+
+def test_forms_index_path_with_uri_characters(dhaatu_dir):
+    from ashtadhyayi_data.reader.ashtadhyayi_com.dhaatu import forms_index
+    index = forms_index.get_forms_index(db_path=str(dhaatu_dir / "a?b#c%20d" / "forms.sqlite"))
+    assert index.lookup("बुभूषामः") == [("01.0001", "san", "plat", 8)]
+    index.close()
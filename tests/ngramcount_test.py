@@ -0,0 +1,16 @@
+from collections import Counter
+
+from ashtadhyayi_data.correction.ngram import ngramcount
+
+
+def test_countngrams_streams_characters():
+    words = (word for word in ["rAmaH", "rAma", "ab"])
+    counts = ngramcount.countngrams(words, 2)
+    assert counts == Counter({"rA": 2, "Am": 2, "ma": 2, "aH": 1})
+
+
+def test_model_ranks_unseen_first():
+    model = ngramcount.NgramModel(Counter({"rA": 10, "Am": 10, "ma": 1}))
+    ranked = model.rank(["rAma", "rAmaH", "rAmo"], 2, threshold=1)
+    assert [word for (_, word, _) in ranked] == ["rAmaH", "rAmo", "rAma"]
+    assert ranked[0][2] == ["aH", "ma"]
@@ -0,0 +1,40 @@
+from ashtadhyayi_data.correction.ngram import ngramindex
+
+
+def test_index_suspects_and_incremental_update(tmp_path, write_md):
+    write_md(tmp_path, "kashika", "1.1.1", "वृद्धिरादैच् युश्मे")
+    write_md(tmp_path, "nyasa", "1.1.1", "वृद्धिरादैच्")
+    md_path = write_md(tmp_path, "nyasa", "1.1.2", "युष्मे")
+    index_path = str(tmp_path / "index.pickle")
+    index = ngramindex.NgramIndex(indexfile=index_path, root=str(tmp_path), books=["kashika", "nyasa"])
+    assert index.update() == 3
+    suspects = list(index.suspects("kashika", 3))
+    assert [word for (_, word, _) in suspects] == ["yuSme"]
+    assert "uSm" in suspects[0][2]
+
+    index = ngramindex.NgramIndex(indexfile=index_path, root=str(tmp_path), books=["kashika", "nyasa"])
+    assert index.update() == 0
+    md_path.write_text("---\nindex:  1.1.2\n---\n\nयुश्मे\n", encoding="utf-8")
+    assert index.update() == 1
+    assert list(index.suspects("kashika", 3)) == []
+
+
+def test_rankedsuspects_orders_by_rarity(tmp_path, write_md):
+    write_md(tmp_path, "kashika", "1.1.1", "युश्मे रामः")
+    write_md(tmp_path, "nyasa", "1.1.1", "रामः रामः श्मे")
+    index = ngramindex.NgramIndex(indexfile=str(tmp_path / "index.pickle"), root=str(tmp_path), books=["kashika", "nyasa"])
+    index.update()
+    ranked = list(index.rankedsuspects("kashika", 2, threshold=1))
+    assert [word for (_, word, _, _) in ranked] == ["yuSme"]
+    assert ranked[0][2] == ["Sm", "me", "uS", "yu"]
+
+
+def test_whole_corpus_update_prunes_the_slp1_cache(tmp_path, write_md):
+    write_md(tmp_path, "kashika", "1.1.1", "वृद्धिरादैच्")
+    md_path = write_md(tmp_path, "nyasa", "1.1.1", "युष्मे")
+    cache_path = str(tmp_path / "slp1cache.pickle")
+    index = ngramindex.NgramIndex(indexfile=str(tmp_path / "index.pickle"), root=str(tmp_path), slp1cache=ngramindex.Slp1Cache(cache_path))
+    assert index.update() == 2
+    md_path.write_text("---\nindex:  1.1.1\n---\n\nयुश्मे\n", encoding="utf-8")
+    assert index.update() == 1
+    assert sorted(ngramindex.Slp1Cache(cache_path).entries.values()) == ["vfdDirAdEc", "yuSme"]
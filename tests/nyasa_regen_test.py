@@ -0,0 +1,32 @@
+from ashtadhyayi_data.correction.ngram import nyasa_regen
+
+HTM = (
+    '<html><body><div class="heading">काशिका</div>वृत्तिः'
+    '<div class="heading">न्यासः</div><div>वृद्धिरादैच् <span class="sUtramIndex">, १.१.१</span> </div><p>'
+    'न्यासः <span class="sUtramIndex"><a href="1.1.3.htm">इको गुणवृद्धी</a></span> &quot;इति&quot;</p>'
+    '<div class="heading">बाल-मनोरमा</div><span class="prashna">बालमनोरमा</span>'
+    '<div class="heading">तत्त्व-बोधिनी</div>तत्त्वबोधिनी</body></html>'
+)
+
+
+def test_extractsections_cuts_all_commentaries_in_one_scan():
+    (sections, issues) = nyasa_regen.extractsections(HTM)
+    assert list(sections) == ["काशिका", "न्यासः", "बाल-मनोरमा", "तत्त्व-बोधिनी"]
+    assert sections["तत्त्व-बोधिनी"] == "तत्त्वबोधिनी"
+    assert issues == []
+    (sections, issues) = nyasa_regen.extractsections(HTM.replace("तत्त्व-बोधिनी", "काशिका"))
+    assert sections["काशिका"] == "वृत्तिः"
+    assert issues == ["काशिका repeated"]
+
+
+def test_processfile_writes_the_requested_commentaries(tmp_path, monkeypatch):
+    input_path = tmp_path / "1.1.1.htm"
+    input_path.write_text(HTM, encoding="utf-8")
+    monkeypatch.setattr(nyasa_regen, "fname", lambda inputfilename, commentary="nyasa": str(tmp_path / (commentary + ".md")))
+    log = nyasa_regen.processfile(str(input_path), commentaries=("nyasa", "balamanorama"))
+    assert log == []
+    assert (tmp_path / "nyasa.md").read_text(encoding="utf-8") == "---\nindex:  1.1.1\nsutra:  वृद्धिरादैच्\nvritti:  nyasa\n---\n\nन्यासः (1.1.3) `इति`\n"
+    assert (tmp_path / "balamanorama.md").read_text(encoding="utf-8") == "---\nindex:  1.1.1\nsutra:  वृद्धिरादैच्\nvritti:  balamanorama\n---\n\nबालमनोरमा\n"
+    assert not (tmp_path / "tattvabodhini.md").exists()
+    input_path.write_text(HTM.replace("न्यासः</div>", "</div>"), encoding="utf-8")
+    assert nyasa_regen.processfile(str(input_path)) == [str(input_path) + "\nnyasa issue\n"]
@@ -0,0 +1,11 @@
+from ashtadhyayi_data.correction import plugins
+
+
+def test_findbrackets_positions():
+    data = "---\nindex:  1.1.1\nsutra:  ()\n---\n\nक ऐच्()- इति,आ()आलायन\nx`इद्()वृद्धौ\n()अ"
+    found = list(plugins.findbrackets(data))
+    assert [(word, line, column) for (word, offset, line, column) in found] == [
+        ("ऐच्()-", 6, 3), ("आ()आलायन", 6, 14), ("इद्()वृद्धौ", 7, 3), ("()अ", 8, 1)]
+    for (word, offset, line, column) in found:
+        assert data[offset:offset + len(word)] == word
+        assert data.split("\n")[line - 1][column - 1:].startswith(word)
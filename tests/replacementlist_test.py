@@ -0,0 +1,50 @@
+from ashtadhyayi_data.correction import replacementlist
+
+
+def test_applylist_groups_by_file(tmp_path):
+    pada_dir = tmp_path / "balamanorama" / "pada-1.1"
+    pada_dir.mkdir(parents=True)
+    (pada_dir / "1.1.10.md").write_text("सावण्र्यं, सावण्र्याभ्युपगमे\n", encoding="utf-8")
+    (pada_dir / "1.1.12.md").write_text("आरम्भसामथ्र्यात्।\n", encoding="utf-8")
+    list_path = tmp_path / "list.txt"
+    list_path.write_text(
+        "सावण्र्यं,:सावर्ण्यं,:balamanorama/pada-1.1/1.1.10.md\n"
+        "सावण्र्याभ्युपगमे:सावर्ण्याभ्युपगमे:balamanorama\\pada-1.1\\1.1.10.md\n"
+        "अनुपलब्धम्:अनुपलब्धम्:balamanorama/pada-1.1/1.1.10.md\n"
+        ";सूत्र्यताम्।:सूर्त्यताम्।:balamanorama/pada-1.1/1.1.19.md\n"
+        "आरम्भसामथ्र्यात्।:आरम्भसामर्थ्यात्।:balamanorama/pada-1.1/1.1.12.md\n",
+        encoding="utf-8")
+    pending_path = tmp_path / "nonchanged.txt"
+    results = replacementlist.applylist(str(list_path), root=str(tmp_path), pendingfile=str(pending_path), workers=1)
+    counts = {path.replace(str(tmp_path), ""): (made, notmatched) for (path, made, notmatched) in results}
+    assert counts == {"/balamanorama/pada-1.1/1.1.10.md": (2, 1), "/balamanorama/pada-1.1/1.1.12.md": (1, 0)}
+    assert (pada_dir / "1.1.10.md").read_text(encoding="utf-8") == "सावर्ण्यं, सावर्ण्याभ्युपगमे\n"
+    assert (pada_dir / "1.1.12.md").read_text(encoding="utf-8") == "आरम्भसामर्थ्यात्।\n"
+    assert pending_path.read_text(encoding="utf-8").startswith(";सूत्र्यताम्")
+    assert sorted(p.name for p in pada_dir.iterdir()) == ["1.1.10.md", "1.1.12.md"]
+
+
+def test_writeatomic_keeps_the_file_mode(tmp_path):
+    file_path = tmp_path / "1.1.1.md"
+    file_path.write_text("a", encoding="utf-8")
+    file_path.chmod(0o644)
+    replacementlist.writeatomic(str(file_path), "b")
+    assert file_path.read_text(encoding="utf-8") == "b"
+    assert file_path.stat().st_mode & 0o777 == 0o644
+
+
+def test_mergedpairs_applies_a_list_to_every_file(tmp_path):
+    pada_dir = tmp_path / "nyasa" / "pada-1.1"
+    pada_dir.mkdir(parents=True)
+    for name in ["1.1.1.md", "1.1.2.md"]:
+        (pada_dir / name).write_text("क()ख ग()घ\n", encoding="utf-8")
+    list_path = tmp_path / "list.txt"
+    list_path.write_text("क()ख:कख:nyasa\\pada-1.1\\1.1.1.md\nग()घ:ग घ:nyasa\\pada-1.1\\1.1.2.md\n", encoding="utf-8")
+    (groups, pending) = replacementlist.readlist(str(list_path))
+    pairs = replacementlist.mergedpairs(groups)
+    assert pairs == [("क()ख", "कख"), ("ग()घ", "ग घ")]
+    for workers in [1, 2]:
+        results = replacementlist.applytoall(pairs, ["nyasa/pada-1.1/1.1.1.md", "nyasa/pada-1.1/1.1.2.md"], root=str(tmp_path), workers=workers)
+        assert [(made, notmatched) for (path, made, notmatched) in results] == ([(2, 0)] * 2 if workers == 1 else [(0, 2)] * 2)
+    assert [(pada_dir / name).read_text(encoding="utf-8") for name in ["1.1.1.md", "1.1.2.md"]] == ["कख ग घ\n"] * 2
+    assert replacementlist.getreplacer(tuple(pairs)) is replacementlist.getreplacer(tuple(pairs))
@@ -0,0 +1,47 @@
+import os
+
+from doc_curation.md.file import MdFile
+
+from ashtadhyayi_data.writer.sink import OutputSink, render_md
+
+
+def test_render_md_matches_md_file(tmp_path):
+    for frontmatter_type in [MdFile.YAML, MdFile.TOML]:
+        file_path = str(tmp_path / ("%s.md" % frontmatter_type))
+        MdFile(file_path=file_path, frontmatter_type=frontmatter_type).dump_to_file(metadata={"index": "1.1.1", "sutra": "वृद्धिरादैच्"}, content="वृद्धिः\n\n", dry_run=False)
+        with open(file_path, encoding="utf-8", newline="") as md_file:
+            assert render_md(metadata={"index": "1.1.1", "sutra": "वृद्धिरादैच्"}, content="वृद्धिः\n\n", frontmatter_type=frontmatter_type) == md_file.read()
+
+
+def test_sink_skips_unchanged_files_and_diffs_in_dry_run(tmp_path):
+    with OutputSink(base_dir=str(tmp_path), max_workers=2, max_pending=2) as sink:
+        sink.precreate_pada_dirs(sub_dir="kashika")
+        for i in range(1, 11):
+            sink.write(str(tmp_path / "kashika" / "pada-1.1" / ("1.1.%d.md" % i)), "v%d" % i)
+    assert len(os.listdir(str(tmp_path / "kashika"))) == 32
+    assert sink.close() == ({"added": 10, "changed": 0, "unchanged": 0}, {})
+    mtime = os.stat(str(tmp_path / "kashika" / "pada-1.1" / "1.1.1.md")).st_mtime_ns
+
+    with OutputSink(base_dir=str(tmp_path)) as sink:
+        sink.write(str(tmp_path / "kashika") + "/pada-1.1/1.1.1.md", "v1")
+        sink.write(str(tmp_path / "kashika") + "/pada-1.1/1.1.2.md", "changed")
+    assert sink.close()[0] == {"added": 0, "changed": 1, "unchanged": 1}
+    assert os.stat(str(tmp_path / "kashika" / "pada-1.1" / "1.1.1.md")).st_mtime_ns == mtime
+
+    sink = OutputSink(base_dir=str(tmp_path), dry_run=True)
+    sink.write(str(tmp_path / "kashika") + "/pada-1.1/1.1.1.md", "v1 again")
+    sink.write(str(tmp_path / "kashika") + "/pada-9.9/9.9.9.md", "new")
+    (counts, diffs) = sink.close()
+    assert counts == {"added": 1, "changed": 1, "unchanged": 0}
+    assert "+v1 again" in diffs[str(tmp_path / "kashika" / "pada-1.1" / "1.1.1.md")]
+    assert (tmp_path / "kashika" / "pada-1.1" / "1.1.1.md").read_text(encoding="utf-8") == "v1"
+    assert not (tmp_path / "kashika" / "pada-9.9").exists()
+
+
+def test_sink_with_relative_base_dir_writes_under_it_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with OutputSink(base_dir="out") as sink:
+        sink.write(os.path.join("out", "kashika", "pada-1.1", "1.1.1.md"), "v1")
+    assert sink.close()[0] == {"added": 1, "changed": 0, "unchanged": 0}
+    assert (tmp_path / "out" / "kashika" / "pada-1.1" / "1.1.1.md").read_text(encoding="utf-8") == "v1"
+    assert not (tmp_path / "out" / "out").exists()
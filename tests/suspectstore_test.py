@@ -0,0 +1,67 @@
+import pytest
+
+from ashtadhyayi_data.correction import corrections, suspectstore
+from ashtadhyayi_data.correction.ngram import ngramindex
+
+
+def test_import_dedup_status_export_and_apply(tmp_path):
+    pada_dir = tmp_path / "balamanorama" / "pada-1.1"
+    pada_dir.mkdir(parents=True)
+    (pada_dir / "1.1.10.md").write_text("सावण्र्यं, सावण्र्याभ्युपगमे\n", encoding="utf-8")
+    list_path = tmp_path / "rephalist.txt"
+    list_text = (
+        "सावण्र्यं,:सावर्ण्यं,:balamanorama/pada-1.1/1.1.10.md\n"
+        "सावण्र्याभ्युपगमे:सावर्ण्याभ्युपगमे:balamanorama\\pada-1.1\\1.1.10.md\n"
+        ";सूत्र्यताम्।:सूर्त्यताम्।:balamanorama/pada-1.1/1.1.19.md\n"
+        "broken line\n"
+        "विहितजश्त्वं:विहितजश्त्वं:kashika/pada-1.1/1.1.1.md:श्त्,अश्त्\n")
+    list_path.write_text(list_text, encoding="utf-8")
+    store = suspectstore.SuspectStore(str(tmp_path / "suspects.sqlite"))
+    assert store.importlist("repha", str(list_path), status="accepted") == 4
+    assert store.importlist("repha", str(list_path), status="accepted") == 0
+    assert store.counts() == {"accepted": 3, "pending": 1}
+    assert store.setstatus("rejected", detector="repha", word="विहितजश्त्वं") == 1
+    assert [row[0] for row in store.select(book="kashika", columns="status")] == ["rejected"]
+
+    export_path = tmp_path / "export.txt"
+    assert store.exportlist(str(export_path), detector="repha") == 4
+    assert export_path.read_text(encoding="utf-8") == list_text.replace("broken line\n", "").replace("balamanorama\\pada-1.1\\", "balamanorama/pada-1.1/")
+
+    assert store.apply(root=str(tmp_path), detector="repha", workers=1, dry_run=True)[0][1:] == (2, 0)
+    assert store.counts("repha") == {"accepted": 2, "pending": 1, "rejected": 1}
+    results = store.apply(root=str(tmp_path), detector="repha", workers=1)
+    assert [(made, notmatched) for (path, made, notmatched) in results] == [(2, 0)]
+    assert (pada_dir / "1.1.10.md").read_text(encoding="utf-8") == "सावर्ण्यं, सावर्ण्याभ्युपगमे\n"
+    assert store.counts("repha") == {"applied": 2, "pending": 1, "rejected": 1}
+    assert store.apply(root=str(tmp_path), detector="repha", workers=1) == []
+    assert store.importlist("repha", str(list_path), status="accepted") == 0
+
+    (pada_dir / "1.1.11.md").write_text("---\nindex:  1.1.11\n---\n\nप्रगृह्रम् इति प्रगृह्रम्\n", encoding="utf-8")
+    assert corrections.suspecthrlist(str(pada_dir / "1.1.11.md"), store=store) == 1
+    assert corrections.suspecthrlist(str(pada_dir / "1.1.11.md"), store=store) == 0
+    assert list(store.exportlines("hrhy")) == ["प्रगृह्रम्:प्रगृह्रम्:" + str(pada_dir / "1.1.11.md")]
+
+
+def test_report_format_round_trip(tmp_path):
+    report_text = (
+        "../../kashika/pada-1.1\\1.1.1.md\n"
+        "खट्वैडकादिषु:खट्वैडकादिषु:kashika:ट्वै\n"
+        "../../kashika/pada-1.1\\1.1.11.md\n"
+        "युश्मे:युश्मे:kashika:श्मे,युश्\n")
+    report_path = tmp_path / "kashika_3gram_suspect.txt"
+    report_path.write_text(report_text, encoding="utf-8")
+    store = suspectstore.SuspectStore(str(tmp_path / "suspects.sqlite"))
+    assert store.importlist("3gram", str(report_path), format="report") == 2
+    assert [row[0] for row in store.select(word="युश्मे", columns="path")] == ["kashika/pada-1.1/1.1.11.md"]
+    assert "\n".join(store.exportlines("3gram", format="report")) + "\n" == report_text.replace("../../kashika/pada-1.1\\", "kashika/pada-1.1/")
+    with pytest.raises(ValueError):
+        store.setstatus("done", word="युश्मे")
+
+
+def test_add_dedups_paths_and_parses_report_records(tmp_path):
+    store = suspectstore.SuspectStore(str(tmp_path / "suspects.sqlite"))
+    assert store.add("hrhy", ["ह्रस्वः:ह्रस्वः:../../kashika/pada-1.1\\1.1.1.md"]) == 1
+    assert store.add("hrhy", ["ह्रस्वः:ह्रस्वः:kashika/pada-1.1/1.1.1.md"]) == 0
+    record = ngramindex.suspectrecord("../../kashika/pada-1.1/1.1.11.md", "yuSme", ["Sme", "yuS"], "kashika")
+    assert store.add("3gram", [record]) == 1
+    assert list(store.select(detector="3gram")) == [("kashika", "kashika/pada-1.1/1.1.11.md", "युश्मे", "युश्मे", "श्मे,युश्")]
@@ -0,0 +1,21 @@
+import ashtadhyayi_data
+
+
+def test_registry_lookups_and_slices():
+    registry = ashtadhyayi_data.get_suutra_registry()
+    assert registry is ashtadhyayi_data.get_suutra_registry()
+    assert len(registry) == 3983
+    assert registry["1.1.1"] == "वृद्धिरादैच्"
+    assert "9.9.9" not in registry and registry.get("9.9.9") is None
+    assert list(registry)[:2] == ["1.1.1", "1.1.2"]
+    assert registry.position("1.1.2") == 1
+    assert registry.get_pada(1, 1)[1] == ("1.1.2", "अदेङ् गुणः")
+    assert len(registry.pada_ids()) == 32
+    assert sum(len(registry.get_adhyaya(adhyaya)) for adhyaya in range(1, 9)) == len(registry)
+
+
+def test_suutra_df_view():
+    suutra_df = ashtadhyayi_data.get_suutra_df()
+    assert suutra_df.loc["1.1.1", "sutra"] == "वृद्धिरादैच्"
+    suutra_df.loc["1.1.1", "sutra"] = "x"
+    assert ashtadhyayi_data.get_suutra_df().loc["1.1.1", "sutra"] == "वृद्धिरादैच्"
@@ -0,0 +1,28 @@
+from ashtadhyayi_data.correction.ngram import textindex
+
+
+def test_search_phrase_prefix_and_incremental_update(tmp_path, write_md):
+    write_md(tmp_path, "kashika", "1.1.1", "वृद्धिरादैच् इति सूत्रम्। इको यणचि")
+    write_md(tmp_path, "nyasa", "1.1.1", "वृद्धिरादैच्")
+    md_path = write_md(tmp_path, "nyasa", "6.1.77", "इको यणचि इति")
+    db_path = str(tmp_path / "textindex.sqlite")
+    index = textindex.TextIndex(dbfile=db_path, root=str(tmp_path), books=["kashika", "nyasa"])
+    assert index.update() == 3
+
+    assert index.search("वृद्धिरादैच्") == [("kashika", "1.1.1", 0), ("nyasa", "1.1.1", 0)]
+    assert index.search("iko yaNachi", scheme="itrans") == [("kashika", "1.1.1", 3), ("nyasa", "6.1.77", 0)]
+    assert index.search("iko yaNaci", scheme="hk") == index.search("iko yaRaci")
+    assert index.search("yaRaci iko") == []
+    assert index.prefix("vfdD") == [("vfdDirAdEc", "kashika", "1.1.1", 0), ("vfdDirAdEc", "nyasa", "1.1.1", 0)]
+    assert index.prefix("i", limit=2) == [("iko", "kashika", "1.1.1", 3), ("iko", "nyasa", "6.1.77", 0)]
+    assert index.context("kashika", "1.1.1", 3, width=1) == "sUtram iko yaRaci"
+    index.close()
+
+    index = textindex.TextIndex(dbfile=db_path, root=str(tmp_path), books=["kashika", "nyasa"])
+    assert index.update() == 0
+    md_path.write_text("---\nindex:  6.1.77\n---\n\nइति\n", encoding="utf-8")
+    (tmp_path / "nyasa" / "pada-1.1" / "1.1.1.md").unlink()
+    assert index.update() == 1
+    assert index.search("iko yaRaci") == [("kashika", "1.1.1", 3)]
+    assert index.search("iti") == [("kashika", "1.1.1", 1), ("nyasa", "6.1.77", 0)]
+    assert index.search("vfdDirAdEc") == [("kashika", "1.1.1", 0)]
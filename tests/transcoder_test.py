@@ -0,0 +1,35 @@
+import glob
+import os
+
+from indic_transliteration import sanscript
+
+import ashtadhyayi_data
+from ashtadhyayi_data.correction.ngram import transcoder
+
+
+def test_all_transcoders_compile():
+    for xmlfile in glob.glob(os.path.join(transcoder.TRANSCODER_DIR, "*.xml")):
+        (sfrom, sto) = os.path.basename(xmlfile)[:-4].split("_")
+        assert transcoder.gettranscoder(sfrom, sto).states
+
+
+def test_deva_slp1_round_trip_over_the_sutras():
+    for (suutra_id, sutra) in ashtadhyayi_data.get_suutra_registry().items():
+        slp1 = transcoder.transcoder_processString(sutra, "deva", "slp1")
+        assert slp1 == sanscript.transliterate(sutra, sanscript.DEVANAGARI, sanscript.SLP1), suutra_id
+        # SLP1 can not tell a danda from '.', or a vowel sign from a vowel after a virama.
+        if sanscript.transliterate(slp1, sanscript.SLP1, sanscript.DEVANAGARI) == sutra:
+            assert transcoder.transcoder_processString(slp1, "slp1", "deva") == sutra, suutra_id
+
+
+def test_whole_documents_and_other_schemes():
+    document = "---\nindex: 1.1.1\n---\n\nवाक् इको यणचि। कं क्षत्रियः\nॐ"
+    assert transcoder.transcoder_processString(document, "deva", "slp1") == "---\nindex: 1.1.1\n---\n\nvAk iko yaRaci. kaM kzatriyaH\no~"
+    assert transcoder.transcoder_processString("vAk iko yaRaci. kaM kzatriyaH\no~", "slp1", "deva") == "वाक् इको यणचि। कं क्षत्रियः\nॐ"
+    assert transcoder.transcoder_processString("vRRiddhirAdaich", "itrans", "slp1") == "vfdDirAdEc"
+    assert transcoder.transcoder_processString("vRddhirAdaic", "hk", "slp1") == "vfdDirAdEc"
+
+
+def test_short_e_and_o_signs_match_sanscript():
+    text = "कॆ कॊ कॆः कॊं ऎ ऒ"
+    assert transcoder.transcoder_processString(text, "deva", "slp1") == sanscript.transliterate(text, sanscript.DEVANAGARI, sanscript.SLP1) == "kè kò kèH kòM è ò"
@@ -0,0 +1,94 @@
+import glob
+import json
+import os
+import random
+
+import regex
+
+from ashtadhyayi_data.reader.ashtadhyayi_com.json_stream import iter_json_object
+from ashtadhyayi_data.reader.ashtadhyayi_com.suutra import transformer
+
+
+def write_input(tmp_path, comments):
+    suutra_data = {"data": [{"i": "11001", "a": "1", "p": "1", "n": "1", "s": "वृद्धिरादैच्"}, {"i": "11002", "a": "1", "p": "1", "n": "2", "s": "अदेङ्गुणः"}]}
+    (tmp_path / "data.txt").write_text(json.dumps(suutra_data), encoding="utf-8")
+    (tmp_path / "comments.txt").write_text(json.dumps(comments), encoding="utf-8")
+
+
+def dump(tmp_path):
+    return transformer.dump_commentary_data(commentary_file_path=str(tmp_path / "comments.txt"), suutra_data_path=str(tmp_path / "data.txt"), output_path=str(tmp_path / "out"), dry_run=False)
+
+
+def test_regeneration_rewrites_only_changed_sutras(tmp_path):
+    write_input(tmp_path, {"11001": "a", "11002": "b"})
+    assert dump(tmp_path) == {"added": 2, "changed": 0, "unchanged": 0, "removed": 0}
+    first_path = tmp_path / "out" / "pada-1.1" / "1.1.1.md"
+    second_path = tmp_path / "out" / "pada-1.1" / "1.1.2.md"
+    first_mtime = os.stat(first_path).st_mtime_ns
+    (tmp_path / "out" / "pada-1.1" / "stray.md").write_text("x", encoding="utf-8")
+
+    write_input(tmp_path, {"11001": "a", "11002": "c"})
+    assert dump(tmp_path) == {"added": 0, "changed": 1, "unchanged": 1, "removed": 1}
+    assert os.stat(first_path).st_mtime_ns == first_mtime
+    assert "c" in second_path.read_text(encoding="utf-8")
+    assert not (tmp_path / "out" / "pada-1.1" / "stray.md").exists()
+
+    write_input(tmp_path, {"11001": "a"})
+    assert dump(tmp_path) == {"added": 0, "changed": 0, "unchanged": 1, "removed": 1}
+    assert not second_path.exists()
+
+
+
+def test_regeneration_with_relative_output_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_input(tmp_path, {"11001": "a"})
+    for _ in range(2):
+        transformer.dump_commentary_data(commentary_file_path="comments.txt", suutra_data_path="data.txt", output_path="out", dry_run=False)
+        assert (tmp_path / "out" / "pada-1.1" / "1.1.1.md").exists()
+        assert not (tmp_path / "out" / "out").exists()
+
+
+def test_iter_json_object_matches_json_load():
+    import io
+    document = {"11001": "वृद्धिः \"quoted\" \\\\ {}", "11002": {"a": "x,y", "b": [1, 2.5, None]}, "n": 12345, "t": True}
+    text = json.dumps(document, ensure_ascii=False, indent=1)
+    for chunk_size in [1, 3, 7, 1 << 16]:
+        assert dict(iter_json_object(io.StringIO(text), chunk_size=chunk_size)) == document
+    assert list(iter_json_object(io.StringIO(" { } "))) == []
+
+
+def test_separate_commentaries_in_parallel(tmp_path):
+    suutra_data = {"data": [{"i": "11001", "a": "1", "p": "1", "n": "1", "s": "वृद्धिरादैच्"}]}
+    (tmp_path / "data.txt").write_text(json.dumps(suutra_data), encoding="utf-8")
+    (tmp_path / "kashika.txt").write_text(json.dumps({"11001": "k"}), encoding="utf-8")
+    (tmp_path / "nyaas.txt").write_text(json.dumps({"11001": {"x": "n"}}), encoding="utf-8")
+    counts = transformer.separate_commentaries(indir=str(tmp_path), outdir=str(tmp_path / "out"), dry_run=False, commentaries_in=["kashika", "nyaas"], max_workers=2)
+    assert counts == {"kashika": {"added": 1, "changed": 0, "unchanged": 0, "removed": 0}, "nyaas": {"added": 1, "changed": 0, "unchanged": 0, "removed": 0}}
+    assert (tmp_path / "out" / "nyaas" / "x" / "pada-1.1" / "1.1.1.md").exists()
+
+
+def markdownify_sequential(content):
+    # One regex.sub per rule, applied in turn.
+    content = regex.sub(r"\r?\n", "\n\n", content)
+    content = regex.sub("<<", "_", content)
+    content = regex.sub(">>", "_", content)
+    content = regex.sub("##", "  \n", content)
+    content = regex.sub(r"\$(\d)\$(\d)\$(\d+)", r" (\1.\2.\3)", content)
+    content = regex.sub(r"\$(\d)(\d)0*(\d+)", r" (\1.\2.\3)", content)
+    return content
+
+
+def test_markdownify_golden_files():
+    input_paths = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "data", "markdownify", "*.txt")))
+    assert len(input_paths) > 0
+    for input_path in input_paths:
+        with open(input_path, encoding="utf-8", newline="") as input_file, open(input_path[:-4] + ".md", encoding="utf-8", newline="") as expected_file:
+            assert transformer.markdownify(input_file.read()) == expected_file.read(), input_path
+
+
+def test_markdownify_matches_sequential_rules():
+    random.seed(0)
+    alphabet = ["$", "$", "$", "0", "1", "2", "<", ">", "#", "\r", "\n", "क", " "]
+    for _ in range(5000):
+        content = "".join(random.choice(alphabet) for _ in range(random.randint(0, 20)))
+        assert transformer.markdownify(content) == markdownify_sequential(content), repr(content)
@@ -0,0 +1,44 @@
+import pytest
+
+from ashtadhyayi_data.reader import vritti_repo
+
+
+def test_mismatching_sutras_for_all_vrittis(tmp_path, monkeypatch, write_vritti_md):
+    monkeypatch.setattr(vritti_repo, "ASHTADHYAYI_REPO_ROOT", str(tmp_path))
+    monkeypatch.setattr(vritti_repo, "METADATA_CACHE_DIR", str(tmp_path / ".cache"))
+    write_vritti_md(tmp_path, "kashika", "1.1.1", "वृद्धिरादैच्")
+    write_vritti_md(tmp_path, "kashika", "1.1.2", "इको गुणवृद्धी")
+    write_vritti_md(tmp_path, "nyasa", "1.1.1", "वृद्धिरादैच")
+    write_vritti_md(tmp_path, "nyasa", "9.1.1", "वृद्धिरादैच्")
+    metadata_df = vritti_repo.get_vritti_metadata_df("kashika")
+    assert list(metadata_df["index"]) == ["1.1.1", "1.1.2"]
+    assert metadata_df.loc["1.1.2", "sutra"] == "इको गुणवृद्धी"
+    mismatch_df = vritti_repo.get_all_mismatching_sutras()
+    assert list(zip(mismatch_df["vritti_id"], mismatch_df["index"])) == [("kashika", "1.1.2"), ("nyasa", "9.1.1")]
+
+
+def test_metadata_cache_reuses_unchanged_files(tmp_path, monkeypatch, write_vritti_md):
+    repo_root = tmp_path / "repo"
+    monkeypatch.setattr(vritti_repo, "ASHTADHYAYI_REPO_ROOT", str(repo_root))
+    monkeypatch.setattr(vritti_repo, "METADATA_CACHE_DIR", str(tmp_path / "cache"))
+    write_vritti_md(repo_root, "kashika", "1.1.1", "वृद्धिरादैच्")
+    write_vritti_md(repo_root, "kashika", "1.1.2", "अदेङ् गुणः")
+    assert vritti_repo.get_vritti_metadata("kashika") == [{"index": "1.1.1", "sutra": "वृद्धिरादैच्"}, {"index": "1.1.2", "sutra": "अदेङ् गुणः"}]
+    read_paths = []
+    monkeypatch.setattr(vritti_repo, "read_vritti_metadata", lambda file_path: read_paths.append(file_path) or {"index": "changed"})
+    assert vritti_repo.get_vritti_metadata("kashika")[1] == {"index": "1.1.2", "sutra": "अदेङ् गुणः"}
+    assert read_paths == []
+    (repo_root / "kashika" / "pada-1.1" / "1.1.2.md").write_text("---\nindex: '1.1.2'\nsutra: x\nvrittiindex: 3\n---\n", encoding="utf-8")
+    assert vritti_repo.get_vritti_metadata("kashika")[1] == {"index": "changed"}
+    assert [p.endswith("1.1.2.md") for p in read_paths] == [True]
+
+
+def test_similarity_ratios_are_indel_ratios():
+    assert vritti_repo.similarity_ratios(["abc", "वृद्धिरादैच"], ["xbc", "वृद्धिरादैच्"]) == pytest.approx([4 / 6, 22 / 23])
+    assert vritti_repo.similarity_ratios([], []) == []
+
+
+def test_parse_flat_yaml_leaves_what_pyyaml_rejects_to_pyyaml():
+    assert vritti_repo.parse_flat_yaml(["index: '1.1.1'\n", "sutra: वृद्धिरादैच्\n", "k: x:y\n"]) == {"index": "1.1.1", "sutra": "वृद्धिरादैच्", "k": "x:y"}
+    for line in ["k: abc:\n", "k: x\t#y\n", "k: x\t y\n"]:
+        assert vritti_repo.parse_flat_yaml([line]) is None
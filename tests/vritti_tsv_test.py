@@ -0,0 +1,24 @@
+import pandas
+
+from ashtadhyayi_data.reader import vritti_tsv
+
+
+def test_store_matches_pandas_and_supports_bulk_queries():
+    store = vritti_tsv.VrittiStore()
+    assert store.tables == {}
+    topic_df = pandas.read_csv(vritti_tsv.DATA_DIR + "/topic.tsv", sep="\t", keep_default_na=False).set_index("index")
+    assert store.items("topic") == list(zip(topic_df.index, topic_df["vritti"]))
+    assert store.get("topic", "1.4.2") == topic_df.loc["1.4.2", "vritti"]
+    assert store.get("topic", "9.9.9") is None
+    assert [suutra_id for (suutra_id, _) in store.get_pada("topic", 1, 2)][:2] == ["1.2.1", "1.2.2"]
+    assert store.get_many("topic", ["1.1.2", "9.9.9", "1.1.1"]) == [("1.1.2", "गुणः"), ("1.1.1", "वृद्धिः")]
+    assert set(store.tables) == {"topic"}
+    assert store.get_all_vrittis("1.1.1") == {"sumit_garg_english": "आ, ऐ and औ are called वृद्धि।", "topic": "वृद्धिः"}
+
+
+def test_store_reads_unaadi_csv():
+    store = vritti_tsv.VrittiStore()
+    assert store.get("uNAdi", "1.1").startswith("करोतीति कारुः")
+    assert store.get("uNAdi", "1.1", column="सूत्रम्") == " कृवापाजिमिस्वदिसाध्यशूभ्य उण् ॥"
+    assert store.get_range("uNAdi", "5.")[-1][0] == "5.70"
+    assert store.get_many("uNAdi", ["5.70"], column="सूत्रम्")[0][1].strip() == "मङ्गेरलच् ॥"